@@ -3,30 +3,317 @@ Sentiment analysis module using NLTK VADER.
 Analyzes sentiment polarity and generates statistics.
 """
 
+import numpy as np
 import pandas as pd
 from nltk.sentiment import SentimentIntensityAnalyzer
 import nltk
+from collections import OrderedDict
+import hashlib
+import os
+import sqlite3
+import threading
+import time
 
+from storage import as_review_frame, persist_reviews
+from parallel import resolve_workers, map_shards
+from vader_batch import BatchSentimentScorer
+from sketches import ScoreHistogram, QuantileSketch, TopKReviews
+from schema import SENTIMENT_CLASSES, NUMERIC_DTYPES
+from config import (USE_SCORE_CACHE, SCORE_CACHE_FILE, SCORE_CACHE_MAX_ENTRIES, SENTIMENT_ENGINE, TOP_REVIEWS_K,
+                    COMPACT_DTYPES, SENTIMENT_POSITIVE_THRESHOLD, SENTIMENT_NEGATIVE_THRESHOLD)
 
-# Download required NLTK data
-try:
-    nltk.data.find('sentiment/vader_lexicon')
-except LookupError:
-    print("📥 Downloading NLTK VADER lexicon...")
-    nltk.download('vader_lexicon', quiet=True)
+
+# Shared analyzer, built on first use by get_sentiment_analyzer
+_sentiment_analyzer = None
+_sentiment_analyzer_lock = threading.Lock()
+
+
+def _ensure_vader_lexicon():
+    """Downloads the VADER lexicon if it is not installed yet."""
+    
+    # NLTK installs the lexicon as a zip archive, which is what the analyzer loads
+    try:
+        nltk.data.find('sentiment/vader_lexicon.zip')
+    except LookupError:
+        print("📥 Downloading NLTK VADER lexicon...")
+        nltk.download('vader_lexicon', quiet=True)
 
 
 def initialize_sentiment_analyzer():
     """
-    Initializes the NLTK VADER sentiment analyzer.
+    Initializes a new NLTK VADER sentiment analyzer, reading the lexicon from disk.
+    Use get_sentiment_analyzer to share one analyzer instead.
     
     Returns:
         SentimentIntensityAnalyzer: Initialized analyzer
     """
     
+    _ensure_vader_lexicon()
     return SentimentIntensityAnalyzer()
 
 
+def get_sentiment_analyzer():
+    """
+    Returns the process-wide sentiment analyzer, loading the lexicon on first use.
+    The analyzer is only read after construction, so threads can share it.
+    
+    Returns:
+        SentimentIntensityAnalyzer: Shared analyzer
+    """
+    
+    global _sentiment_analyzer
+    
+    if _sentiment_analyzer is None:
+        with _sentiment_analyzer_lock:
+            if _sentiment_analyzer is None:
+                _sentiment_analyzer = initialize_sentiment_analyzer()
+    
+    return _sentiment_analyzer
+
+
+def warmup_sentiment_analyzer():
+    """
+    Loads the shared analyzer and everything built from it ahead of the first
+    request: the lexicon, the batch scorer and the lexicon version.
+    
+    Returns:
+        float: Seconds taken
+    """
+    
+    start = time.perf_counter()
+    
+    analyzer = get_sentiment_analyzer()
+    lexicon_version(analyzer)
+    _score_uncached(["a great warm up"], analyzer)
+    
+    elapsed = time.perf_counter() - start
+    print(f"✓ Sentiment analyzer ready ({elapsed:.2f}s)")
+    return elapsed
+
+
+class SentimentScoreCache:
+    """
+    Cache of compound scores keyed by a digest of the lexicon version and the text.
+    
+    The most recently used scores are held in an in-memory LRU of at most
+    ``max_entries``; every score is also stored in a SQLite file so it
+    survives restarts. A changed lexicon changes every key, so stale scores
+    are never returned.
+    """
+    
+    def __init__(self, db_path=SCORE_CACHE_FILE, max_entries=SCORE_CACHE_MAX_ENTRIES):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        
+        if db_path:
+            os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('CREATE TABLE IF NOT EXISTS scores (key BLOB PRIMARY KEY, score REAL NOT NULL)')
+            self._conn.commit()
+    
+    @staticmethod
+    def make_key(text, version):
+        """
+        Args:
+            text (str): Cleaned review text
+            version (str): Lexicon version (see lexicon_version)
+        
+        Returns:
+            bytes: Cache key
+        """
+        
+        return hashlib.blake2b(f"{version}\0{text}".encode('utf-8'), digest_size=16).digest()
+    
+    def get_many(self, keys):
+        """
+        Looks up scores, first in memory, then on disk.
+        
+        Args:
+            keys (iterable): Cache keys
+        
+        Returns:
+            dict: Score for each key found
+        """
+        
+        found = {}
+        disk_keys = []
+        
+        with self._lock:
+            for key in keys:
+                score = self._memory.get(key)
+                if score is None:
+                    disk_keys.append(key)
+                else:
+                    self._memory.move_to_end(key)
+                    found[key] = score
+            self.memory_hits += len(found)
+            
+            disk_found = 0
+            if self._conn is not None:
+                # Stay below SQLite's limit on query parameters
+                for start in range(0, len(disk_keys), 500):
+                    batch = disk_keys[start:start + 500]
+                    rows = self._conn.execute(
+                        f"SELECT key, score FROM scores WHERE key IN ({','.join('?' * len(batch))})", batch
+                    ).fetchall()
+                    for key, score in rows:
+                        found[key] = score
+                        self._remember(key, score)
+                    disk_found += len(rows)
+            
+            self.disk_hits += disk_found
+            self.misses += len(disk_keys) - disk_found
+        
+        return found
+    
+    def put_many(self, scores):
+        """
+        Stores newly computed scores in memory and on disk.
+        
+        Args:
+            scores (dict): Score for each cache key
+        """
+        
+        if not scores:
+            return
+        
+        with self._lock:
+            for key, score in scores.items():
+                self._remember(key, score)
+            
+            if self._conn is not None:
+                self._conn.executemany('INSERT OR REPLACE INTO scores (key, score) VALUES (?, ?)', scores.items())
+                self._conn.commit()
+    
+    def _remember(self, key, score):
+        self._memory[key] = score
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+    
+    def get_stats(self):
+        """
+        Returns:
+            dict: Hit and miss counters, hit rate and the number of scores held in memory
+        """
+        
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+                'memory_entries': len(self._memory)
+            }
+    
+    def clear(self):
+        """Removes all cached scores and resets the counters."""
+        
+        with self._lock:
+            self._memory.clear()
+            self.memory_hits = self.disk_hits = self.misses = 0
+            if self._conn is not None:
+                self._conn.execute('DELETE FROM scores')
+                self._conn.commit()
+    
+    def close(self):
+        """Closes the on-disk store."""
+        
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_score_cache = None
+_score_cache_lock = threading.Lock()
+
+
+def get_score_cache():
+    """
+    Returns the shared sentiment score cache, or None if caching is disabled in config.
+    
+    Returns:
+        SentimentScoreCache: Shared cache instance
+    """
+    
+    global _score_cache
+    
+    if not USE_SCORE_CACHE:
+        return None
+    
+    with _score_cache_lock:
+        if _score_cache is None:
+            _score_cache = SentimentScoreCache()
+    
+    return _score_cache
+
+
+def lexicon_version(analyzer):
+    """
+    Fingerprints the analyzer's lexicon, so cached scores are tied to the lexicon that produced them.
+    
+    Args:
+        analyzer (SentimentIntensityAnalyzer): Sentiment analyzer
+    
+    Returns:
+        str: Lexicon version
+    """
+    
+    version = getattr(analyzer, '_lexicon_version', None)
+    
+    if version is None:
+        digest = hashlib.sha1(f"nltk {nltk.__version__}\n".encode('utf-8'))
+        for word, valence in sorted(analyzer.lexicon.items()):
+            digest.update(f"{word}\t{valence}\n".encode('utf-8'))
+        version = digest.hexdigest()[:16]
+        analyzer._lexicon_version = version
+    
+    return version
+
+
+def _init_worker_analyzer():
+    # Each pool worker loads its own copy of the shared analyzer once
+    get_sentiment_analyzer()
+
+
+def _score_texts_in_worker(texts):
+    return _score_uncached(texts, get_sentiment_analyzer())
+
+
+def get_batch_scorer(analyzer):
+    """
+    Returns the vectorized batch scorer for an analyzer, creating it on first use.
+    
+    Args:
+        analyzer (SentimentIntensityAnalyzer): Sentiment analyzer
+    
+    Returns:
+        BatchSentimentScorer: Batch scorer using the analyzer's lexicon
+    """
+    
+    scorer = getattr(analyzer, '_batch_scorer', None)
+    if scorer is None:
+        scorer = analyzer._batch_scorer = BatchSentimentScorer(analyzer)
+    return scorer
+
+
+def _score_uncached(texts, analyzer):
+    """Scores texts with the engine selected in config."""
+    
+    if SENTIMENT_ENGINE == 'vectorized':
+        return get_batch_scorer(analyzer).score(texts).tolist()
+    return [analyze_sentiment(text, analyzer) for text in texts]
+
+
 def analyze_sentiment(text, analyzer):
     """
     Analyzes sentiment of a single review using VADER.
@@ -49,80 +336,404 @@ def analyze_sentiment(text, analyzer):
     return scores['compound']
 
 
-def analyze_all_reviews(df):
+def analyze_all_reviews(df, workers=None, cache=None):
     """
     Performs sentiment analysis on all reviews in the dataframe.
     
     Args:
-        df (DataFrame): Dataframe with review_text column
+        df (DataFrame or list): Dataframe with review_text column, or review records
+        workers (int): Worker processes for scoring (default: PARALLEL_WORKERS
+            for large inputs, see parallel.resolve_workers)
+        cache (SentimentScoreCache): Score cache (default: the shared cache from config; False disables it)
     
     Returns:
         DataFrame: Dataframe with added sentiment columns
     """
     
-    print("🔍 Analyzing sentiment...")
-    
-    # Initialize analyzer
-    analyzer = initialize_sentiment_analyzer()
+    df = as_review_frame(df)
+    workers = resolve_workers(workers, len(df))
     
-    # Apply sentiment analysis to each review
-    df['sentiment_score'] = df['review_text'].apply(lambda x: analyze_sentiment(x, analyzer))
+    if workers > 1:
+        print(f"🔍 Analyzing sentiment on {workers} processes...")
+    else:
+        print("🔍 Analyzing sentiment...")
     
-    # Classify sentiment as positive, neutral, or negative
-    def classify_sentiment(score):
-        if score > 0.05:
-            return 'positive'
-        elif score < -0.05:
-            return 'negative'
-        else:
-            return 'neutral'
+    # Shared analyzer, loaded on first use
+    analyzer = get_sentiment_analyzer()
     
-    df['sentiment_class'] = df['sentiment_score'].apply(classify_sentiment)
+    df = analyze_batch(df, analyzer, workers, cache)
     
     print("✓ Sentiment analysis complete")
     return df
 
 
-def calculate_sentiment_stats(df):
+def analyze_batch(df, analyzer, workers=1, cache=None, positive_threshold=SENTIMENT_POSITIVE_THRESHOLD,
+                  negative_threshold=SENTIMENT_NEGATIVE_THRESHOLD):
     """
-    Calculates sentiment statistics from analyzed reviews.
+    Scores and classifies one batch of reviews with an existing analyzer,
+    without progress output. Used by the streaming pipeline.
     
     Args:
-        df (DataFrame): Dataframe with sentiment_score and sentiment_class columns
+        df (DataFrame): Dataframe with review_text column
+        analyzer (SentimentIntensityAnalyzer): Sentiment analyzer
+        workers (int): Worker processes to spread the reviews over, each with
+            its own analyzer (1 = in-process)
+        cache (SentimentScoreCache): Score cache (default: the shared cache from config; False disables it)
+        positive_threshold (float): Scores above this are positive
+        negative_threshold (float): Scores below this are negative
     
     Returns:
-        dict: Dictionary containing sentiment statistics
+        DataFrame: Dataframe with added sentiment columns
     """
     
-    if df is None or len(df) == 0:
-        return {}
+    df['sentiment_score'] = _score_column(df, analyzer, workers, cache)
     
-    # Count reviews by sentiment class
-    sentiment_counts = df['sentiment_class'].value_counts().to_dict()
+    # Classify sentiment as positive, neutral, or negative
+    df['sentiment_class'] = classify_scores(df['sentiment_score'], positive_threshold, negative_threshold)
     
-    # Calculate percentages
-    total_reviews = len(df)
-    positive_pct = (sentiment_counts.get('positive', 0) / total_reviews * 100) if total_reviews > 0 else 0
-    negative_pct = (sentiment_counts.get('negative', 0) / total_reviews * 100) if total_reviews > 0 else 0
-    neutral_pct = (sentiment_counts.get('neutral', 0) / total_reviews * 100) if total_reviews > 0 else 0
+    return df
+
+
+def score_reviews(df, workers=None, cache=None):
+    """
+    Scores reviews without classifying them, leaving the input unchanged.
+    Lets pipelines keep scores apart from classes, so the classification
+    thresholds can change without scoring again.
+    
+    Args:
+        df (DataFrame): Dataframe with review_text column
+        workers (int): Worker processes for scoring (see parallel.resolve_workers)
+        cache (SentimentScoreCache): Score cache (default: the shared cache from config; False disables it)
     
-    # Calculate average sentiment
-    avg_sentiment = df['sentiment_score'].mean()
+    Returns:
+        DataFrame: Copy of the dataframe with a sentiment_score column
+    """
     
-    stats = {
-        'total_reviews': total_reviews,
-        'positive_reviews': sentiment_counts.get('positive', 0),
-        'negative_reviews': sentiment_counts.get('negative', 0),
-        'neutral_reviews': sentiment_counts.get('neutral', 0),
-        'positive_pct': round(positive_pct, 2),
-        'negative_pct': round(negative_pct, 2),
-        'neutral_pct': round(neutral_pct, 2),
-        'avg_sentiment': round(avg_sentiment, 3),
-        'max_sentiment': round(df['sentiment_score'].max(), 3),
-        'min_sentiment': round(df['sentiment_score'].min(), 3)
-    }
+    print("🔍 Scoring sentiment...")
+    workers = resolve_workers(workers, len(df))
+    scores = _score_column(df, get_sentiment_analyzer(), workers, cache)
     
-    return stats
+    print("✓ Sentiment scoring complete")
+    return df.assign(sentiment_score=scores)
+
+
+def _score_column(df, analyzer, workers, cache):
+    # Score each distinct review once
+    scores = score_texts(df['review_text'].tolist(), analyzer, workers, cache)
+    dtype = NUMERIC_DTYPES['sentiment_score'] if COMPACT_DTYPES else 'float64'
+    return pd.Series(scores, index=df.index, dtype=dtype)
+
+
+def score_texts(texts, analyzer, workers=1, cache=None):
+    """
+    Computes compound scores for a list of texts, scoring each distinct text
+    once and reusing cached scores from earlier calls.
+    
+    Args:
+        texts (list): Cleaned review texts
+        analyzer (SentimentIntensityAnalyzer): Sentiment analyzer (its lexicon versions the cache keys)
+        workers (int): Worker processes for texts that must be scored (1 = in-process)
+        cache (SentimentScoreCache): Score cache (default: the shared cache from config; False disables it)
+    
+    Returns:
+        list: Compound score of each text, as from analyze_sentiment
+    """
+    
+    if cache is None:
+        cache = get_score_cache()
+    
+    distinct = list(dict.fromkeys(texts))
+    scores = {}
+    keys = {}
+    
+    if cache:
+        version = lexicon_version(analyzer)
+        keys = {text: cache.make_key(text, version) for text in distinct if isinstance(text, str)}
+        found = cache.get_many(keys.values())
+        scores = {text: found[key] for text, key in keys.items() if key in found}
+    
+    missing = [text for text in distinct if text not in scores]
+    
+    if workers > 1 and len(missing) > 1:
+        new_scores = map_shards(_score_texts_in_worker, missing, workers, initializer=_init_worker_analyzer)
+    else:
+        new_scores = _score_uncached(missing, analyzer)
+    
+    scores.update(zip(missing, new_scores))
+    
+    if cache:
+        cache.put_many({keys[text]: score for text, score in zip(missing, new_scores) if text in keys})
+    
+    return [scores[text] for text in texts]
+
+
+def classify_sentiment(score):
+    """
+    Classifies a compound score as positive, neutral, or negative.
+    
+    Args:
+        score (float): Compound sentiment score
+    
+    Returns:
+        str: Sentiment class
+    """
+    
+    if score > SENTIMENT_POSITIVE_THRESHOLD:
+        return 'positive'
+    elif score < SENTIMENT_NEGATIVE_THRESHOLD:
+        return 'negative'
+    else:
+        return 'neutral'
+
+
+def classify_scores(scores, positive_threshold=SENTIMENT_POSITIVE_THRESHOLD,
+                    negative_threshold=SENTIMENT_NEGATIVE_THRESHOLD):
+    """
+    Classifies a whole column of compound scores at once, like classify_sentiment.
+    
+    Args:
+        scores (Series): Compound sentiment scores
+        positive_threshold (float): Scores above this are positive
+        negative_threshold (float): Scores below this are negative
+    
+    Returns:
+        Series: Sentiment classes aligned with scores.index (categorical with COMPACT_DTYPES)
+    """
+    
+    values = scores.to_numpy()
+    
+    # Thresholds are compared at the precision of the scores, so a float32
+    # score of 0.05 is not taken to be above a threshold of 0.05
+    positive = values > np.asarray(positive_threshold, dtype=values.dtype)
+    negative = values < np.asarray(negative_threshold, dtype=values.dtype)
+    codes = np.where(positive, 0, np.where(negative, 2, 1))
+    
+    classes = pd.Categorical.from_codes(codes, categories=SENTIMENT_CLASSES)
+    if not COMPACT_DTYPES:
+        classes = classes.astype(object)
+    
+    return pd.Series(classes, index=scores.index)
+
+
+class SentimentAggregator:
+    """
+    Mergeable sentiment statistics.
+    
+    Each batch is reduced in a single grouped pass to per-class counts, score
+    sums and min/max, its scores are added to a fixed-bin histogram and a
+    quantile sketch, and the k most positive and most negative reviews of
+    each movie are tracked, so memory stays bounded however many reviews are added.
+    Aggregates built from different batches, workers or files can be merged,
+    and produce the same dictionaries as calculate_sentiment_stats and
+    get_sentiment_distribution.
+    """
+    
+    CLASSES = SENTIMENT_CLASSES
+    
+    def __init__(self, top_k=TOP_REVIEWS_K):
+        """
+        Args:
+            top_k (int): Most positive / most negative reviews kept per movie (0 = none)
+        """
+        
+        self.counts = {label: 0 for label in self.CLASSES}
+        self.total = 0
+        self.score_sum = 0.0
+        self.min_score = None
+        self.max_score = None
+        self.histogram = ScoreHistogram()
+        self.quantiles = QuantileSketch()
+        self.top_k = top_k
+        self.top_reviews = {}
+    
+    def update(self, df):
+        """
+        Adds a batch of analyzed reviews.
+        
+        Args:
+            df (DataFrame): Batch with sentiment_score and sentiment_class columns
+        
+        Returns:
+            SentimentAggregator: self, for chaining
+        """
+        
+        if df is None or len(df) == 0:
+            return self
+        
+        # Sums are accumulated in 64 bits even when scores are stored as float32
+        groups = df['sentiment_score'].astype('float64').groupby(df['sentiment_class'], observed=True, sort=False).agg(
+            ['size', 'sum', 'min', 'max']
+        )
+        
+        for label, size, score_sum, score_min, score_max in groups.itertuples():
+            self._add(label, int(size), float(score_sum), float(score_min), float(score_max))
+        
+        scores = df['sentiment_score'].to_numpy(dtype=float)
+        self.histogram.update(scores)
+        self.quantiles.update(scores)
+        
+        if self.top_k:
+            if 'movie_name' in df.columns:
+                movies = df.groupby('movie_name', observed=True, sort=False)
+            else:
+                movies = [(None, df)]
+            for movie_name, movie_df in movies:
+                self._top_reviews_of(movie_name).update(movie_df)
+        
+        return self
+    
+    def _top_reviews_of(self, movie_name):
+        if movie_name not in self.top_reviews:
+            self.top_reviews[movie_name] = TopKReviews(self.top_k)
+        return self.top_reviews[movie_name]
+    
+    def _add(self, label, count, score_sum, score_min, score_max):
+        self.counts[label] = self.counts.get(label, 0) + count
+        self.total += count
+        self.score_sum += score_sum
+        self.min_score = score_min if self.min_score is None else min(self.min_score, score_min)
+        self.max_score = score_max if self.max_score is None else max(self.max_score, score_max)
+    
+    def merge(self, other):
+        """
+        Adds the reviews counted by another aggregator.
+        
+        Args:
+            other (SentimentAggregator): Partial aggregate, e.g. from another worker
+        
+        Returns:
+            SentimentAggregator: self, for chaining
+        """
+        
+        if other.total == 0:
+            return self
+        
+        for label, count in other.counts.items():
+            self.counts[label] = self.counts.get(label, 0) + count
+        self.total += other.total
+        self.score_sum += other.score_sum
+        self.min_score = other.min_score if self.min_score is None else min(self.min_score, other.min_score)
+        self.max_score = other.max_score if self.max_score is None else max(self.max_score, other.max_score)
+        self.histogram.merge(other.histogram)
+        self.quantiles.merge(other.quantiles)
+        if self.top_k:
+            for movie_name, tracker in other.top_reviews.items():
+                self._top_reviews_of(movie_name).merge(tracker)
+        return self
+    
+    def to_dict(self):
+        """
+        Returns:
+            dict: JSON-serializable state, restored with from_dict
+        """
+        
+        return {
+            'counts': dict(self.counts),
+            'total': self.total,
+            'score_sum': self.score_sum,
+            'min_score': self.min_score,
+            'max_score': self.max_score,
+            'histogram': self.histogram.to_dict(),
+            'quantiles': self.quantiles.to_dict(),
+            'top_k': self.top_k,
+            'top_reviews': [[movie_name, tracker.to_dict()] for movie_name, tracker in self.top_reviews.items()]
+        }
+    
+    @classmethod
+    def from_dict(cls, state):
+        """
+        Args:
+            state (dict): State from to_dict
+        
+        Returns:
+            SentimentAggregator: Restored aggregator
+        """
+        
+        aggregator = cls(state.get('top_k', TOP_REVIEWS_K))
+        aggregator.counts.update(state['counts'])
+        aggregator.total = state['total']
+        aggregator.score_sum = state['score_sum']
+        aggregator.min_score = state['min_score']
+        aggregator.max_score = state['max_score']
+        aggregator.histogram = ScoreHistogram.from_dict(state['histogram'])
+        aggregator.quantiles = QuantileSketch.from_dict(state['quantiles'])
+        aggregator.top_reviews = {movie_name: TopKReviews.from_dict(tracker)
+                                  for movie_name, tracker in state.get('top_reviews', [])}
+        return aggregator
+    
+    def get_stats(self):
+        """
+        Returns:
+            dict: Statistics in the shape returned by calculate_sentiment_stats
+        """
+        
+        if self.total == 0:
+            return {}
+        
+        return {
+            'total_reviews': self.total,
+            'positive_reviews': self.counts['positive'],
+            'negative_reviews': self.counts['negative'],
+            'neutral_reviews': self.counts['neutral'],
+            'positive_pct': round(self.counts['positive'] / self.total * 100, 2),
+            'negative_pct': round(self.counts['negative'] / self.total * 100, 2),
+            'neutral_pct': round(self.counts['neutral'] / self.total * 100, 2),
+            'avg_sentiment': round(self.score_sum / self.total, 3),
+            'max_sentiment': round(self.max_score, 3),
+            'min_sentiment': round(self.min_score, 3),
+            'median_sentiment': round(self.quantiles.quantile(0.5), 3),
+            'p90_sentiment': round(self.quantiles.quantile(0.9), 3),
+            'p99_sentiment': round(self.quantiles.quantile(0.99), 3)
+        }
+    
+    def get_histogram(self):
+        """
+        Returns:
+            dict: Score histogram with 'bin_edges' and 'counts', for distribution charts
+        """
+        
+        return self.histogram.to_dict()
+    
+    def get_distribution(self):
+        """
+        Returns:
+            dict: Sentiment class counts in the shape returned by get_sentiment_distribution
+        """
+        
+        return {label: self.counts[label] for label in self.CLASSES}
+    
+    def get_top_reviews(self, movie_name=None):
+        """
+        Args:
+            movie_name (str): Movie to return reviews for (default: all movies together)
+        
+        Returns:
+            dict: 'most_positive' reviews (highest score first) and
+                'most_negative' reviews (lowest score first)
+        """
+        
+        if movie_name is not None:
+            tracker = self.top_reviews.get(movie_name, TopKReviews(self.top_k))
+        else:
+            tracker = TopKReviews(self.top_k)
+            for movie_tracker in self.top_reviews.values():
+                tracker.merge(movie_tracker)
+        
+        return tracker.get_top()
+
+
+def calculate_sentiment_stats(df):
+    """
+    Calculates sentiment statistics from analyzed reviews.
+    
+    Args:
+        df (DataFrame): Dataframe with sentiment_score and sentiment_class columns
+    
+    Returns:
+        dict: Dictionary containing sentiment statistics
+    """
+    
+    return SentimentAggregator(top_k=0).update(df).get_stats()
 
 
 def get_sentiment_distribution(df):
@@ -139,32 +750,22 @@ def get_sentiment_distribution(df):
     if df is None or len(df) == 0:
         return {'positive': 0, 'neutral': 0, 'negative': 0}
     
-    distribution = df['sentiment_class'].value_counts().to_dict()
-    
-    # Ensure all categories are present
-    return {
-        'positive': distribution.get('positive', 0),
-        'neutral': distribution.get('neutral', 0),
-        'negative': distribution.get('negative', 0)
-    }
+    return SentimentAggregator(top_k=0).update(df).get_distribution()
 
 
-def save_analyzed_reviews(df, filepath):
+def save_analyzed_reviews(df, filepath, fmt=None, background=False):
     """
-    Saves reviews with sentiment analysis to CSV.
+    Saves reviews with sentiment analysis to CSV, or to a Parquet / Feather
+    file when the path has that extension or fmt says so.
     
     Args:
         df (DataFrame): Dataframe with sentiment analysis
         filepath (str): Path to save the file
+        fmt (str): Storage format - 'csv', 'parquet' or 'feather' (default: from the extension)
+        background (bool): Save on a background thread and return a Future
     
     Returns:
-        bool: True if successful, False otherwise
+        bool: True if successful, False otherwise (a Future of it when background)
     """
     
-    try:
-        df.to_csv(filepath, index=False, encoding='utf-8')
-        print(f"✓ Analyzed reviews saved to {filepath}")
-        return True
-    except Exception as e:
-        print(f"✗ Error saving analyzed reviews: {str(e)}")
-        return False
+    return persist_reviews(df, filepath, fmt, background=background)
@@ -3,16 +3,27 @@ Flask web application for Letterboxd Review Analytics.
 Main application file with routes and core functionality.
 """
 
-from flask import Flask, render_template, request, jsonify, send_from_directory
+from flask import Flask, render_template, request, jsonify, send_from_directory, Response, stream_with_context
+import json
 import os
+import threading
 import pandas as pd
+from collections import OrderedDict
 from datetime import datetime
 
 # Import custom modules
-from scraper import scrape_letterboxd_reviews, save_reviews_to_csv, get_sample_reviews
-from preprocessor import preprocess_reviews
-from analyzer import analyze_all_reviews, calculate_sentiment_stats, get_sentiment_distribution, save_analyzed_reviews
-from visualizer import create_sentiment_chart
+from scraper import save_reviews_to_csv
+from analyzer import save_analyzed_reviews, warmup_sentiment_analyzer
+from visualizer import create_sentiment_chart, get_chart_render_queue
+from storage import artifact_path, persist_reviews
+from schema import review_records
+from chart_specs import CHART_FORMATS, sentiment_chart
+from config import (RAW_REVIEWS_FILE, CLEAN_REVIEWS_FILE, ANALYZED_REVIEWS_FILE,
+                    PERSIST_INTERMEDIATES, PERSIST_ASYNC, PRELOAD_SENTIMENT_ANALYZER, TOP_REVIEWS_MAX_MOVIES,
+                    SENTIMENT_POSITIVE_THRESHOLD, SENTIMENT_NEGATIVE_THRESHOLD, CHART_FORMAT,
+                    CHART_RENDER_ASYNC, CHART_WAIT_TIMEOUT, MAX_REVIEWS)
+from pipeline import iter_review_batches, stream_analysis, build_analysis_graph
+from jobs import get_job_manager
 
 
 # Initialize Flask app
@@ -23,6 +34,70 @@ app.config['UPLOAD_FOLDER'] = 'data'
 os.makedirs('data', exist_ok=True)
 os.makedirs('plots', exist_ok=True)
 
+# Most positive / most negative reviews of recently analyzed movies, for
+# /api/movies/<movie_name>/top-reviews (least recently analyzed dropped first)
+_top_reviews = OrderedDict()
+_top_reviews_lock = threading.Lock()
+
+
+def remember_top_reviews(movie_name, top_reviews):
+    """
+    Keeps the top reviews of an analyzed movie for the top-reviews endpoint.
+    
+    Args:
+        movie_name (str): Movie name as requested
+        top_reviews (dict): Result of SentimentAggregator.get_top_reviews
+    """
+    
+    key = movie_name.strip().lower()
+    with _top_reviews_lock:
+        _top_reviews[key] = top_reviews
+        _top_reviews.move_to_end(key)
+        while len(_top_reviews) > TOP_REVIEWS_MAX_MOVIES:
+            _top_reviews.popitem(last=False)
+
+
+def render_png_chart(chart_path, render, *args):
+    """
+    Draws a PNG chart on the background render queue (CHART_RENDER_ASYNC)
+    or right away.
+    
+    Args:
+        chart_path (str): Path of the PNG chart
+        render (callable): Draws the chart, returning a true value on success
+        *args: Arguments for render
+    
+    Returns:
+        str: Chart status: 'pending', 'ready' or 'failed'
+    """
+    
+    if CHART_RENDER_ASYNC:
+        return get_chart_render_queue().submit(chart_path, render, *args)
+    return 'ready' if render(*args) else 'failed'
+
+
+def chart_fields(chart_format, chart, chart_path, chart_status='ready'):
+    """
+    Response fields carrying the sentiment chart: a URL of the PNG file,
+    the SVG markup or the JSON spec, depending on the format.
+    
+    Args:
+        chart_format (str): 'png', 'svg' or 'json'
+        chart: SVG string or spec dict (ignored for 'png')
+        chart_path (str): Path of the PNG chart
+        chart_status (str): 'pending' while the PNG chart is being drawn, 'ready' or 'failed'
+    
+    Returns:
+        dict: 'chart_format', 'chart_status' and one of 'chart_url', 'chart_svg' or 'chart_spec'
+    """
+    
+    if chart_format == 'svg':
+        return {'chart_format': chart_format, 'chart_status': chart_status, 'chart_svg': chart}
+    if chart_format == 'json':
+        return {'chart_format': chart_format, 'chart_status': chart_status, 'chart_spec': chart}
+    return {'chart_format': chart_format, 'chart_status': chart_status,
+            'chart_url': f'/plots/{os.path.basename(chart_path)}'}
+
 
 @app.route('/')
 def home():
@@ -30,88 +105,188 @@ def home():
     return render_template('index.html')
 
 
+def parse_analysis_request(data):
+    """
+    Reads and validates the parameters of an analysis request.
+    
+    Args:
+        data (dict): Request JSON with movie_name and optional
+            positive_threshold / negative_threshold, chart_format and max_reviews
+    
+    Returns:
+        tuple: (keyword arguments for run_analysis, None), or (None, error message)
+    """
+    
+    data = data or {}
+    movie_name = str(data.get('movie_name') or '').strip()
+    
+    if not movie_name:
+        return None, 'Movie name is required'
+    
+    try:
+        positive_threshold = float(data.get('positive_threshold', SENTIMENT_POSITIVE_THRESHOLD))
+        negative_threshold = float(data.get('negative_threshold', SENTIMENT_NEGATIVE_THRESHOLD))
+    except (TypeError, ValueError):
+        return None, 'Thresholds must be numbers'
+    
+    if negative_threshold > positive_threshold:
+        return None, 'negative_threshold must not be above positive_threshold'
+    
+    # 'svg' and 'json' charts are built without importing matplotlib
+    chart_format = data.get('chart_format', CHART_FORMAT)
+    if chart_format not in CHART_FORMATS:
+        return None, f'chart_format must be one of {", ".join(CHART_FORMATS)}'
+    
+    try:
+        max_reviews = int(data.get('max_reviews', MAX_REVIEWS))
+    except (TypeError, ValueError):
+        max_reviews = 0
+    if max_reviews < 1:
+        return None, 'max_reviews must be a positive integer'
+    
+    return {
+        'movie_name': movie_name,
+        'positive_threshold': positive_threshold,
+        'negative_threshold': negative_threshold,
+        'chart_format': chart_format,
+        'max_reviews': max_reviews
+    }, None
+
+
+def run_analysis(movie_name, positive_threshold=SENTIMENT_POSITIVE_THRESHOLD,
+                 negative_threshold=SENTIMENT_NEGATIVE_THRESHOLD, chart_format=CHART_FORMAT, max_reviews=MAX_REVIEWS):
+    """
+    Runs the full analysis pipeline for a movie.
+    
+    Args:
+        movie_name (str): Name of the movie
+        positive_threshold (float): Scores above this are positive
+        negative_threshold (float): Scores below this are negative
+        chart_format (str): 'png', 'svg' or 'json'
+        max_reviews (int): Maximum number of reviews to scrape
+    
+    Returns:
+        tuple: (response dict, HTTP status code)
+    """
+    
+    print(f"\n{'='*60}")
+    print(f"📽️  ANALYZING: {movie_name}")
+    print(f"{'='*60}")
+    
+    chart_path = os.path.join('plots', f'{movie_name.replace(" ", "_")}_sentiment.png')
+    
+    # Stages whose inputs and parameters are unchanged since an earlier
+    # request are reused instead of run again
+    graph = build_analysis_graph(movie_name, max_reviews=max_reviews, positive_threshold=positive_threshold,
+                                 negative_threshold=negative_threshold, chart_format=chart_format)
+    
+    # Step 1: Scrape reviews
+    print("\n[Step 1] Scraping Reviews...")
+    reviews = graph.run('scrape')
+    
+    if not reviews:
+        return {'error': 'Could not fetch reviews for this movie'}, 400
+    
+    # Reviews stay in memory between steps; intermediate files are
+    # optionally written in the background
+    if PERSIST_INTERMEDIATES:
+        save_reviews_to_csv(reviews, artifact_path('data', RAW_REVIEWS_FILE), background=PERSIST_ASYNC)
+    
+    # Step 2: Preprocess reviews
+    print("\n[Step 2] Preprocessing Reviews...")
+    df_clean = graph.run('clean')
+    
+    if df_clean is None or len(df_clean) == 0:
+        return {'error': 'No valid reviews after preprocessing'}, 400
+    
+    if PERSIST_INTERMEDIATES:
+        persist_reviews(df_clean, artifact_path('data', CLEAN_REVIEWS_FILE), background=PERSIST_ASYNC)
+    
+    # Step 3: Sentiment Analysis
+    print("\n[Step 3] Sentiment Analysis...")
+    df_analyzed = graph.run('classify')
+    
+    # Save analyzed reviews
+    if PERSIST_INTERMEDIATES:
+        save_analyzed_reviews(df_analyzed, artifact_path('data', ANALYZED_REVIEWS_FILE),
+                              background=PERSIST_ASYNC)
+    
+    # Step 4: Calculate Statistics
+    print("\n[Step 4] Calculating Statistics...")
+    aggregate = graph.run('stats')
+    sentiment_stats = aggregate.get_stats()
+    sentiment_distribution = aggregate.get_distribution()
+    top_reviews = aggregate.get_top_reviews()
+    remember_top_reviews(movie_name, top_reviews)
+    
+    # Step 5: Create Visualizations
+    print("\n[Step 5] Creating Visualizations...")
+    if chart_format == 'png':
+        # PNG charts are drawn off the request; /plots/<filename> waits for them.
+        # Only the distribution is handed over, so the graph stays on this thread.
+        chart = None
+        chart_status = render_png_chart(chart_path, create_sentiment_chart, sentiment_distribution,
+                                        movie_name, chart_path)
+    else:
+        chart = graph.run('chart')
+        chart_status = 'ready'
+    
+    # Prepare response
+    print(f"\n{'='*60}")
+    print("✓ ANALYSIS COMPLETE!")
+    print(f"{'='*60}\n")
+    
+    response = {
+        'success': True,
+        'movie_name': movie_name,
+        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'stats': sentiment_stats,
+        'sentiment_distribution': sentiment_distribution,
+        **chart_fields(chart_format, chart, chart_path, chart_status),
+        'sample_reviews': review_records(df_analyzed.head(5)),
+        'top_reviews': top_reviews,
+        'reused_stages': list(graph.reused)
+    }
+    
+    return response, 200
+
+
+def analysis_job(params):
+    """
+    Runs an analysis submitted to /api/jobs.
+    
+    Args:
+        params (dict): Result of parse_analysis_request
+    
+    Returns:
+        dict: Analysis results, as returned by /api/analyze
+    """
+    
+    response, status = run_analysis(**params)
+    if status != 200:
+        raise RuntimeError(response['error'])
+    return response
+
+
 @app.route('/api/analyze', methods=['POST'])
 def analyze_movie():
     """
     API endpoint for analyzing movie reviews.
-    Accepts movie name and performs full analysis pipeline.
+    Accepts movie name (and optional positive_threshold / negative_threshold
+    and chart_format) and performs full analysis pipeline.
     
     Returns:
         JSON response with analysis results
     """
     
     try:
-        # Get movie name from request
-        data = request.get_json()
-        movie_name = data.get('movie_name', '').strip()
-        
-        if not movie_name:
-            return jsonify({'error': 'Movie name is required'}), 400
-        
-        print(f"\n{'='*60}")
-        print(f"📽️  ANALYZING: {movie_name}")
-        print(f"{'='*60}")
-        
-        # Step 1: Scrape reviews
-        print("\n[Step 1] Scraping Reviews...")
-        raw_filepath = os.path.join('data', 'reviews_raw.csv')
-        
-        # Try to scrape real reviews, fall back to sample if it fails
-        reviews = scrape_letterboxd_reviews(movie_name, max_reviews=50)
-        
-        if not reviews:
-            print("⚠ Using sample reviews (actual scraping unavailable)")
-            reviews = get_sample_reviews(movie_name)
-        
-        if not reviews:
-            return jsonify({'error': 'Could not fetch reviews for this movie'}), 400
-        
-        # Save raw reviews
-        save_reviews_to_csv(reviews, raw_filepath)
-        
-        # Step 2: Preprocess reviews
-        print("\n[Step 2] Preprocessing Reviews...")
-        clean_filepath = os.path.join('data', 'reviews_clean.csv')
-        df_clean = preprocess_reviews(raw_filepath, clean_filepath)
-        
-        if df_clean is None or len(df_clean) == 0:
-            return jsonify({'error': 'No valid reviews after preprocessing'}), 400
-        
-        # Step 3: Sentiment Analysis
-        print("\n[Step 3] Sentiment Analysis...")
-        df_analyzed = analyze_all_reviews(df_clean)
-        
-        # Save analyzed reviews
-        analyzed_filepath = os.path.join('data', 'reviews_analyzed.csv')
-        save_analyzed_reviews(df_analyzed, analyzed_filepath)
-        
-        # Step 4: Calculate Statistics
-        print("\n[Step 4] Calculating Statistics...")
-        sentiment_stats = calculate_sentiment_stats(df_analyzed)
-        sentiment_distribution = get_sentiment_distribution(df_analyzed)
-        
-        # Step 5: Create Visualizations
-        print("\n[Step 5] Creating Visualizations...")
-        chart_path = os.path.join('plots', f'{movie_name.replace(" ", "_")}_sentiment.png')
-        create_sentiment_chart(sentiment_distribution, movie_name, chart_path)
-        
-        # Prepare response
-        print(f"\n{'='*60}")
-        print("✓ ANALYSIS COMPLETE!")
-        print(f"{'='*60}\n")
-        
-        response = {
-            'success': True,
-            'movie_name': movie_name,
-            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'stats': sentiment_stats,
-            'sentiment_distribution': sentiment_distribution,
-            'chart_url': f'/plots/{os.path.basename(chart_path)}',
-            'sample_reviews': df_analyzed.head(5).to_dict('records')
-        }
-        
-        return jsonify(response)
+        params, error = parse_analysis_request(request.get_json(silent=True))
+        if error:
+            return jsonify({'error': error}), 400
         
+        response, status = run_analysis(**params)
+        return jsonify(response), status
+    
     except Exception as e:
         print(f"✗ Error during analysis: {str(e)}")
         import traceback
@@ -119,6 +294,155 @@ def analyze_movie():
         return jsonify({'error': f'An error occurred: {str(e)}'}), 500
 
 
+@app.route('/api/jobs', methods=['POST'])
+def submit_analysis_job():
+    """
+    Queues an analysis and returns at once.
+    Accepts the same request as /api/analyze.
+    
+    Returns:
+        202 with the job ID and its status URL, 400 for an invalid request,
+        or 429 when too many analyses are queued
+    """
+    
+    params, error = parse_analysis_request(request.get_json(silent=True))
+    if error:
+        return jsonify({'error': error}), 400
+    
+    job_id = get_job_manager().submit(analysis_job, params)
+    
+    if job_id is None:
+        response = jsonify({'error': 'Too many analyses in progress, please try again shortly'})
+        response.headers['Retry-After'] = '5'
+        return response, 429
+    
+    print(f"📥 Queued analysis of {params['movie_name']} as job {job_id}")
+    return jsonify({'job_id': job_id, 'status': 'queued', 'status_url': f'/api/jobs/{job_id}'}), 202
+
+
+@app.route('/api/jobs/<job_id>')
+def analysis_job_status(job_id):
+    """
+    Returns the status of an analysis job, and its result once done.
+    
+    Returns:
+        JSON response with 'status' ('queued', 'running', 'done' or 'failed'),
+        'result' (the /api/analyze response) or 'error', or 404 if the job
+        is unknown or its result has expired
+    """
+    
+    job = get_job_manager().get(job_id)
+    
+    if job is None:
+        return jsonify({'error': 'Job not found or expired'}), 404
+    
+    return jsonify(job)
+
+
+@app.route('/api/analyze/stream', methods=['POST'])
+def analyze_movie_stream():
+    """
+    Streaming variant of /api/analyze.
+    Reviews are cleaned and scored page by page as they are scraped, and
+    running statistics are sent after every batch as newline-delimited JSON.
+    The last line has the same fields as the /api/analyze response.
+    
+    Returns:
+        Streamed application/x-ndjson response
+    """
+    
+    params, error = parse_analysis_request(request.get_json(silent=True))
+    if error:
+        return jsonify({'error': error}), 400
+    
+    movie_name = params['movie_name']
+    chart_format = params['chart_format']
+    
+    def generate():
+        try:
+            print(f"\n📽️  STREAMING ANALYSIS: {movie_name}")
+            
+            analyzed_filepath = artifact_path('data', ANALYZED_REVIEWS_FILE)
+            batches = iter_review_batches(movie_name, max_reviews=params['max_reviews'])
+            
+            stats = None
+            sample_reviews = []
+            for df_batch, stats in stream_analysis(batches, analyzed_filepath, params['positive_threshold'],
+                                                     params['negative_threshold']):
+                # Keep only the first few reviews for the final response
+                if len(sample_reviews) < 5:
+                    sample_reviews.extend(review_records(df_batch.head(5 - len(sample_reviews))))
+                
+                yield json.dumps({
+                    'type': 'progress',
+                    'reviews_processed': stats.total,
+                    'stats': stats.get_stats(),
+                    'sentiment_distribution': stats.get_distribution()
+                }) + '\n'
+            
+            if stats is None:
+                yield json.dumps({'type': 'error', 'error': 'No valid reviews after preprocessing'}) + '\n'
+                return
+            
+            sentiment_distribution = stats.get_distribution()
+            top_reviews = stats.get_top_reviews()
+            remember_top_reviews(movie_name, top_reviews)
+            chart_path = os.path.join('plots', f'{movie_name.replace(" ", "_")}_sentiment.png')
+            if chart_format == 'png':
+                chart = None
+                chart_status = render_png_chart(chart_path, create_sentiment_chart, sentiment_distribution,
+                                                movie_name, chart_path)
+            else:
+                chart = sentiment_chart(sentiment_distribution, movie_name, chart_format)
+                chart_status = 'ready'
+            
+            yield json.dumps({
+                'type': 'complete',
+                'success': True,
+                'movie_name': movie_name,
+                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'stats': stats.get_stats(),
+                'sentiment_distribution': sentiment_distribution,
+                **chart_fields(chart_format, chart, chart_path, chart_status),
+                'sample_reviews': sample_reviews,
+                'top_reviews': top_reviews
+            }) + '\n'
+        
+        except Exception as e:
+            print(f"✗ Error during streaming analysis: {str(e)}")
+            yield json.dumps({'type': 'error', 'error': f'An error occurred: {str(e)}'}) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+@app.route('/api/movies/<path:movie_name>/top-reviews')
+def top_reviews_endpoint(movie_name):
+    """
+    Returns the most positive and most negative reviews of an analyzed movie.
+    Accepts an optional ?k= to return fewer than TOP_REVIEWS_K of each.
+    
+    Returns:
+        JSON response with 'most_positive' and 'most_negative' reviews,
+        or 404 if the movie has not been analyzed yet
+    """
+    
+    with _top_reviews_lock:
+        top_reviews = _top_reviews.get(movie_name.strip().lower())
+    
+    if top_reviews is None:
+        return jsonify({'error': f'No analysis found for {movie_name}; analyze it first'}), 404
+    
+    k = request.args.get('k', type=int)
+    if k is not None and k < 0:
+        return jsonify({'error': 'k must not be negative'}), 400
+    
+    return jsonify({
+        'movie_name': movie_name,
+        'most_positive': top_reviews['most_positive'][:k],
+        'most_negative': top_reviews['most_negative'][:k]
+    })
+
+
 @app.route('/results')
 def results():
     """Renders the results page."""
@@ -127,14 +451,30 @@ def results():
 
 @app.route('/plots/<filename>')
 def serve_plot(filename):
-    """Serves plot images from the plots directory."""
+    """
+    Serves plot images from the plots directory.
+    A chart still being drawn in the background is waited for up to
+    CHART_WAIT_TIMEOUT seconds; after that 202 is returned so the client retries.
+    """
+    
+    status = get_chart_render_queue().wait(os.path.join('plots', filename), timeout=CHART_WAIT_TIMEOUT)
+    
+    if status == 'pending':
+        response = jsonify({'status': 'pending', 'message': 'Chart is still being rendered'})
+        response.headers['Retry-After'] = '1'
+        return response, 202
+    
+    if status == 'failed':
+        return jsonify({'error': 'Chart could not be rendered'}), 500
+    
     return send_from_directory('plots', filename)
 
 
 @app.route('/api/health')
 def health_check():
-    """Health check endpoint."""
-    return jsonify({'status': 'healthy', 'message': 'Letterboxd Review Analytics is running'})
+    """Health check endpoint. Includes the number of analysis jobs by status."""
+    return jsonify({'status': 'healthy', 'message': 'Letterboxd Review Analytics is running',
+                    'jobs': get_job_manager().get_stats()})
 
 
 @app.errorhandler(404)
@@ -154,5 +494,9 @@ if __name__ == '__main__':
     print("📍 App running at http://localhost:5000")
     print("📝 Press CTRL+C to stop\n")
     
+    # Load the sentiment lexicon in the background so the first request does not pay for it
+    if PRELOAD_SENTIMENT_ANALYZER:
+        threading.Thread(target=warmup_sentiment_analyzer, name='warmup', daemon=True).start()
+    
     # Run Flask app in debug mode for development
     app.run(debug=True, port=5000, host='0.0.0.0')
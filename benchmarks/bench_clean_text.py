@@ -0,0 +1,97 @@
+"""
+Benchmark for review text cleaning.
+Compares per-row clean_text/count_words via Series.apply with the batch clean_texts path.
+
+Usage:
+    python benchmarks/bench_clean_text.py [--rows N] [--unique] [--repeat N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from preprocessor import clean_text, count_words, clean_texts
+from synthetic import generate_synthetic_reviews
+
+
+def build_texts(rows, unique):
+    """
+    Builds the review text column to clean.
+    
+    Args:
+        rows (int): Number of reviews
+        unique (bool): Make every text distinct (and add URLs, emails and symbols to some)
+    
+    Returns:
+        Series: Review texts
+    """
+    
+    texts = pd.concat(
+        (chunk['review_text'] for chunk in generate_synthetic_reviews("Benchmark", rows)),
+        ignore_index=True
+    )
+    
+    if unique:
+        suffixes = pd.Series([
+            f" #{i} see https://example.com/r/{i} or mail fan{i}@example.com :)" if i % 10 == 0 else f" ({i}) ★"
+            for i in range(rows)
+        ])
+        texts = texts + suffixes
+    
+    return texts
+
+
+def best_of(func, repeat):
+    """
+    Times func over several runs.
+    
+    Args:
+        func (callable): Work to time
+        repeat (int): Number of runs
+    
+    Returns:
+        tuple: (result of the last run, seconds of the fastest run)
+    """
+    
+    best = float('inf')
+    for _ in range(max(repeat, 1)):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark review text cleaning')
+    parser.add_argument('--rows', type=int, default=1_000_000, help='Number of reviews')
+    parser.add_argument('--unique', action='store_true', help='Make every review text distinct')
+    parser.add_argument('--repeat', type=int, default=1, help='Runs per method; the fastest is reported')
+    args = parser.parse_args()
+    
+    texts = build_texts(args.rows, args.unique)
+    print(f"\nCleaning {len(texts):,} reviews ({texts.nunique():,} distinct texts)")
+    print("-" * 60)
+    
+    def apply_path():
+        expected_text = texts.apply(clean_text)
+        return expected_text, expected_text.apply(count_words)
+    
+    (expected_text, expected_counts), apply_seconds = best_of(apply_path, args.repeat)
+    print(f"  apply(clean_text) + apply(count_words)   {apply_seconds:7.2f} s")
+    
+    (cleaned, word_counts), batch_seconds = best_of(lambda: clean_texts(texts), args.repeat)
+    print(f"  clean_texts                              {batch_seconds:7.2f} s   {apply_seconds / batch_seconds:5.1f}x")
+    
+    assert cleaned.equals(expected_text), "clean_texts output differs from clean_text"
+    assert word_counts.equals(expected_counts), "clean_texts word counts differ from count_words"
+    print("  ✓ Output identical")
+
+
+if __name__ == '__main__':
+    main()
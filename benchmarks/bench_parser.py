@@ -0,0 +1,70 @@
+"""
+Benchmark for the review HTML parsing backends.
+Times each backend in scraper.PARSER_BACKENDS on the saved HTML fixtures.
+
+Usage:
+    python benchmarks/bench_parser.py [--repeat N] [--iterations N]
+"""
+
+import argparse
+import glob
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scraper import PARSER_BACKENDS, get_parser_backend
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def load_fixture(path, repeat):
+    """
+    Loads a fixture page, optionally repeating its review list to simulate a larger page.
+    
+    Args:
+        path (str): Path to the HTML fixture
+        repeat (int): Number of copies of the review list to include
+    
+    Returns:
+        bytes: Page content
+    """
+    
+    with open(path, 'rb') as f:
+        html = f.read()
+    
+    if repeat > 1:
+        start = html.index(b'<ul class="film-list">')
+        end = html.index(b'</ul>', start) + len(b'</ul>')
+        html = html[:start] + html[start:end] * repeat + html[end:]
+    
+    return html
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark review parsing backends')
+    parser.add_argument('--repeat', type=int, default=1, help='Copies of the review list per page')
+    parser.add_argument('--iterations', type=int, default=50, help='Parses per measurement')
+    args = parser.parse_args()
+    
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, '*.html'))):
+        html = load_fixture(path, args.repeat)
+        print(f"\n{os.path.basename(path)} ({len(html) / 1024:.1f} KB, repeat={args.repeat})")
+        print("-" * 60)
+        
+        baseline = None
+        expected = get_parser_backend('full')(html, 'Benchmark')
+        
+        for name in PARSER_BACKENDS:
+            backend = get_parser_backend(name)
+            assert backend(html, 'Benchmark') == expected, f"{name} output differs from 'full'"
+            
+            seconds = min(timeit.repeat(lambda: backend(html, 'Benchmark'), number=args.iterations, repeat=3))
+            per_page_ms = seconds / args.iterations * 1000
+            baseline = baseline or per_page_ms
+            print(f"  {name:<10} {per_page_ms:8.2f} ms/page   {baseline / per_page_ms:5.2f}x   ({len(expected)} reviews)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark for sentiment scoring.
+Compares per-review analyze_sentiment (NLTK polarity_scores) with the vectorized BatchSentimentScorer.
+
+Usage:
+    python benchmarks/bench_sentiment.py [--rows N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from analyzer import initialize_sentiment_analyzer, analyze_sentiment
+from preprocessor import clean_texts
+from synthetic import generate_synthetic_reviews
+from vader_batch import BatchSentimentScorer, SCORE_TOLERANCE
+
+
+def build_texts(rows):
+    """
+    Builds distinct cleaned review texts, so no score can be reused.
+    
+    Args:
+        rows (int): Number of reviews
+    
+    Returns:
+        list: Cleaned review texts
+    """
+    
+    texts = pd.concat(
+        (chunk['review_text'] for chunk in generate_synthetic_reviews("Benchmark", rows)),
+        ignore_index=True
+    )
+    texts = texts + pd.Series([f" take {i}" for i in range(rows)])
+    return clean_texts(texts)[0].tolist()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark sentiment scoring')
+    parser.add_argument('--rows', type=int, default=100_000, help='Number of reviews')
+    args = parser.parse_args()
+    
+    texts = build_texts(args.rows)
+    analyzer = initialize_sentiment_analyzer()
+    scorer = BatchSentimentScorer(analyzer)
+    print(f"\nScoring {len(texts):,} distinct reviews")
+    print("-" * 60)
+    
+    start = time.perf_counter()
+    expected = [analyze_sentiment(text, analyzer) for text in texts]
+    reference_seconds = time.perf_counter() - start
+    print(f"  analyze_sentiment per review   {reference_seconds:7.2f} s")
+    
+    start = time.perf_counter()
+    scores = scorer.score(texts)
+    batch_seconds = time.perf_counter() - start
+    print(f"  BatchSentimentScorer           {batch_seconds:7.2f} s   {reference_seconds / batch_seconds:5.1f}x")
+    
+    difference = max(abs(score - reference) for score, reference in zip(scores.tolist(), expected))
+    assert difference <= SCORE_TOLERANCE, f"Scores differ by up to {difference}"
+    print(f"  ✓ Largest difference {difference:g} (tolerance {SCORE_TOLERANCE:g})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,199 @@
+"""
+Matplotlib-free chart output.
+Charts are described as small JSON specs, which static/results.js draws in
+the browser, or rendered here to a compact SVG string. Neither needs
+matplotlib or a file in plots/.
+"""
+
+import math
+from xml.sax.saxutils import escape
+
+from config import CHART_SVG_SIZE
+
+# Output formats of the sentiment chart: a PNG file drawn by matplotlib,
+# an inline SVG string or a JSON spec rendered by the frontend
+CHART_FORMATS = ('png', 'svg', 'json')
+
+# Colors for each sentiment
+SENTIMENT_COLORS = {
+    'positive': '#2ecc71',   # Green
+    'neutral': '#95a5a6',    # Gray
+    'negative': '#e74c3c'    # Red
+}
+
+DEFAULT_BAR_COLOR = '#3498db'
+
+# Space around the plot area of an SVG chart: left, right, top, bottom
+SVG_MARGINS = (64, 16, 48, 48)
+
+
+def sentiment_chart_spec(sentiment_distribution, movie_name):
+    """
+    Describes the sentiment distribution bar chart.
+    
+    Args:
+        sentiment_distribution (dict): Dictionary with sentiment counts
+        movie_name (str): Name of the movie
+    
+    Returns:
+        dict: JSON-serializable bar chart spec
+    """
+    
+    return {
+        'type': 'bar',
+        'title': f'Sentiment Distribution - {movie_name}',
+        'x_label': 'Sentiment',
+        'y_label': 'Number of Reviews',
+        'bars': [{'label': label, 'value': int(value), 'color': SENTIMENT_COLORS.get(label, DEFAULT_BAR_COLOR)}
+                 for label, value in sentiment_distribution.items()]
+    }
+
+
+def score_histogram_spec(histogram, movie_name, avg_sentiment=None):
+    """
+    Describes the sentiment score histogram.
+    
+    Args:
+        histogram (dict): 'bin_edges' and 'counts' of the score histogram
+        movie_name (str): Name of the movie
+        avg_sentiment (float): Average score to mark on the chart (optional)
+    
+    Returns:
+        dict: JSON-serializable histogram spec
+    """
+    
+    return {
+        'type': 'histogram',
+        'title': f'Sentiment Score Distribution - {movie_name}',
+        'x_label': 'Sentiment Score',
+        'y_label': 'Frequency',
+        'bin_edges': [float(edge) for edge in histogram['bin_edges']],
+        'counts': [int(count) for count in histogram['counts']],
+        'average': None if avg_sentiment is None else float(avg_sentiment),
+        'color': DEFAULT_BAR_COLOR
+    }
+
+
+def sentiment_chart(sentiment_distribution, movie_name, chart_format):
+    """
+    Builds the sentiment chart in one of the formats that need no matplotlib.
+    
+    Args:
+        sentiment_distribution (dict): Dictionary with sentiment counts
+        movie_name (str): Name of the movie
+        chart_format (str): 'svg' or 'json'
+    
+    Returns:
+        str or dict: SVG markup for 'svg', the chart spec for 'json'
+    """
+    
+    if chart_format not in ('svg', 'json'):
+        raise ValueError(f"Unsupported chart format without matplotlib: {chart_format}")
+    
+    spec = sentiment_chart_spec(sentiment_distribution, movie_name)
+    return render_svg(spec) if chart_format == 'svg' else spec
+
+
+def _nice_ticks(top, count=5):
+    """Y-axis ticks from 0 to at least top, spaced 1, 2 or 5 times a power of ten (at least 1)."""
+    
+    raw_step = max(top, 1) / (count - 1)
+    magnitude = 10 ** math.floor(math.log10(raw_step))
+    step = max(1, next(m * magnitude for m in (1, 2, 5, 10) if m * magnitude >= raw_step))
+    return [i * step for i in range(math.ceil(max(top, 1) / step) + 1)]
+
+
+def _number(value):
+    """Short form of a coordinate or tick value."""
+    
+    return f'{round(value, 1):g}'
+
+
+def render_svg(spec, size=CHART_SVG_SIZE):
+    """
+    Renders a chart spec to a standalone SVG document.
+    
+    Args:
+        spec (dict): Spec from sentiment_chart_spec or score_histogram_spec
+        size (tuple): Width and height in pixels
+    
+    Returns:
+        str: SVG markup
+    """
+    
+    width, height = size
+    left, right, top, bottom = SVG_MARGINS
+    x0, x1, y0, y1 = left, width - right, top, height - bottom
+    
+    if spec['type'] == 'bar':
+        values = [bar['value'] for bar in spec['bars']]
+        y_max = max(values, default=0) * 1.15
+    elif spec['type'] == 'histogram':
+        values = spec['counts']
+        y_max = max(values, default=0) * 1.05
+    else:
+        raise ValueError(f"Unknown chart type: {spec['type']}")
+    
+    ticks = _nice_ticks(y_max)
+    
+    def y(value):
+        return y1 - (y1 - y0) * value / ticks[-1]
+    
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width} {height}" width="{width}" '
+        f'height="{height}" font-family="sans-serif" font-size="12">',
+        f'<text x="{width / 2:g}" y="{top / 2:g}" text-anchor="middle" font-size="16" '
+        f'font-weight="bold">{escape(spec["title"])}</text>'
+    ]
+    
+    # Grid lines and y-axis tick labels
+    for tick in ticks:
+        parts.append(f'<line x1="{x0}" y1="{_number(y(tick))}" x2="{x1}" y2="{_number(y(tick))}" '
+                     f'stroke="#ccc" stroke-dasharray="4 3"/>')
+        parts.append(f'<text x="{x0 - 6}" y="{_number(y(tick) + 4)}" text-anchor="end">{tick:g}</text>')
+    
+    if spec['type'] == 'bar':
+        slot = (x1 - x0) / max(len(values), 1)
+        for i, bar in enumerate(spec['bars']):
+            bar_x = x0 + slot * (i + 0.2)
+            center = x0 + slot * (i + 0.5)
+            parts.append(f'<rect x="{_number(bar_x)}" y="{_number(y(bar["value"]))}" width="{_number(slot * 0.6)}" '
+                         f'height="{_number(y1 - y(bar["value"]))}" fill="{bar["color"]}" stroke="#000" '
+                         f'stroke-width="1.5"/>')
+            parts.append(f'<text x="{_number(center)}" y="{_number(y(bar["value"]) - 5)}" text-anchor="middle" '
+                         f'font-weight="bold">{bar["value"]}</text>')
+            parts.append(f'<text x="{_number(center)}" y="{y1 + 16}" text-anchor="middle">'
+                         f'{escape(str(bar["label"]))}</text>')
+    else:
+        edges = spec['bin_edges']
+        margin = (edges[-1] - edges[0]) * 0.05
+        low, high = edges[0] - margin, edges[-1] + margin
+        
+        def x(value):
+            return x0 + (x1 - x0) * (value - low) / (high - low)
+        
+        for left_edge, right_edge, count in zip(edges, edges[1:], values):
+            parts.append(f'<rect x="{_number(x(left_edge))}" y="{_number(y(count))}" '
+                         f'width="{_number(x(right_edge) - x(left_edge))}" height="{_number(y1 - y(count))}" '
+                         f'fill="{spec["color"]}" fill-opacity="0.7" stroke="#000" stroke-width="0.5"/>')
+        
+        for i in range(5):
+            tick = edges[0] + (edges[-1] - edges[0]) * i / 4
+            parts.append(f'<text x="{_number(x(tick))}" y="{y1 + 16}" text-anchor="middle">{tick:g}</text>')
+        
+        if spec['average'] is not None:
+            average_x = _number(x(spec['average']))
+            parts.append(f'<line x1="{average_x}" y1="{y0}" x2="{average_x}" y2="{y1}" stroke="red" '
+                         f'stroke-width="2" stroke-dasharray="6 4"/>')
+            parts.append(f'<text x="{x1 - 4}" y="{y0 + 14}" text-anchor="end" fill="red">'
+                         f'Average: {spec["average"]:.3f}</text>')
+    
+    # Axes and axis labels
+    parts.append(f'<path d="M{x0} {y0}V{y1}H{x1}" fill="none" stroke="#000"/>')
+    parts.append(f'<text x="{_number((x0 + x1) / 2)}" y="{height - 12}" text-anchor="middle" '
+                 f'font-weight="bold">{escape(spec["x_label"])}</text>')
+    parts.append(f'<text transform="translate(16 {_number((y0 + y1) / 2)}) rotate(-90)" text-anchor="middle" '
+                 f'font-weight="bold">{escape(spec["y_label"])}</text>')
+    parts.append('</svg>')
+    
+    return ''.join(parts)
@@ -19,15 +19,91 @@ STATIC_DIR = 'static'
 MAX_REVIEWS = 50
 REQUEST_TIMEOUT = 10
 RETRY_ATTEMPTS = 3
+LETTERBOXD_BASE_URL = 'https://letterboxd.com'
+REVIEWS_PER_PAGE = 12       # Reviews Letterboxd lists on each review page
+SCRAPER_WORKERS = 4         # Concurrent page fetches in paginated mode
+SCRAPER_POOL_SIZE = 10      # Keep-alive connections held by the shared session
+HTML_PARSER = 'lxml'        # Review extraction backend: 'lxml' (about 6-10x faster) or 'full' (BeautifulSoup)
+
+# Rate Limiting & Retries
+SCRAPER_RATE_LIMIT = 4.0        # Starting requests per second per host
+SCRAPER_RATE_LIMIT_MIN = 0.5    # Floor the rate backs off to when the site throttles us
+SCRAPER_RATE_LIMIT_MAX = 10.0   # Ceiling the rate recovers towards after successful requests
+SCRAPER_BURST = 8               # Requests allowed back-to-back before the rate applies
+SCRAPER_HOST_CONCURRENCY = 4    # Simultaneous in-flight requests per host
+RETRY_BACKOFF_BASE = 0.5        # Seconds; doubled on each retry, with jitter
+RETRY_BACKOFF_MAX = 30          # Upper bound on any single retry wait (including Retry-After)
+
+# Incremental Scraping
+CORPUS_DIR = 'data/corpus'                  # Stored reviews per movie
+WATERMARKS_FILE = 'data/watermarks.json'    # Newest review seen per movie
+
+# HTTP Response Cache
+USE_HTTP_CACHE = True
+HTTP_CACHE_DIR = 'data/http_cache'
+HTTP_CACHE_TTL = 3600                       # Seconds a cached page is served without revalidation
+HTTP_CACHE_MAX_BYTES = 200 * 1024 * 1024    # Least recently used pages are evicted past this size
+
+# Preprocessing Settings
+PREPROCESS_CHUNK_SIZE = 100000  # Reviews per chunk in preprocess_reviews_chunked
+
+# Parallel Processing
+PARALLEL_WORKERS = 0            # Worker processes for bulk cleaning and scoring (0 = one per CPU core, 1 = off)
+PARALLEL_MIN_ROWS = 20000       # Smaller inputs stay in-process, where pool overhead would dominate
+PARALLEL_SHARDS_PER_WORKER = 4  # Shards per worker, so uneven shards still keep every core busy
 
 # Analysis Settings
 SENTIMENT_POSITIVE_THRESHOLD = 0.05
 SENTIMENT_NEGATIVE_THRESHOLD = -0.05
+PRELOAD_SENTIMENT_ANALYZER = True  # Load the VADER lexicon when the app starts instead of on the first request
+SENTIMENT_ENGINE = 'vectorized'     # 'vectorized' (batch NumPy scorer) or 'vader' (polarity_scores per review)
+
+# Score Sketches
+SKETCH_HISTOGRAM_BINS = 20      # Equal-width bins over -1..1 for score distribution charts
+SKETCH_QUANTILE_K = 200         # KLL sketch size; rank error is about 1.7 / k
+TOP_REVIEWS_K = 5               # Most positive / most negative reviews kept per movie
+TOP_REVIEWS_MAX_MOVIES = 1000   # Movies whose top reviews the app keeps for /api/movies/<name>/top-reviews
+
+# Sentiment Score Cache
+USE_SCORE_CACHE = True
+SCORE_CACHE_FILE = 'data/sentiment_cache.sqlite'   # Scores of every text seen, kept across restarts
+SCORE_CACHE_MAX_ENTRIES = 100000                    # Most recently used scores also held in memory
+
+# Pipeline Stage Cache
+USE_STAGE_CACHE = True
+STAGE_CACHE_MAX_ENTRIES = 256   # Stage outputs of /api/analyze kept in memory; least recently used dropped first
+STAGE_CACHE_MAX_BYTES = 512 * 1024 * 1024   # Total size of those outputs (DataFrames by memory_usage(deep=True))
 
 # Visualization Settings
 CHART_DPI = 100
-CHART_FORMAT = 'png'
+CHART_FORMAT = 'png'             # Sentiment chart of /api/analyze: 'png' (matplotlib), 'svg' or 'json' (no matplotlib)
+CHART_SVG_SIZE = (600, 360)      # Width and height of SVG charts in pixels
 CHART_FIGSIZE = (10, 6)
+CHART_TEMPLATE_POOL_SIZE = 4    # Idle pre-built figures kept per chart type for reuse
+
+# Chart Render Cache
+CHART_CACHE = True                      # Skip rendering when the chart file was drawn from the same inputs
+PLOTS_MAX_BYTES = 100 * 1024 * 1024     # plots/ is pruned to this size, least recently used charts first
+PLOTS_MAX_AGE = 7 * 24 * 3600           # Seconds a chart may go unused before it is deleted
+
+# Background Chart Rendering
+CHART_RENDER_ASYNC = True       # Draw PNG charts on worker threads; /api/analyze returns before they are saved
+CHART_RENDER_WORKERS = 2
+CHART_RENDER_QUEUE_SIZE = 32    # Charts queued or rendering at once; beyond this they are drawn during the request
+CHART_WAIT_TIMEOUT = 5.0        # Seconds /plots/<filename> waits for a chart being drawn before answering 202
+CHART_FAILURE_TTL = 600         # Seconds a failed render is reported before the chart counts as missing
+
+# Analysis Jobs (/api/jobs)
+ANALYSIS_JOB_WORKERS = 4        # Analyses run at once in the background
+ANALYSIS_JOB_QUEUE_SIZE = 32    # Jobs queued or running at once; /api/jobs answers 429 beyond this
+ANALYSIS_JOB_TTL = 3600         # Seconds a finished job and its result are kept
+
+# Storage Settings
+STORAGE_FORMAT = 'parquet'          # Pipeline data files: 'parquet', 'feather' or 'csv' (needs no pyarrow)
+COLUMNAR_COMPRESSION = 'zstd'       # Compression codec for Parquet / Feather files
+PERSIST_INTERMEDIATES = True        # Save raw/clean/analyzed reviews from /api/analyze to data/
+PERSIST_ASYNC = True                # Write them in the background instead of during the request
+COMPACT_DTYPES = True               # Categorical text columns, numeric star ratings and 32-bit numbers (see schema.py)
 
 # File Names
 RAW_REVIEWS_FILE = 'reviews_raw.csv'
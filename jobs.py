@@ -0,0 +1,158 @@
+"""
+Background analysis jobs.
+Long-running work is submitted as a job and run on a worker pool, so the
+request that submits it returns at once with a job ID to poll.
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from config import ANALYSIS_JOB_WORKERS, ANALYSIS_JOB_QUEUE_SIZE, ANALYSIS_JOB_TTL
+
+
+def _timestamp(seconds):
+    return None if seconds is None else datetime.fromtimestamp(seconds).strftime('%Y-%m-%d %H:%M:%S')
+
+
+class JobManager:
+    """
+    Runs jobs on a thread pool and keeps their results for a while.
+    
+    At most max_pending jobs are queued or running at once; submit refuses
+    more, so callers can push back (e.g. HTTP 429) instead of piling up work.
+    Finished jobs are kept for ttl seconds after they finish and dropped
+    on the next submit or lookup after that.
+    """
+    
+    def __init__(self, workers=ANALYSIS_JOB_WORKERS, max_pending=ANALYSIS_JOB_QUEUE_SIZE, ttl=ANALYSIS_JOB_TTL):
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='job')
+        self._jobs = OrderedDict()      # job_id -> job state, in order of submission
+        self._lock = threading.Lock()
+        self._pending = 0
+    
+    def submit(self, func, *args, **kwargs):
+        """
+        Queues a job.
+        
+        Args:
+            func (callable): Work to run; its return value is the job result
+            *args, **kwargs: Arguments for func
+        
+        Returns:
+            str: Job ID, or None if the queue is full
+        """
+        
+        with self._lock:
+            self._expire()
+            
+            if self._pending >= self.max_pending:
+                return None
+            
+            job_id = uuid.uuid4().hex
+            self._jobs[job_id] = {
+                'job_id': job_id,
+                'status': 'queued',
+                'submitted_at': time.time(),
+                'started_at': None,
+                'finished_at': None,
+                'result': None,
+                'error': None
+            }
+            self._pending += 1
+        
+        self._executor.submit(self._run, job_id, func, args, kwargs)
+        return job_id
+    
+    def _run(self, job_id, func, args, kwargs):
+        with self._lock:
+            job = self._jobs[job_id]
+            job['status'] = 'running'
+            job['started_at'] = time.time()
+        
+        try:
+            result, error = func(*args, **kwargs), None
+        except Exception as e:
+            print(f"✗ Job {job_id} failed: {str(e)}")
+            result, error = None, str(e)
+        
+        with self._lock:
+            job['status'] = 'failed' if error else 'done'
+            job['result'] = result
+            job['error'] = error
+            job['finished_at'] = time.time()
+            self._pending -= 1
+    
+    def _expire(self):
+        """Drops finished jobs older than the TTL. Called with the lock held."""
+        
+        cutoff = time.time() - self.ttl
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job['finished_at'] is not None and job['finished_at'] < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+    
+    def get(self, job_id):
+        """
+        Looks up a job.
+        
+        Args:
+            job_id (str): ID returned by submit
+        
+        Returns:
+            dict: 'job_id', 'status' ('queued', 'running', 'done' or 'failed'),
+                timestamps, and 'result' / 'error' once finished; None if the
+                job is unknown or has expired
+        """
+        
+        with self._lock:
+            self._expire()
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            job = dict(job)
+        
+        for key in ('submitted_at', 'started_at', 'finished_at'):
+            job[key] = _timestamp(job[key])
+        return job
+    
+    def get_stats(self):
+        """
+        Returns:
+            dict: Number of jobs by status and the queue limit
+        """
+        
+        with self._lock:
+            self._expire()
+            stats = {status: 0 for status in ('queued', 'running', 'done', 'failed')}
+            for job in self._jobs.values():
+                stats[job['status']] += 1
+        
+        stats['max_pending'] = self.max_pending
+        return stats
+
+
+_job_manager = None
+_job_manager_lock = threading.Lock()
+
+
+def get_job_manager():
+    """
+    Returns the shared job manager.
+    
+    Returns:
+        JobManager: Shared job manager instance
+    """
+    
+    global _job_manager
+    
+    with _job_manager_lock:
+        if _job_manager is None:
+            _job_manager = JobManager()
+    
+    return _job_manager
@@ -0,0 +1,150 @@
+"""
+Process-pool helpers for CPU-bound, per-review work such as text cleaning and sentiment scoring.
+Splits a list of values into contiguous shards, processes them on worker processes
+and reassembles the results in the original order.
+"""
+
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from config import PARALLEL_WORKERS, PARALLEL_MIN_ROWS, PARALLEL_SHARDS_PER_WORKER
+
+
+# Worker pools are expensive to start, so they are kept and reused per (workers, initializer)
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def resolve_workers(workers, n_rows):
+    """
+    Decides how many worker processes to use for a job.
+    
+    Args:
+        workers (int): Requested workers; None uses PARALLEL_WORKERS, 0 or less
+            means one per CPU core. Inputs smaller than PARALLEL_MIN_ROWS only
+            run in parallel when workers is given explicitly.
+        n_rows (int): Number of values to process
+    
+    Returns:
+        int: Number of workers (1 means run in-process)
+    """
+    
+    from_config = workers is None
+    if from_config:
+        workers = PARALLEL_WORKERS
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    
+    if from_config and n_rows < PARALLEL_MIN_ROWS:
+        return 1
+    
+    return max(1, min(workers, n_rows))
+
+
+def _get_context():
+    # forkserver avoids forking a parent that may be running other threads
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('forkserver')
+    return multiprocessing.get_context('spawn')
+
+
+def get_process_pool(workers, initializer=None):
+    """
+    Returns a shared process pool, starting it on first use.
+    
+    Args:
+        workers (int): Number of worker processes
+        initializer (callable): Module-level function run once in each worker
+    
+    Returns:
+        ProcessPoolExecutor: Pool
+    """
+    
+    key = (workers, initializer)
+    
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=_get_context(), initializer=initializer)
+            _pools[key] = pool
+    
+    return pool
+
+
+def split_shards(values, n_shards):
+    """
+    Splits a list into at most n_shards contiguous, nearly equal slices.
+    
+    Args:
+        values (list): Values to split
+        n_shards (int): Number of shards
+    
+    Returns:
+        list: Non-empty slices, in order
+    """
+    
+    n_shards = max(1, min(n_shards, len(values)))
+    size, extra = divmod(len(values), n_shards)
+    
+    shards = []
+    start = 0
+    for i in range(n_shards):
+        end = start + size + (1 if i < extra else 0)
+        shards.append(values[start:end])
+        start = end
+    
+    return shards
+
+
+def map_shards(func, values, workers, initializer=None):
+    """
+    Applies func to shards of values on a process pool.
+    
+    Args:
+        func (callable): Module-level function taking a list and returning a
+            list of the same length
+        values (list): Values to process
+        workers (int): Number of worker processes
+        initializer (callable): Module-level function run once in each worker
+    
+    Returns:
+        list: Concatenated results, in the order of values
+    """
+    
+    if not values:
+        return []
+    
+    shards = split_shards(values, workers * PARALLEL_SHARDS_PER_WORKER)
+    pool = get_process_pool(workers, initializer)
+    
+    results = []
+    try:
+        # map yields results in submission order, whichever worker finishes first
+        for shard_result in pool.map(func, shards):
+            results.extend(shard_result)
+    except BrokenProcessPool:
+        # A worker died; drop the pool so the next call starts a fresh one
+        with _pools_lock:
+            if _pools.get((workers, initializer)) is pool:
+                del _pools[(workers, initializer)]
+        raise
+    
+    return results
+
+
+def shutdown_pools():
+    """Stops all worker pools."""
+    
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    
+    for pool in pools:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+atexit.register(shutdown_pools)
@@ -0,0 +1,398 @@
+"""
+Analysis pipelines.
+Cleans and scores reviews batch by batch as they are scraped, keeping running
+statistics, and runs the steps of a full analysis as a DAG of cached stages.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+import pandas as pd
+
+from config import (MAX_REVIEWS, USE_STAGE_CACHE, STAGE_CACHE_MAX_ENTRIES, STAGE_CACHE_MAX_BYTES,
+                    SENTIMENT_POSITIVE_THRESHOLD, SENTIMENT_NEGATIVE_THRESHOLD, CHART_FORMAT)
+from scraper import iter_review_pages, iter_sample_reviews, scrape_letterboxd_reviews, get_sample_reviews
+from preprocessor import preprocess_batch, preprocess_reviews
+from analyzer import get_sentiment_analyzer, analyze_batch, score_reviews, classify_scores, SentimentAggregator
+from chart_specs import sentiment_chart
+from storage import ReviewWriter
+
+
+def iter_review_batches(movie_name, max_reviews=MAX_REVIEWS, use_sample_fallback=True):
+    """
+    Yields batches of raw reviews, scraped page by page.
+    Falls back to sample reviews if scraping yields nothing.
+    
+    Args:
+        movie_name (str): Name of the movie
+        max_reviews (int): Maximum number of reviews to fetch
+        use_sample_fallback (bool): Use sample reviews when scraping yields nothing
+    
+    Yields:
+        list: Raw review dictionaries
+    """
+    
+    scraped_any = False
+    
+    try:
+        for page_reviews in iter_review_pages(movie_name, max_reviews):
+            scraped_any = True
+            yield page_reviews
+    except Exception as e:
+        print(f"✗ Error during scraping: {str(e)}")
+    
+    if not scraped_any and use_sample_fallback:
+        print("⚠ Using sample reviews (actual scraping unavailable)")
+        sent = 0
+        for batch in iter_sample_reviews(movie_name):
+            batch = batch[:max_reviews - sent]
+            if not batch:
+                break
+            sent += len(batch)
+            yield batch
+
+
+def stream_analysis(review_batches, output_filepath=None, positive_threshold=SENTIMENT_POSITIVE_THRESHOLD,
+                    negative_threshold=SENTIMENT_NEGATIVE_THRESHOLD):
+    """
+    Cleans and scores each batch of reviews as it arrives.
+    
+    Only the current batch is held in memory, so time to first result and
+    peak memory do not depend on the total number of reviews.
+    
+    Args:
+        review_batches (iterable): Batches of raw review dictionaries
+        output_filepath (str): Optional CSV / Parquet / Feather path for the analyzed reviews.
+            It is replaced once all batches are done; if the stream stops early
+            (e.g. the client disconnects) the existing file is left as it was.
+        positive_threshold (float): Scores above this are positive
+        negative_threshold (float): Scores below this are negative
+    
+    Yields:
+        tuple: (analyzed batch DataFrame, SentimentAggregator after that batch)
+    """
+    
+    analyzer = get_sentiment_analyzer()
+    stats = SentimentAggregator()
+    writer = ReviewWriter(output_filepath) if output_filepath else None
+    completed = False
+    
+    try:
+        for batch in review_batches:
+            df = preprocess_batch(pd.DataFrame(batch))
+            if len(df) == 0:
+                continue
+            
+            df = analyze_batch(df, analyzer, positive_threshold=positive_threshold,
+                               negative_threshold=negative_threshold)
+            stats.update(df)
+            
+            if writer:
+                writer.write(df)
+            
+            yield df, stats
+        
+        completed = True
+    finally:
+        if writer and completed:
+            writer.close()
+        elif writer:
+            writer.abort()
+
+
+class StageCache:
+    """
+    Outputs of pipeline stages held in memory by stage key.
+    
+    Least recently used outputs are dropped past max_entries, or once the
+    outputs together take more than max_bytes; an output larger than
+    max_bytes on its own is not stored. Outputs are shared between runs, so
+    stages must return new objects rather than modify their inputs.
+    """
+    
+    def __init__(self, max_entries=STAGE_CACHE_MAX_ENTRIES, max_bytes=STAGE_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()   # key -> (output, size in bytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        """
+        Args:
+            key (str): Stage key
+        
+        Returns:
+            tuple: (found, output)
+        """
+        
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return False, None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, self._entries[key][0]
+    
+    def put(self, key, output):
+        """
+        Args:
+            key (str): Stage key
+            output: Stage output
+        """
+        
+        size = _output_size(output)
+        
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            
+            if size > self.max_bytes:
+                return
+            
+            self._entries[key] = (output, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._bytes -= self._entries.popitem(last=False)[1][1]
+    
+    def get_stats(self):
+        """
+        Returns:
+            dict: Hits, misses, number of stored outputs and their total size in bytes
+        """
+        
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries), 'bytes': self._bytes}
+    
+    def clear(self):
+        """Drops all stored outputs."""
+        
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+def _output_size(output):
+    """Approximate memory held by a stage output, in bytes."""
+    
+    if isinstance(output, pd.DataFrame):
+        return int(output.memory_usage(deep=True).sum())
+    return sys.getsizeof(output)
+
+
+_stage_cache = None
+_stage_cache_lock = threading.Lock()
+
+
+def get_stage_cache():
+    """
+    Returns the shared stage cache, or None if stage caching is disabled in config.
+    
+    Returns:
+        StageCache: Shared cache instance
+    """
+    
+    global _stage_cache
+    
+    if not USE_STAGE_CACHE:
+        return None
+    
+    with _stage_cache_lock:
+        if _stage_cache is None:
+            _stage_cache = StageCache()
+    
+    return _stage_cache
+
+
+def fingerprint(value):
+    """
+    Hashes the content of a stage output: DataFrames by their columns, types
+    and values, anything else by its JSON form.
+    
+    Args:
+        value: Stage output
+    
+    Returns:
+        str: Content hash
+    """
+    
+    digest = hashlib.blake2b(digest_size=16)
+    
+    if isinstance(value, pd.DataFrame):
+        digest.update(json.dumps([[str(column), str(dtype)] for column, dtype in value.dtypes.items()]).encode('utf-8'))
+        digest.update(pd.util.hash_pandas_object(value, index=False).to_numpy().tobytes())
+    else:
+        digest.update(json.dumps(value, sort_keys=True, default=str).encode('utf-8'))
+    
+    return digest.hexdigest()
+
+
+def _stage_key(parts):
+    return hashlib.blake2b(json.dumps(parts, sort_keys=True, default=str).encode('utf-8'), digest_size=16).hexdigest()
+
+
+class StageGraph:
+    """
+    Pipeline stages run as a small DAG with content-hashed caching.
+    
+    A stage's key hashes its name, its parameters and the keys of its
+    inputs, so a stage only reruns when something it depends on changed;
+    otherwise its output comes from the stage cache. Source stages (such as
+    scraping) run every time and are keyed by a hash of what they produced,
+    so unchanged data reuses every stage downstream of them.
+    """
+    
+    def __init__(self, cache=None):
+        """
+        Args:
+            cache (StageCache): Stage cache (default: the shared cache from config; False disables it)
+        """
+        
+        self.cache = get_stage_cache() if cache is None else (cache or None)
+        self.outputs = {}
+        self.keys = {}
+        self.ran = []
+        self.reused = []
+        self._stages = {}
+    
+    def add(self, name, func, inputs=(), params=None, source=False):
+        """
+        Adds a stage.
+        
+        Args:
+            name (str): Stage name
+            func (callable): Called with the outputs of inputs, in order, and params as keyword arguments
+            inputs (tuple): Names of the stages whose outputs func takes (added before this one)
+            params (dict): Settings passed to func; part of the stage key, so must be JSON-serializable
+            source (bool): Always run the stage and key it by the content of its output
+        
+        Returns:
+            StageGraph: self, for chaining
+        """
+        
+        missing = [input_name for input_name in inputs if input_name not in self._stages]
+        if missing:
+            raise ValueError(f"Stage {name} depends on unknown stages: {', '.join(missing)}")
+        
+        self._stages[name] = {
+            'func': func,
+            'inputs': tuple(inputs),
+            'params': dict(params or {}),
+            'source': source
+        }
+        return self
+    
+    def run(self, name):
+        """
+        Returns the output of a stage, running it and the stages it depends on only as needed.
+        
+        Args:
+            name (str): Stage name
+        
+        Returns:
+            Stage output
+        """
+        
+        if name in self.outputs:
+            return self.outputs[name]
+        
+        stage = self._stages[name]
+        args = [self.run(input_name) for input_name in stage['inputs']]
+        key_parts = {
+            'stage': name,
+            'params': stage['params'],
+            'inputs': [self.keys[input_name] for input_name in stage['inputs']]
+        }
+        
+        if stage['source']:
+            output = stage['func'](*args, **stage['params'])
+            key_parts['output'] = fingerprint(output)
+            self.ran.append(name)
+            key = _stage_key(key_parts)
+        else:
+            key = _stage_key(key_parts)
+            found, output = self.cache.get(key) if self.cache else (False, None)
+            
+            if found:
+                print(f"✓ Reusing cached {name} stage")
+                self.reused.append(name)
+            else:
+                output = stage['func'](*args, **stage['params'])
+                self.ran.append(name)
+                if self.cache and output is not None:
+                    self.cache.put(key, output)
+        
+        self.outputs[name] = output
+        self.keys[name] = key
+        return output
+
+
+def _scrape_stage(movie_name, max_reviews):
+    # Try to scrape real reviews, fall back to sample if it fails
+    reviews = scrape_letterboxd_reviews(movie_name, max_reviews=max_reviews)
+    
+    if not reviews:
+        print("⚠ Using sample reviews (actual scraping unavailable)")
+        reviews = get_sample_reviews(movie_name)[:max_reviews]
+    
+    return reviews
+
+
+def _classify_stage(df_scored, positive_threshold, negative_threshold):
+    classes = classify_scores(df_scored['sentiment_score'], positive_threshold, negative_threshold)
+    return df_scored.assign(sentiment_class=classes)
+
+
+def _stats_stage(df_analyzed):
+    return SentimentAggregator().update(df_analyzed)
+
+
+def _chart_spec_stage(stats, movie_name, chart_format):
+    return sentiment_chart(stats.get_distribution(), movie_name, chart_format)
+
+
+def build_analysis_graph(movie_name, max_reviews=MAX_REVIEWS, positive_threshold=SENTIMENT_POSITIVE_THRESHOLD,
+                         negative_threshold=SENTIMENT_NEGATIVE_THRESHOLD, cache=None, chart_format=CHART_FORMAT):
+    """
+    Builds the stages of a full movie analysis:
+    scrape -> clean -> score -> classify -> stats -> chart.
+    
+    Scraping runs every time (pages come from the HTTP cache while fresh);
+    later stages rerun only when their input or parameters changed. New
+    thresholds, for example, rerun classify, stats and chart but reuse the
+    scores, so VADER is not run again.
+    
+    The chart stage returns the chart as an SVG string or JSON spec (see
+    chart_specs), which needs no matplotlib. PNG charts are files drawn off
+    the request by visualizer.ChartRenderQueue, so for 'png' the graph ends
+    at stats.
+    
+    Args:
+        movie_name (str): Name of the movie
+        max_reviews (int): Maximum number of reviews to scrape
+        positive_threshold (float): Scores above this are positive
+        negative_threshold (float): Scores below this are negative
+        cache (StageCache): Stage cache (default: the shared cache from config; False disables it)
+        chart_format (str): 'png', 'svg' or 'json'
+    
+    Returns:
+        StageGraph: Graph whose stages are run with graph.run(name)
+    """
+    
+    graph = StageGraph(cache)
+    graph.add('scrape', _scrape_stage, params={'movie_name': movie_name, 'max_reviews': max_reviews}, source=True)
+    graph.add('clean', preprocess_reviews, inputs=('scrape',))
+    graph.add('score', score_reviews, inputs=('clean',))
+    graph.add('classify', _classify_stage, inputs=('score',),
+              params={'positive_threshold': positive_threshold, 'negative_threshold': negative_threshold})
+    graph.add('stats', _stats_stage, inputs=('classify',))
+    if chart_format != 'png':
+        graph.add('chart', _chart_spec_stage, inputs=('stats',),
+                  params={'movie_name': movie_name, 'chart_format': chart_format})
+    return graph
@@ -6,6 +6,35 @@ Handles text cleaning, normalization, and feature extraction.
 import pandas as pd
 import re
 
+from config import PREPROCESS_CHUNK_SIZE, COMPACT_DTYPES
+from storage import read_reviews, iter_reviews, ReviewWriter, as_review_frame, persist_reviews
+from parallel import resolve_workers, map_shards
+from schema import compact_reviews
+
+
+# Raw text columns are always read as text, so values like '007' or an
+# all-empty chunk keep the same type in every chunk and storage format
+_RAW_TEXT_DTYPES = {'movie_name': str, 'reviewer': str, 'rating': str, 'review_text': str, 'date': str}
+
+
+# Patterns used by clean_text, compiled once
+_URL_PATTERN = re.compile(r'http\S+|www\S+|https\S+', flags=re.MULTILINE)
+# An email match always spans a whole word, so it is only tried where a word starts
+_EMAIL_PATTERN = re.compile(r'(?<!\S)\S+@\S+')
+_SPECIAL_CHARS_PATTERN = re.compile(r'[^a-zA-Z0-9\s\.\!\?\,\:]')
+
+# clean_texts filters characters with one bytes.translate pass instead of
+# _SPECIAL_CHARS_PATTERN: ASCII characters the pattern removes are deleted,
+# whitespace becomes a space and non-ASCII characters are dropped when encoding.
+# Texts are joined with a whitespace character that str.split also splits on.
+_TEXT_SEPARATOR = '\x1e'
+_TEXT_SEPARATOR_BYTE = _TEXT_SEPARATOR.encode('ascii')
+_ASCII_SPACES = bytes(code for code in range(128) if chr(code).isspace() and chr(code) != _TEXT_SEPARATOR)
+_ASCII_SPACE_TABLE = bytes.maketrans(_ASCII_SPACES, b' ' * len(_ASCII_SPACES))
+_ASCII_DELETED_CHARS = bytes(code for code in range(128) if _SPECIAL_CHARS_PATTERN.match(chr(code)))
+_UNICODE_SPACE_PATTERN = re.compile(r'[^\S\x00-\x7f]')
+_SPACE_RUN_PATTERN = re.compile(rb'  +')
+
 
 def clean_text(text):
     """
@@ -25,13 +54,13 @@ def clean_text(text):
     text = text.lower()
     
     # Remove URLs
-    text = re.sub(r'http\S+|www\S+|https\S+', '', text, flags=re.MULTILINE)
+    text = _URL_PATTERN.sub('', text)
     
     # Remove email addresses
-    text = re.sub(r'\S+@\S+', '', text)
+    text = _EMAIL_PATTERN.sub('', text)
     
     # Remove special characters but keep spaces and basic punctuation
-    text = re.sub(r'[^a-zA-Z0-9\s\.\!\?\,\:]', '', text)
+    text = _SPECIAL_CHARS_PATTERN.sub('', text)
     
     # Remove extra whitespace
     text = ' '.join(text.split())
@@ -39,6 +68,96 @@ def clean_text(text):
     return text
 
 
+def clean_texts(texts, workers=1):
+    """
+    Cleans a whole column of review texts and counts their words in one sweep.
+    Produces exactly the same text as clean_text and the same counts as count_words.
+    Repeated texts are only cleaned once.
+    
+    Args:
+        texts (Series): Raw review texts
+        workers (int): Worker processes to spread the texts over (1 = in-process)
+    
+    Returns:
+        tuple: (cleaned texts Series, word counts Series), both aligned with texts.index
+    """
+    
+    if workers > 1:
+        cleaned = map_shards(_clean_texts, texts.tolist(), workers)
+    else:
+        cleaned = _clean_texts(texts.tolist())
+    
+    # Cleaned words are separated by single spaces
+    word_counts = [text.count(' ') + 1 if text else 0 for text in cleaned]
+    
+    return (pd.Series(cleaned, index=texts.index),
+            pd.Series(word_counts, index=texts.index, dtype='int64'))
+
+
+def _clean_texts(texts):
+    """Returns the cleaned text for each text in a list, cleaning each distinct text once."""
+    
+    try:
+        distinct = list(dict.fromkeys(texts))
+    except TypeError:
+        # Unhashable values cannot be deduplicated
+        return _clean_distinct_texts(texts)
+    
+    cleaned = dict(zip(distinct, _clean_distinct_texts(distinct)))
+    return [cleaned[text] for text in texts]
+
+
+def _clean_distinct_texts(texts):
+    """
+    Cleans a list of texts as one joined string, so lowercasing, the character
+    filter and whitespace collapsing each run once over the whole list instead
+    of once per text. Only the URL and email patterns still run per text, and
+    only on texts that contain their marker substrings.
+    """
+    
+    if not texts:
+        return []
+    
+    strings = [text if isinstance(text, str) else '' for text in texts]
+    joined = _TEXT_SEPARATOR.join(strings)
+    
+    if joined.count(_TEXT_SEPARATOR) >= len(strings):
+        # The separator is whitespace to clean_text, so a space can stand in for it
+        joined = _TEXT_SEPARATOR.join(text.replace(_TEXT_SEPARATOR, ' ') for text in strings)
+    
+    joined = joined.lower()
+    
+    if 'http' in joined or 'www' in joined or '@' in joined:
+        joined = _TEXT_SEPARATOR.join([_remove_links(text) if 'http' in text or 'www' in text or '@' in text else text
+                                       for text in joined.split(_TEXT_SEPARATOR)])
+    
+    # Non-ASCII whitespace still separates words; every other non-ASCII
+    # character is dropped by the encode below
+    if not joined.isascii():
+        joined = _UNICODE_SPACE_PATTERN.sub(' ', joined)
+    
+    data = joined.encode('ascii', 'ignore').translate(_ASCII_SPACE_TABLE, _ASCII_DELETED_CHARS)
+    
+    # Collapse whitespace to single spaces and trim it at each end of every text
+    data = _SPACE_RUN_PATTERN.sub(b' ', data).strip(b' ')
+    data = data.replace(b' ' + _TEXT_SEPARATOR_BYTE, _TEXT_SEPARATOR_BYTE)
+    data = data.replace(_TEXT_SEPARATOR_BYTE + b' ', _TEXT_SEPARATOR_BYTE)
+    
+    return data.decode('ascii').split(_TEXT_SEPARATOR)
+
+
+def _remove_links(text):
+    """Removes URLs and email addresses from lowercased text, skipping a pattern when its marker is absent."""
+    
+    if 'http' in text or 'www' in text:
+        text = _URL_PATTERN.sub('', text)
+    
+    if '@' in text:
+        text = _EMAIL_PATTERN.sub('', text)
+    
+    return text
+
+
 def remove_empty_reviews(df):
     """
     Removes reviews with empty or NaN text content.
@@ -50,14 +169,19 @@ def remove_empty_reviews(df):
         DataFrame: Dataframe with empty reviews removed
     """
     
-    # Remove rows where review_text is empty or NaN
-    df = df[df['review_text'].notna()]
-    df = df[df['review_text'].str.strip() != '']
+    df = _drop_empty_reviews(df)
     
     print(f"✓ Removed empty reviews. Remaining: {len(df)} reviews")
     return df
 
 
+def _drop_empty_reviews(df):
+    """Filters out rows whose review_text is empty or NaN, with a single mask."""
+    
+    text = df['review_text']
+    return df[text.notna() & (text.str.strip() != '')]
+
+
 def count_words(text):
     """
     Counts the number of words in a text.
@@ -75,51 +199,114 @@ def count_words(text):
     return len(text.split())
 
 
-def preprocess_reviews(input_filepath, output_filepath):
+def preprocess_reviews(reviews, output_filepath=None, background=False, workers=None):
     """
     Main preprocessing function that cleans and prepares reviews.
     
+    Reviews can be passed in memory (a DataFrame or a list of review records)
+    or as the path of a CSV, Parquet or Feather file. Saving the result is optional.
+    
     Args:
-        input_filepath (str): Path to raw reviews CSV
-        output_filepath (str): Path to save cleaned reviews CSV
+        reviews (str, DataFrame or list): Raw reviews, or path to raw reviews file
+        output_filepath (str): Path to save cleaned reviews file (default: not saved)
+        background (bool): Save the file on a background thread (see storage.persist_reviews)
+        workers (int): Worker processes for text cleaning (default: PARALLEL_WORKERS
+            for large inputs, see parallel.resolve_workers)
     
     Returns:
         DataFrame: Processed dataframe or None if error occurs
     """
     
     try:
-        # Read raw reviews
-        print("📂 Reading raw reviews...")
-        df = pd.read_csv(input_filepath)
+        if isinstance(reviews, str):
+            # Read raw reviews
+            print("📂 Reading raw reviews...")
+            df = read_reviews(reviews, dtype=_RAW_TEXT_DTYPES)
+        else:
+            df = as_review_frame(reviews)
         print(f"✓ Loaded {len(df)} reviews")
         
         # Remove empty reviews
         df = remove_empty_reviews(df)
         
-        # Clean review text
-        print("🧹 Cleaning review text...")
-        df['review_text'] = df['review_text'].apply(clean_text)
-        
-        # Remove reviews that became empty after cleaning
-        df = df[df['review_text'].str.strip() != '']
-        
-        # Add word count column
-        print("📊 Calculating word counts...")
-        df['word_count'] = df['review_text'].apply(count_words)
-        
-        # Reorder columns
-        if 'date' in df.columns:
-            df = df[['movie_name', 'reviewer', 'rating', 'review_text', 'word_count', 'date']]
-        else:
-            df = df[['movie_name', 'reviewer', 'rating', 'review_text', 'word_count']]
+        # Clean review text and add word counts
+        workers = resolve_workers(workers, len(df))
+        print(f"🧹 Cleaning review text{f' on {workers} processes' if workers > 1 else ''}...")
+        df = _clean_and_count(df, workers)
         
         # Save cleaned reviews
-        df.to_csv(output_filepath, index=False, encoding='utf-8')
-        print(f"✓ Cleaned reviews saved to {output_filepath}")
+        if output_filepath:
+            persist_reviews(df, output_filepath, background=background)
         print(f"✓ Final count: {len(df)} reviews after cleaning")
         
         return df
+    
+    except FileNotFoundError:
+        print(f"✗ File not found: {reviews}")
+        return None
+    except Exception as e:
+        print(f"✗ Error during preprocessing: {str(e)}")
+        return None
+
+
+def preprocess_batch(df):
+    """
+    Cleans one batch of raw reviews in memory, without file I/O or progress output.
+    Used by the streaming pipeline to process reviews as they arrive.
+    
+    Args:
+        df (DataFrame): Raw reviews batch
+    
+    Returns:
+        DataFrame: Cleaned batch (may be empty)
+    """
+    
+    # Empty and NaN texts clean to no words, so they are dropped along with
+    # reviews that become empty after cleaning
+    return _clean_and_count(df)
+
+
+def preprocess_reviews_chunked(input_filepath, output_filepath, chunksize=PREPROCESS_CHUNK_SIZE, workers=None):
+    """
+    Preprocesses a raw reviews file of any size in fixed-size chunks.
+    Each chunk is cleaned, filtered and counted, then appended to the output,
+    so memory use depends on chunksize rather than on the size of the file.
+    Files may be CSV, Parquet or Feather; the format follows each file's extension.
+    
+    Args:
+        input_filepath (str): Path to raw reviews file
+        output_filepath (str): Path to save cleaned reviews file
+        chunksize (int): Number of reviews read and processed at a time
+        workers (int): Worker processes for text cleaning (see parallel.resolve_workers)
+    
+    Returns:
+        dict: Preprocessing statistics (as from get_preprocessing_stats) or None if error occurs
+    """
+    
+    try:
+        print(f"📂 Preprocessing raw reviews in chunks of {chunksize}...")
+        
+        stats = PreprocessingStats()
+        rows_read = 0
+        workers = resolve_workers(workers, chunksize)
         
+        with ReviewWriter(output_filepath) as writer:
+            for chunk in iter_reviews(input_filepath, chunksize, dtype=_RAW_TEXT_DTYPES):
+                rows_read += len(chunk)
+                df = _clean_and_count(chunk, workers)
+                
+                # The first write creates the file even if every review was filtered out
+                if len(df) > 0 or rows_read == len(chunk):
+                    writer.write(df)
+                
+                stats.update(df)
+                print(f"   ...{rows_read} reviews read, {stats.total_reviews} kept")
+        
+        print(f"✓ Cleaned reviews saved to {output_filepath}")
+        print(f"✓ Final count: {stats.total_reviews} reviews after cleaning")
+        
+        return stats.get_stats()
+    
     except FileNotFoundError:
         print(f"✗ File not found: {input_filepath}")
         return None
@@ -128,6 +315,28 @@ def preprocess_reviews(input_filepath, output_filepath):
         return None
 
 
+def _clean_and_count(df, workers=1):
+    """
+    Cleans review text, drops reviews left empty, adds word counts, orders the
+    columns and, with COMPACT_DTYPES, converts them to the compact types of schema.py.
+    """
+    
+    # Clean review text and count words in the same sweep
+    cleaned, word_counts = clean_texts(df['review_text'], workers)
+    
+    # Reorder columns
+    if 'date' in df.columns:
+        columns = ['movie_name', 'reviewer', 'rating', 'review_text', 'word_count', 'date']
+    else:
+        columns = ['movie_name', 'reviewer', 'rating', 'review_text', 'word_count']
+    
+    # Remove reviews that became empty after cleaning, in the same selection
+    df = df.assign(review_text=cleaned, word_count=word_counts)
+    df = df.loc[(word_counts > 0).to_numpy(), columns]
+    
+    return compact_reviews(df) if COMPACT_DTYPES else df
+
+
 def get_preprocessing_stats(df):
     """
     Calculates and returns statistics about the preprocessed data.
@@ -142,12 +351,55 @@ def get_preprocessing_stats(df):
     if df is None or len(df) == 0:
         return {}
     
-    stats = {
-        'total_reviews': len(df),
-        'avg_word_count': df['word_count'].mean(),
-        'min_word_count': df['word_count'].min(),
-        'max_word_count': df['word_count'].max(),
-        'total_words': df['word_count'].sum()
-    }
+    stats = PreprocessingStats()
+    stats.update(df)
     
-    return stats
+    return stats.get_stats()
+
+
+class PreprocessingStats:
+    """
+    Preprocessing statistics accumulated chunk by chunk.
+    """
+    
+    def __init__(self):
+        self.total_reviews = 0
+        self.total_words = 0
+        self.min_word_count = None
+        self.max_word_count = None
+    
+    def update(self, df):
+        """
+        Adds a chunk of preprocessed reviews to the statistics.
+        
+        Args:
+            df (DataFrame): Preprocessed chunk with a word_count column
+        """
+        
+        if len(df) == 0:
+            return
+        
+        word_counts = df['word_count']
+        chunk_min, chunk_max = int(word_counts.min()), int(word_counts.max())
+        
+        self.total_reviews += len(df)
+        self.total_words += int(word_counts.sum())
+        self.min_word_count = chunk_min if self.min_word_count is None else min(self.min_word_count, chunk_min)
+        self.max_word_count = chunk_max if self.max_word_count is None else max(self.max_word_count, chunk_max)
+    
+    def get_stats(self):
+        """
+        Returns:
+            dict: Statistics in the shape returned by get_preprocessing_stats
+        """
+        
+        if self.total_reviews == 0:
+            return {}
+        
+        return {
+            'total_reviews': self.total_reviews,
+            'avg_word_count': self.total_words / self.total_reviews,
+            'min_word_count': self.min_word_count,
+            'max_word_count': self.max_word_count,
+            'total_words': self.total_words
+        }
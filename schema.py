@@ -0,0 +1,134 @@
+"""
+Column types of the pipeline's review tables.
+Repetitive text columns are stored as categoricals, star ratings are parsed
+into numbers and numeric columns use 32-bit types, which cuts the memory of
+large review frames and speeds up group-bys.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# Text columns with few distinct values, stored as categoricals
+CATEGORICAL_COLUMNS = ('movie_name', 'reviewer')
+
+# Sentiment classes, in the order charts and statistics list them
+SENTIMENT_CLASSES = ('positive', 'neutral', 'negative')
+
+# Fixed types of the numeric columns, so every chunk of a file gets the same schema
+NUMERIC_DTYPES = {
+    'rating': 'float32',
+    'word_count': 'int32',
+    'sentiment_score': 'float32',
+}
+
+FULL_STAR = '★'
+HALF_STAR = '½'
+
+
+def parse_rating(rating):
+    """
+    Converts a Letterboxd star rating to a number of stars.
+    
+    Args:
+        rating (str): Rating such as '★★★½', a number of stars such as '3.5', or 'N/A'
+    
+    Returns:
+        float: Number of stars (e.g. 3.5), or NaN if the review has no rating
+    """
+    
+    if isinstance(rating, (int, float, np.number)):
+        return float(rating)
+    if not isinstance(rating, str):
+        return np.nan
+    
+    rating = rating.strip()
+    if rating and not rating.strip(FULL_STAR + HALF_STAR):
+        return rating.count(FULL_STAR) + 0.5 * rating.count(HALF_STAR)
+    
+    # Ratings already converted to numbers, e.g. read back from a cleaned CSV file
+    try:
+        return float(rating)
+    except ValueError:
+        return np.nan
+
+
+def parse_ratings(ratings):
+    """
+    Converts a column of ratings to numbers of stars, parsing each distinct rating once.
+    
+    Args:
+        ratings (Series): Ratings as accepted by parse_rating
+    
+    Returns:
+        Series: float32 numbers of stars (NaN where unrated), aligned with ratings.index
+    """
+    
+    if pd.api.types.is_numeric_dtype(ratings.dtype):
+        return ratings.astype(NUMERIC_DTYPES['rating'])
+    
+    codes, distinct = pd.factorize(ratings)
+    stars = np.array([parse_rating(rating) for rating in distinct] + [np.nan], dtype=NUMERIC_DTYPES['rating'])
+    
+    # Code -1 (missing values) picks the trailing NaN
+    return pd.Series(stars[codes], index=ratings.index)
+
+
+def compact_reviews(df):
+    """
+    Converts a reviews dataframe to the compact column types. Columns that
+    are missing are skipped, and already compact columns are left unchanged.
+    
+    Args:
+        df (DataFrame): Reviews
+    
+    Returns:
+        DataFrame: Reviews with categorical text columns, numeric ratings and 32-bit numbers
+    """
+    
+    columns = {}
+    
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            columns[column] = df[column].astype('category')
+    
+    if 'rating' in df.columns:
+        columns['rating'] = parse_ratings(df['rating'])
+    
+    for column in ('word_count', 'sentiment_score'):
+        if column in df.columns:
+            columns[column] = df[column].astype(NUMERIC_DTYPES[column])
+    
+    if 'sentiment_class' in df.columns:
+        columns['sentiment_class'] = pd.Categorical(df['sentiment_class'], categories=SENTIMENT_CLASSES)
+    
+    return df.assign(**columns) if columns else df
+
+
+def review_records(df):
+    """
+    Converts reviews to a list of JSON-friendly dicts.
+    32-bit floats keep their short form (0.908 rather than 0.9079999923706055)
+    and missing values become None.
+    
+    Args:
+        df (DataFrame): Reviews
+    
+    Returns:
+        list: One dict per review
+    """
+    
+    columns = {}
+    
+    for column in df.columns:
+        values = df[column].to_numpy()
+        missing = pd.isna(values)
+        
+        if values.dtype == np.float32:
+            values = [float(str(value)) for value in values]
+        else:
+            values = values.tolist()
+        
+        columns[column] = [None if is_missing else value for value, is_missing in zip(values, missing)]
+    
+    return [dict(zip(columns, row)) for row in zip(*columns.values())]
@@ -4,83 +4,759 @@ Extracts review text, ratings, and dates from Letterboxd movie pages.
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
 import pandas as pd
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+import hashlib
+import itertools
+import json
+import os
+import random
+import sys
+import threading
 import time
 import csv
 
+from storage import persist_reviews, create_temp_file
+from config import (LETTERBOXD_BASE_URL, REQUEST_TIMEOUT, RETRY_ATTEMPTS, REVIEWS_PER_PAGE,
+                    SCRAPER_WORKERS, SCRAPER_POOL_SIZE, USE_HTTP_CACHE,
+                    HTTP_CACHE_DIR, HTTP_CACHE_TTL, HTTP_CACHE_MAX_BYTES, HTML_PARSER,
+                    SCRAPER_RATE_LIMIT, SCRAPER_RATE_LIMIT_MIN, SCRAPER_RATE_LIMIT_MAX,
+                    SCRAPER_BURST, SCRAPER_HOST_CONCURRENCY, RETRY_BACKOFF_BASE, RETRY_BACKOFF_MAX,
+                    CORPUS_DIR, WATERMARKS_FILE)
 
-def scrape_letterboxd_reviews(movie_name, max_reviews=50):
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+
+# Shared keep-alive session, created on first use
+_session = None
+_session_lock = threading.Lock()
+
+# Shared response cache, created on first use
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+# Shared per-host rate limiter, created on first use
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+# Responses worth retrying; 429 and 503 may carry a Retry-After header
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+THROTTLE_STATUS_CODES = {429, 503}
+
+# Serializes read-modify-write updates of the watermarks file
+_watermarks_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Returns the process-wide requests session used for scraping.
+    The session keeps a pool of keep-alive connections so repeated page
+    fetches (including concurrent ones) reuse sockets instead of reconnecting.
+    
+    Returns:
+        requests.Session: Shared, pooled session
+    """
+    
+    global _session
+    
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=SCRAPER_POOL_SIZE, pool_maxsize=SCRAPER_POOL_SIZE)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            session.headers.update(HEADERS)
+            _session = session
+    
+    return _session
+
+
+class ResponseCache:
+    """
+    Persistent on-disk cache of fetched pages, keyed by URL.
+    
+    Each entry is a body file plus a small JSON metadata file holding the
+    validators (ETag / Last-Modified) and the time it was last confirmed.
+    Entries younger than ``ttl`` are served without touching the network;
+    older ones are revalidated with a conditional request. Once the cache
+    grows past ``max_bytes`` the least recently used entries are evicted.
+    """
+    
+    def __init__(self, cache_dir=HTTP_CACHE_DIR, ttl=HTTP_CACHE_TTL, max_bytes=HTTP_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+    
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.cache_dir, key)
+        return base + '.json', base + '.body'
+    
+    def get(self, url):
+        """
+        Looks up a cached page.
+        
+        Args:
+            url (str): Page URL
+        
+        Returns:
+            dict: Entry with 'content', 'etag', 'last_modified' and 'stored_at', or None if not cached
+        """
+        
+        meta_path, body_path = self._paths(url)
+        
+        # Same lock as store(), so the meta and body come from one write
+        with self._lock:
+            try:
+                with open(meta_path, 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+                with open(body_path, 'rb') as f:
+                    entry['content'] = f.read()
+            except (OSError, ValueError):
+                return None
+            
+            # Mark as recently used for eviction
+            try:
+                os.utime(body_path)
+            except OSError:
+                pass
+        
+        return entry
+    
+    def is_fresh(self, entry):
+        """Returns True if the entry can be served without revalidation."""
+        return time.time() - entry.get('stored_at', 0) < self.ttl
+    
+    def store(self, url, content, etag=None, last_modified=None):
+        """
+        Saves a page and its validators, then enforces the size bound.
+        
+        Args:
+            url (str): Page URL
+            content (bytes): Response body
+            etag (str): ETag header, if any
+            last_modified (str): Last-Modified header, if any
+        """
+        
+        meta_path, body_path = self._paths(url)
+        entry = {
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'stored_at': time.time()
+        }
+        
+        with self._lock:
+            _atomic_write(body_path, content)
+            _atomic_write(meta_path, json.dumps(entry).encode('utf-8'))
+            self._evict()
+    
+    def touch(self, url):
+        """Marks a cached page as confirmed fresh (after a 304 Not Modified)."""
+        
+        meta_path, _ = self._paths(url)
+        
+        with self._lock:
+            try:
+                with open(meta_path, 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+                entry['stored_at'] = time.time()
+                _atomic_write(meta_path, json.dumps(entry).encode('utf-8'))
+            except (OSError, ValueError):
+                pass
+    
+    def clear(self):
+        """Removes every cached page."""
+        
+        with self._lock:
+            for name in os.listdir(self.cache_dir):
+                if name.endswith(('.json', '.body')):
+                    os.remove(os.path.join(self.cache_dir, name))
+    
+    def _evict(self):
+        """Drops least recently used entries until the cache fits in max_bytes."""
+        
+        entries = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.body'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        
+        entries.sort()
+        for _, size, body_path in entries:
+            if total <= self.max_bytes:
+                break
+            for path in (body_path, body_path[:-len('.body')] + '.json'):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+
+
+def _atomic_write(path, data):
+    """Writes bytes to path via a temporary file so readers never see a partial file."""
+    
+    tmp_path = create_temp_file(path)
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def get_response_cache():
+    """
+    Returns the shared response cache, or None if caching is disabled in config.
+    
+    Returns:
+        ResponseCache: Shared cache instance
+    """
+    
+    global _response_cache
+    
+    if not USE_HTTP_CACHE:
+        return None
+    
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache()
+    
+    return _response_cache
+
+
+class TokenBucket:
+    """
+    Token bucket whose refill rate adapts to the server's responses.
+    
+    The rate creeps up additively after each successful request and is halved
+    whenever the server throttles us (AIMD), so it settles near the highest
+    rate the site tolerates.
+    """
+    
+    def __init__(self, rate=SCRAPER_RATE_LIMIT, capacity=SCRAPER_BURST,
+                 min_rate=SCRAPER_RATE_LIMIT_MIN, max_rate=SCRAPER_RATE_LIMIT_MAX):
+        self.rate = rate
+        self.capacity = capacity
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+    
+    def acquire(self):
+        """Blocks until a token is available, then consumes it."""
+        
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+    
+    def record_success(self):
+        """Additive increase: nudges the rate up after a successful request."""
+        
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + 0.1)
+    
+    def record_throttle(self):
+        """Multiplicative decrease: halves the rate and drains the burst allowance."""
+        
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = min(self._tokens, 0)
+
+
+class HostRateLimiter:
+    """
+    Applies a TokenBucket and a concurrency cap to each host separately.
+    """
+    
+    def __init__(self, rate=SCRAPER_RATE_LIMIT, burst=SCRAPER_BURST, max_concurrency=SCRAPER_HOST_CONCURRENCY):
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self._hosts = {}
+        self._lock = threading.Lock()
+    
+    def _host_state(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = (TokenBucket(self.rate, self.burst),
+                                     threading.BoundedSemaphore(self.max_concurrency))
+            return self._hosts[host]
+    
+    def bucket(self, url):
+        """Returns the token bucket for the URL's host."""
+        return self._host_state(url)[0]
+    
+    @contextmanager
+    def slot(self, url):
+        """Holds one of the host's concurrency slots and spends a token for the duration of a request."""
+        
+        bucket, semaphore = self._host_state(url)
+        with semaphore:
+            bucket.acquire()
+            yield
+
+
+def get_rate_limiter():
+    """
+    Returns the shared per-host rate limiter.
+    
+    Returns:
+        HostRateLimiter: Shared limiter instance
+    """
+    
+    global _rate_limiter
+    
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = HostRateLimiter()
+    
+    return _rate_limiter
+
+
+def _retry_after_seconds(response):
+    """Parses a Retry-After header given either in seconds or as an HTTP date."""
+    
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff_delay(attempt):
+    """Exponential backoff with full jitter for the given (0-based) retry."""
+    return random.uniform(0, min(RETRY_BACKOFF_MAX, RETRY_BACKOFF_BASE * (2 ** attempt)))
+
+
+def request_with_retry(url, headers=None, retries=RETRY_ATTEMPTS, timeout=REQUEST_TIMEOUT, limiter=None):
+    """
+    Performs a GET through the shared session, rate limiter and retry policy.
+    
+    Connection errors, timeouts and retryable status codes (429, 5xx) are
+    retried with exponential backoff and jitter. A Retry-After header on
+    429/503 responses takes precedence over the computed backoff, and those
+    responses also slow down the host's request rate.
+    
+    Args:
+        url (str): URL to fetch
+        headers (dict): Extra request headers
+        retries (int): Retries after the first attempt (default from config)
+        timeout (float): Per-request timeout in seconds (default from config)
+        limiter (HostRateLimiter): Limiter to use (default: the shared limiter)
+    
+    Returns:
+        requests.Response: The final response (may still carry an error status)
+    
+    Raises:
+        requests.exceptions.RequestException: If every attempt failed to get a response
+    """
+    
+    limiter = limiter or get_rate_limiter()
+    bucket = limiter.bucket(url)
+    
+    for attempt in range(retries + 1):
+        response = None
+        error = None
+        
+        with limiter.slot(url):
+            try:
+                response = get_session().get(url, headers=headers, timeout=timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                error = e
+        
+        if response is not None and response.status_code not in RETRY_STATUS_CODES:
+            bucket.record_success()
+            return response
+        
+        if attempt == retries:
+            break
+        
+        delay = _backoff_delay(attempt)
+        if response is not None and response.status_code in THROTTLE_STATUS_CODES:
+            bucket.record_throttle()
+            retry_after = _retry_after_seconds(response)
+            if retry_after is not None:
+                delay = min(RETRY_BACKOFF_MAX, retry_after)
+        
+        reason = f"HTTP {response.status_code}" if response is not None else str(error)
+        print(f"⚠ {reason} for {url}, retrying in {delay:.1f}s ({attempt + 1}/{retries})")
+        time.sleep(delay)
+    
+    if response is not None:
+        return response
+    raise error
+
+
+def fetch_page(url, cache=None, revalidate=False):
+    """
+    Fetches a page through the shared session and the response cache.
+    
+    Fresh cached pages are returned without a request. Stale ones are
+    revalidated with If-None-Match / If-Modified-Since, so an unchanged page
+    costs only a 304 response.
+    Requests are rate limited and retried as described in request_with_retry.
+    
+    Args:
+        url (str): Page URL
+        cache (ResponseCache): Cache to use (default: the shared cache from config)
+        revalidate (bool): Check a cached page with the server even if it is still fresh
+    
+    Returns:
+        bytes: Page content
+    
+    Raises:
+        requests.exceptions.RequestException: On network or HTTP errors that persist after retries
+    """
+    
+    if cache is None:
+        cache = get_response_cache()
+    
+    entry = cache.get(url) if cache else None
+    if entry and not revalidate and cache.is_fresh(entry):
+        return entry['content']
+    
+    headers = {}
+    if entry:
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+    
+    response = request_with_retry(url, headers=headers)
+    
+    if response.status_code == 304:
+        if entry and headers:
+            cache.touch(url)
+            return entry['content']
+        
+        # A 304 with no cached page to reuse (e.g. it was evicted, or caching
+        # is off) is a miss: fetch the page again without conditions
+        response = request_with_retry(url, headers={'Cache-Control': 'no-cache'})
+        if response.status_code == 304:
+            raise requests.exceptions.HTTPError(f"304 Not Modified without a cached copy of {url}",
+                                                response=response)
+    
+    response.raise_for_status()
+    
+    if cache:
+        cache.store(url, response.content,
+                    etag=response.headers.get('ETag'),
+                    last_modified=response.headers.get('Last-Modified'))
+    
+    return response.content
+
+
+def get_movie_slug(movie_name):
+    """
+    Converts a movie name to Letterboxd URL format (lowercase, hyphens instead of spaces).
+    
+    Args:
+        movie_name (str): Name of the movie
+    
+    Returns:
+        str: Movie slug used in Letterboxd film URLs
+    """
+    
+    return movie_name.lower().strip().replace(" ", "-")
+
+
+def build_reviews_url(movie_slug, page, base_url=LETTERBOXD_BASE_URL, sort='activity'):
+    """
+    Builds the URL of one page of a film's reviews.
+    
+    Args:
+        movie_slug (str): Letterboxd film slug
+        page (int): 1-based page number
+        base_url (str): Site root (override to point at a local server)
+        sort (str): Review ordering - 'activity' (popular) or 'added' (newest first)
+    
+    Returns:
+        str: Review page URL
+    """
+    
+    return f"{base_url}/film/{movie_slug}/reviews/by/{sort}/page/{page}/"
+
+
+def parse_review_item(review_item, movie_name):
+    """
+    Extracts a single review from its parsed HTML element.
+    
+    Args:
+        review_item (Tag): The review's <div class="review"> element
+        movie_name (str): Name of the movie the review belongs to
+    
+    Returns:
+        dict: Review data, or None if the review has no text
+    """
+    
+    # Extract review text
+    review_text_elem = review_item.find('p', class_='review-text')
+    review_text = review_text_elem.text.strip() if review_text_elem else ""
+    
+    # Extract rating (Letterboxd uses star ratings)
+    rating_elem = review_item.find('span', class_='rating')
+    rating = rating_elem.text.strip() if rating_elem else "N/A"
+    
+    # Extract review date (left empty when the review has none, so it is not mistaken for a new review)
+    date_elem = review_item.find('time')
+    review_date = date_elem.get('datetime', '') if date_elem else ''
+    
+    # Extract reviewer name
+    reviewer_elem = review_item.find('a', class_='reviewer')
+    reviewer = reviewer_elem.text.strip() if reviewer_elem else "Anonymous"
+    
+    # Skip reviews without text
+    if not review_text:
+        return None
+    
+    return {
+        'reviewer': reviewer,
+        'rating': rating,
+        'review_text': review_text,
+        'date': review_date,
+        'movie_name': movie_name
+    }
+
+
+def _parse_full(html, movie_name):
+    """Builds the complete document tree, then searches it for reviews."""
+    
+    soup = BeautifulSoup(html, 'html.parser')
+    return _collect_reviews(soup.find_all('div', class_='review'), movie_name)
+
+
+def _parse_lxml(html, movie_name):
+    """Extracts reviews with lxml's C parser and XPath, bypassing BeautifulSoup (about 6-10x faster than 'full')."""
+    
+    from lxml import html as lxml_html
+    
+    if isinstance(html, str):
+        html = html.encode('utf-8')
+    if not html.strip():
+        return []
+    
+    tree = lxml_html.fromstring(html, parser=lxml_html.HTMLParser(encoding='utf-8'))
+    
+    reviews = []
+    for review_item in tree.xpath(f"//div[{_xpath_has_class('review')}]"):
+        try:
+            text_elem = review_item.xpath(f".//p[{_xpath_has_class('review-text')}]")
+            rating_elem = review_item.xpath(f".//span[{_xpath_has_class('rating')}]")
+            date_elem = review_item.xpath(".//time")
+            reviewer_elem = review_item.xpath(f".//a[{_xpath_has_class('reviewer')}]")
+            
+            review_text = text_elem[0].text_content().strip() if text_elem else ""
+            if not review_text:
+                continue
+            
+            reviews.append({
+                'reviewer': reviewer_elem[0].text_content().strip() if reviewer_elem else "Anonymous",
+                'rating': rating_elem[0].text_content().strip() if rating_elem else "N/A",
+                'review_text': review_text,
+                'date': date_elem[0].get('datetime', '') if date_elem else '',
+                'movie_name': movie_name
+            })
+        except Exception as e:
+            print(f"⚠ Error parsing review: {str(e)}")
+            continue
+    
+    return reviews
+
+
+def _xpath_has_class(class_name):
+    """XPath predicate matching elements whose class list contains class_name (like BeautifulSoup's class_)."""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')"
+
+
+def _collect_reviews(review_items, movie_name):
+    """Runs parse_review_item over review elements, skipping empty or malformed ones."""
+    
+    reviews = []
+    for review_item in review_items:
+        try:
+            review = parse_review_item(review_item, movie_name)
+            if review:
+                reviews.append(review)
+        except Exception as e:
+            print(f"⚠ Error parsing review: {str(e)}")
+            continue
+    
+    return reviews
+
+
+# Available HTML parsing backends for review extraction
+PARSER_BACKENDS = {
+    'full': _parse_full,
+    'lxml': _parse_lxml,
+}
+
+# Whether the optional lxml dependency is importable (checked on first use)
+_lxml_available = None
+
+
+def get_parser_backend(name=HTML_PARSER):
+    """
+    Resolves a parser backend by name.
+    Falls back to 'full' when lxml is requested but not installed.
+    
+    Args:
+        name (str): One of PARSER_BACKENDS
+    
+    Returns:
+        callable: Function taking (html, movie_name) and returning a list of reviews
+    """
+    
+    if name not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown parser backend: {name}")
+    
+    global _lxml_available
+    
+    if name == 'lxml':
+        if _lxml_available is None:
+            try:
+                import lxml.html  # noqa: F401
+                _lxml_available = True
+            except ImportError:
+                print("⚠ lxml is not installed, using the 'full' parser instead")
+                _lxml_available = False
+        if not _lxml_available:
+            name = 'full'
+    
+    return PARSER_BACKENDS[name]
+
+
+def parse_reviews_html(html, movie_name, parser=HTML_PARSER):
+    """
+    Extracts all reviews from a page of Letterboxd HTML.
+    
+    Args:
+        html (bytes or str): Page content
+        movie_name (str): Name of the movie the reviews belong to
+        parser (str): Parsing backend - 'full' or 'lxml' (default from config)
+    
+    Returns:
+        list: List of review dictionaries
+    """
+    
+    return get_parser_backend(parser)(html, movie_name)
+
+
+def fetch_reviews_page(movie_name, page, base_url=LETTERBOXD_BASE_URL, cache=None, sort='activity',
+                       revalidate=False):
+    """
+    Fetches and parses one page of a film's reviews using the shared session.
+    
+    Args:
+        movie_name (str): Name of the movie
+        page (int): 1-based page number
+        base_url (str): Site root (override to point at a local server)
+        cache (ResponseCache): Response cache to use (default: the shared cache)
+        sort (str): Review ordering - 'activity' or 'added'
+        revalidate (bool): Check cached copies with the server even if still fresh
+    
+    Returns:
+        list: Reviews on the page (empty when the page has none), or None on network error
+    """
+    
+    url = build_reviews_url(get_movie_slug(movie_name), page, base_url, sort)
+    
+    try:
+        content = fetch_page(url, cache, revalidate)
+    except requests.exceptions.RequestException as e:
+        print(f"✗ Network error while fetching page {page}: {str(e)}")
+        return None
+    
+    return parse_reviews_html(content, movie_name)
+
+
+def scrape_letterboxd_reviews(movie_name, max_reviews=50, paginate=False, workers=SCRAPER_WORKERS,
+                              base_url=LETTERBOXD_BASE_URL, cache=None, incremental=False):
     """
     Scrapes reviews from Letterboxd for a given movie.
     
+    By default a single search page is fetched. With paginate=True the film's
+    review pages are fetched concurrently (``workers`` at a time) over the
+    shared keep-alive session until ``max_reviews`` is reached or the pages run out.
+    
+    With incremental=True only reviews newer than the movie's stored watermark
+    are fetched; they are merged into the stored corpus, and the newest
+    ``max_reviews`` reviews of the corpus are returned. A refresh of a stored
+    corpus fetches every new review, however many there are, so none are skipped.
+    
     Args:
         movie_name (str): Name of the movie to search for
         max_reviews (int): Maximum number of reviews to scrape (default: 50)
+        paginate (bool): Fetch the film's review pages instead of the search page
+        incremental (bool): Fetch only reviews added since the last incremental run
+        workers (int): Number of pages fetched concurrently in paginated mode
+        base_url (str): Site root (override to point at a local server)
+        cache (ResponseCache): Response cache to use (default: the shared cache)
     
     Returns:
         list: List of dictionaries containing review data
     """
     
-    # Convert movie name to Letterboxd URL format (lowercase, hyphens instead of spaces)
-    movie_slug = movie_name.lower().replace(" ", "-")
-    url = f"https://letterboxd.com/search/{movie_name}/"
+    if incremental:
+        return _scrape_incremental(movie_name, max_reviews, workers, base_url, cache)
     
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-    }
+    if paginate:
+        return _scrape_paginated(movie_name, max_reviews, workers, base_url, cache)
+    
+    url = f"{base_url}/search/{movie_name}/"
     
     reviews = []
     
     try:
         # Try to fetch the search page
         print(f"🔍 Searching for '{movie_name}' on Letterboxd...")
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
+        content = fetch_page(url, cache)
         
         # Find all reviews on the page
-        review_items = soup.find_all('div', class_='review')
-        
-        print(f"✓ Found {len(review_items)} reviews")
-        
-        for review_item in review_items[:max_reviews]:
-            try:
-                # Extract review text
-                review_text_elem = review_item.find('p', class_='review-text')
-                review_text = review_text_elem.text.strip() if review_text_elem else ""
-                
-                # Extract rating (Letterboxd uses star ratings)
-                rating_elem = review_item.find('span', class_='rating')
-                rating = rating_elem.text.strip() if rating_elem else "N/A"
-                
-                # Extract review date
-                date_elem = review_item.find('time')
-                review_date = date_elem.get('datetime', datetime.now().isoformat()) if date_elem else datetime.now().isoformat()
-                
-                # Extract reviewer name
-                reviewer_elem = review_item.find('a', class_='reviewer')
-                reviewer = reviewer_elem.text.strip() if reviewer_elem else "Anonymous"
-                
-                # Add to reviews list if review text is not empty
-                if review_text:
-                    reviews.append({
-                        'reviewer': reviewer,
-                        'rating': rating,
-                        'review_text': review_text,
-                        'date': review_date,
-                        'movie_name': movie_name
-                    })
-                    
-            except Exception as e:
-                print(f"⚠ Error parsing review: {str(e)}")
-                continue
+        reviews = parse_reviews_html(content, movie_name)[:max_reviews]
         
         print(f"✓ Successfully scraped {len(reviews)} reviews")
         return reviews
-        
+    
     except requests.exceptions.RequestException as e:
         print(f"✗ Network error while scraping: {str(e)}")
         return []
@@ -89,34 +765,382 @@ def scrape_letterboxd_reviews(movie_name, max_reviews=50):
         return []
 
 
-def save_reviews_to_csv(reviews, filepath):
+def _scrape_paginated(movie_name, max_reviews, workers, base_url, cache, sort='activity', is_known=None):
+    """
+    Collects the pages from iter_review_pages into a single list of reviews.
+    """
+    
+    workers = max(1, workers)
+    reviews = []
+    
+    limit = 'all new' if max_reviews == sys.maxsize else f'up to {max_reviews}'
+    print(f"🔍 Fetching {limit} reviews for '{movie_name}' ({workers} workers)...")
+    
+    try:
+        for page_reviews in iter_review_pages(movie_name, max_reviews, workers, base_url, cache, sort, is_known):
+            reviews.extend(page_reviews)
+    except Exception as e:
+        print(f"✗ Error during scraping: {str(e)}")
+    
+    print(f"✓ Successfully scraped {len(reviews)} reviews")
+    return reviews
+
+
+def iter_review_pages(movie_name, max_reviews=50, workers=SCRAPER_WORKERS, base_url=LETTERBOXD_BASE_URL,
+                      cache=None, sort='activity', is_known=None):
     """
-    Saves scraped reviews to a CSV file.
+    Yields a film's reviews page by page, fetching pages in concurrent batches.
+    Pages are yielded in order, so the result is the same as a serial crawl,
+    and the generator stops once max_reviews have been yielded or the pages run out.
+    
+    If is_known is given, pages are read newest first and the crawl stops at
+    the first review it accepts. Batches then start at a single page and
+    double, so a refresh with few new reviews costs a single request.
     
     Args:
-        reviews (list): List of review dictionaries
-        filepath (str): Path to save the CSV file
+        movie_name (str): Name of the movie
+        max_reviews (int): Maximum number of reviews to yield in total
+        workers (int): Number of pages fetched concurrently
+        base_url (str): Site root (override to point at a local server)
+        cache (ResponseCache): Response cache to use (default: the shared cache)
+        sort (str): Review ordering - 'activity' or 'added'
+        is_known (callable): Predicate marking reviews that were already seen
+    
+    Yields:
+        list: Review dictionaries from one page
+    """
+    
+    workers = max(1, workers)
+    batch_limit = 1 if is_known else workers
+    yielded = 0
+    page = 1
+    
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while yielded < max_reviews:
+            # Only request as many pages as could still be needed
+            remaining = max_reviews - yielded
+            batch_size = min(batch_limit, -(-remaining // REVIEWS_PER_PAGE))
+            pages = range(page, page + batch_size)
+            
+            results = executor.map(
+                lambda p: fetch_reviews_page(movie_name, p, base_url, cache, sort, revalidate=bool(is_known)),
+                pages
+            )
+            
+            for page_reviews in results:
+                # An empty or failed page means there is nothing further to fetch
+                if not page_reviews:
+                    return
+                
+                if is_known:
+                    # Everything after the first known review has been seen before
+                    new_reviews = list(itertools.takewhile(lambda r: not is_known(r), page_reviews))
+                else:
+                    new_reviews = page_reviews
+                
+                new_reviews = new_reviews[:max_reviews - yielded]
+                if new_reviews:
+                    yielded += len(new_reviews)
+                    yield new_reviews
+                
+                if len(new_reviews) < len(page_reviews) or yielded >= max_reviews:
+                    return
+            
+            page += batch_size
+            batch_limit = min(workers, batch_limit * 2)
+
+
+def _scrape_incremental(movie_name, max_reviews, workers, base_url, cache):
+    """
+    Fetches reviews added since the stored watermark and merges them into the movie's corpus.
+    """
+    
+    corpus = load_corpus(movie_name)
+    watermark = load_watermark(movie_name)
+    
+    known_keys = {review_key(review) for review in corpus}
+    newest_date = watermark.get('newest_date', '')
+    
+    reached_known = False
+    
+    def is_known(review):
+        nonlocal reached_known
+        # Undated reviews can only be recognized by their key
+        known = (bool(review['date']) and review['date'] < newest_date) or review_key(review) in known_keys
+        reached_known = reached_known or known
+        return known
+    
+    if corpus:
+        print(f"🔁 Refreshing '{movie_name}' (watermark: {newest_date or 'none'})")
+        # Not capped by max_reviews: stopping before the first known review would
+        # leave a gap of unfetched reviews that later refreshes take as known
+        new_reviews = _scrape_paginated(movie_name, sys.maxsize, workers, base_url, cache,
+                                        sort='added', is_known=is_known)
+    else:
+        # Without a corpus there is nothing to stop at, so do a normal concurrent crawl
+        new_reviews = _scrape_paginated(movie_name, max_reviews, workers, base_url, cache, sort='added')
+    print(f"✓ {len(new_reviews)} new reviews since the last run")
+    
+    if not new_reviews:
+        return corpus[:max_reviews]
+    
+    merged = merge_reviews(new_reviews, corpus)
+    
+    # A refresh that ended before reaching a stored review (e.g. a page failed)
+    # may have missed reviews, so it is not stored and the next run fetches it again
+    if corpus and not reached_known:
+        print("⚠ Refresh did not reach the stored reviews; not updating the corpus")
+        return merged[:max_reviews]
+    
+    save_corpus(movie_name, merged)
+    save_watermark(movie_name, {
+        'newest_date': max((review['date'] for review in merged if review['date']), default=newest_date),
+        'review_count': len(merged),
+        'updated_at': datetime.now().isoformat()
+    })
+    
+    return merged[:max_reviews]
+
+
+def review_key(review):
+    """
+    Returns a stable identifier for a review, used to de-duplicate stored reviews.
+    Reviews without a date are identified by their reviewer and text.
+    
+    Args:
+        review (dict): Review dictionary
     
     Returns:
-        bool: True if successful, False otherwise
+        str: Hex digest of the reviewer, date and text
     """
     
-    if not reviews:
-        print("⚠ No reviews to save")
-        return False
+    identity = '\x1f'.join((review['reviewer'], review['date'], review['review_text']))
+    return hashlib.sha1(identity.encode('utf-8')).hexdigest()
+
+
+def merge_reviews(new_reviews, existing_reviews):
+    """
+    Merges newly scraped reviews into a stored corpus, newest first, without duplicates.
+    
+    Args:
+        new_reviews (list): Reviews fetched in this run (newest first)
+        existing_reviews (list): Previously stored reviews (newest first)
+    
+    Returns:
+        list: Merged list of review dictionaries
+    """
+    
+    merged = []
+    seen = set()
+    for review in new_reviews + existing_reviews:
+        key = review_key(review)
+        if key not in seen:
+            seen.add(key)
+            merged.append(review)
+    
+    return merged
+
+
+def _corpus_path(movie_name):
+    return os.path.join(CORPUS_DIR, f"{get_movie_slug(movie_name)}.csv")
+
+
+def load_corpus(movie_name):
+    """
+    Loads the stored review corpus for a movie.
+    
+    Args:
+        movie_name (str): Name of the movie
+    
+    Returns:
+        list: Stored review dictionaries (newest first), or an empty list
+    """
+    
+    path = _corpus_path(movie_name)
+    if not os.path.exists(path):
+        return []
+    
+    # Read everything as text so ratings like 'N/A' are not turned into NaN
+    df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    return df.to_dict('records')
+
+
+def save_corpus(movie_name, reviews):
+    """
+    Saves the review corpus for a movie.
+    
+    Args:
+        movie_name (str): Name of the movie
+        reviews (list): Review dictionaries (newest first)
+    """
+    
+    os.makedirs(CORPUS_DIR, exist_ok=True)
+    pd.DataFrame(reviews).to_csv(_corpus_path(movie_name), index=False, encoding='utf-8')
+
+
+def load_watermark(movie_name):
+    """
+    Returns the stored watermark for a movie.
+    
+    Args:
+        movie_name (str): Name of the movie
+    
+    Returns:
+        dict: Watermark with 'newest_date', 'review_count' and 'updated_at', or an empty dict
+    """
     
     try:
-        # Create DataFrame from reviews
-        df = pd.DataFrame(reviews)
+        with open(WATERMARKS_FILE, 'r', encoding='utf-8') as f:
+            watermarks = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    
+    return watermarks.get(get_movie_slug(movie_name), {})
+
+
+def save_watermark(movie_name, watermark):
+    """
+    Stores the watermark for a movie alongside those of other movies.
+    
+    Args:
+        movie_name (str): Name of the movie
+        watermark (dict): Watermark to store
+    """
+    
+    with _watermarks_lock:
+        try:
+            with open(WATERMARKS_FILE, 'r', encoding='utf-8') as f:
+                watermarks = json.load(f)
+        except (OSError, ValueError):
+            watermarks = {}
         
-        # Save to CSV
-        df.to_csv(filepath, index=False, encoding='utf-8')
-        print(f"✓ Reviews saved to {filepath}")
-        return True
+        watermarks[get_movie_slug(movie_name)] = watermark
         
-    except Exception as e:
-        print(f"✗ Error saving reviews: {str(e)}")
+        os.makedirs(os.path.dirname(WATERMARKS_FILE) or '.', exist_ok=True)
+        _atomic_write(WATERMARKS_FILE, json.dumps(watermarks, indent=2).encode('utf-8'))
+
+
+def save_reviews_to_csv(reviews, filepath, fmt=None, background=False):
+    """
+    Saves scraped reviews to a CSV file, or to a Parquet / Feather file
+    when the path has that extension or fmt says so.
+    
+    Args:
+        reviews (list): List of review dictionaries
+        filepath (str): Path to save the file
+        fmt (str): Storage format - 'csv', 'parquet' or 'feather' (default: from the extension)
+        background (bool): Save on a background thread and return a Future
+    
+    Returns:
+        bool: True if successful, False otherwise (a Future of it when background)
+    """
+    
+    if not reviews:
+        print("⚠ No reviews to save")
         return False
+    
+    return persist_reviews(reviews, filepath, fmt, background=background)
+
+
+def iter_sample_reviews(movie_name, batch_size=REVIEWS_PER_PAGE):
+    """
+    Yields the sample reviews for a movie in batches, mirroring iter_review_pages.
+    
+    Args:
+        movie_name (str): Name of the movie
+        batch_size (int): Reviews per batch
+    
+    Yields:
+        list: Sample review dictionaries
+    """
+    
+    reviews = get_sample_reviews(movie_name)
+    for start in range(0, len(reviews), batch_size):
+        yield reviews[start:start + batch_size]
+
+
+# Review templates with different sentiments, used for sample and synthetic reviews
+POSITIVE_REVIEW_TEMPLATES = [
+    'Absolutely brilliant and memorable. One of the best films ever made!',
+    'Masterpiece! Every scene is perfectly crafted. A true work of art.',
+    'Incredible storytelling and outstanding performances throughout. Highly recommended!',
+    'This film exceeded my expectations. Absolutely phenomenal in every way.',
+    'Stunning cinematography and brilliant direction. A must-watch!',
+    'Excellent film with compelling narrative and great character development.',
+    'Really enjoyed this. Great entertainment value and emotional depth.',
+    'Outstanding performances and impressive production value. Very impressed!',
+    'Highly engaging from start to finish. Would definitely watch again.',
+    'Great film with excellent pacing and interesting plot twists.',
+    'Well-crafted with excellent acting and a captivating story.',
+    'Simply wonderful! Loved every minute of it.',
+    'Best film I\'ve seen in a long time. Absolutely fantastic.',
+    'Brilliant work! Director nailed every aspect of this film.',
+    'Amazing visual effects combined with perfect storytelling.',
+]
+
+NEUTRAL_REVIEW_TEMPLATES = [
+    'Good movie with solid performances and decent storyline. Worth watching.',
+    'Entertaining film with some interesting moments and good direction.',
+    'Solid movie with good acting and an engaging narrative overall.',
+    'Pretty good film. Some great scenes mixed with a few slower moments.',
+    'Enjoyed this one. Great visuals and decent character arcs throughout.',
+    'It was okay. Some parts were really good but others felt slow.',
+    'Average film. Not bad but nothing particularly special or memorable either.',
+    'Mixed feelings. Good ideas but poor execution in several parts.',
+    'Decent movie. Had its moments but also some predictable sections.',
+    'Not perfect but entertaining enough for a casual watch.',
+    'Interesting concept but could have been executed better.',
+    'Watchable film with some notable scenes but overall inconsistent.',
+    'Pretty entertaining. Not groundbreaking but worth your time.',
+    'Good film that keeps you interested throughout most of it.',
+    'Had potential and delivered reasonably well in most areas.',
+]
+
+NEGATIVE_REVIEW_TEMPLATES = [
+    'Disappointed by this one. Started strong but lost momentum halfway through.',
+    'Underwhelming. Had potential but failed to deliver on expectations.',
+    'Quite disappointed with this film. Boring and predictable throughout.',
+    'Waste of time. Poor plot and unconvincing characters made it hard to enjoy.',
+    'Really bad film. Poorly paced and lacked any real substance or meaning.',
+    'Terrible movie. Could not finish watching it. Very disappointed.',
+    'Absolutely awful. One of the worst films I have ever seen.',
+    'Did not enjoy this at all. Waste of valuable time.',
+    'Disappointing on every level. Poor writing and weak characters.',
+    'Painfully boring. Could not connect with any aspect of this film.',
+    'Terrible execution of an already weak concept.',
+    'Could not stand watching this. Turned it off halfway.',
+    'Worst film I\'ve seen in recent memory. Terrible all around.',
+    'Deeply flawed in every way. Do not recommend to anyone.',
+    'Absolutely dreadful. Regret spending time on this movie.',
+]
+
+# Reviewer names cycled through by sample and synthetic reviews
+SAMPLE_REVIEWER_NAMES = [
+    'alice_film', 'bob_critic', 'charlie_fan', 'diana_lover', 'evan_watcher',
+    'fiona_buff', 'george_geek', 'hannah_enthusiast', 'ivan_admirer', 'julia_viewer',
+    'kevin_pro', 'laura_movie', 'mike_cinema', 'nancy_screen', 'oscar_visual',
+    'paul_story', 'quinn_direction', 'rachel_actor', 'sam_production', 'tina_award',
+    'uriel_artistic', 'victor_dramatic', 'wendy_comedy', 'xavier_thriller', 'yara_adventure',
+    'zack_scifi', 'amy_romance', 'brian_mystery', 'clara_horror', 'david_animation',
+    'emma_indie', 'frank_blockbuster', 'gina_classic', 'henry_modern', 'iris_experimental',
+    'jack_documentary', 'kate_series', 'liam_episode', 'mona_streaming', 'noah_digital'
+]
+
+
+def stable_seed(movie_name):
+    """
+    Derives a random seed from a movie name that is the same in every process
+    (unlike hash(), which is randomized per interpreter).
+    
+    Args:
+        movie_name (str): Name of the movie
+    
+    Returns:
+        int: 32-bit seed
+    """
+    
+    digest = hashlib.sha256(movie_name.lower().encode('utf-8')).digest()
+    return int.from_bytes(digest[:4], 'big')
 
 
 def get_sample_reviews(movie_name):
@@ -130,103 +1154,41 @@ def get_sample_reviews(movie_name):
     Returns:
         list: List of sample review dictionaries with varied sentiment per movie
     """
-    import random
     
     # Use movie name to seed random for consistent but different results per movie
-    random.seed(hash(movie_name.lower()) % (2**32))
-    
-    # Review templates with different sentiments
-    positive_reviews = [
-        'Absolutely brilliant and memorable. One of the best films ever made!',
-        'Masterpiece! Every scene is perfectly crafted. A true work of art.',
-        'Incredible storytelling and outstanding performances throughout. Highly recommended!',
-        'This film exceeded my expectations. Absolutely phenomenal in every way.',
-        'Stunning cinematography and brilliant direction. A must-watch!',
-        'Excellent film with compelling narrative and great character development.',
-        'Really enjoyed this. Great entertainment value and emotional depth.',
-        'Outstanding performances and impressive production value. Very impressed!',
-        'Highly engaging from start to finish. Would definitely watch again.',
-        'Great film with excellent pacing and interesting plot twists.',
-        'Well-crafted with excellent acting and a captivating story.',
-        'Simply wonderful! Loved every minute of it.',
-        'Best film I\'ve seen in a long time. Absolutely fantastic.',
-        'Brilliant work! Director nailed every aspect of this film.',
-        'Amazing visual effects combined with perfect storytelling.',
-    ]
-    
-    neutral_reviews = [
-        'Good movie with solid performances and decent storyline. Worth watching.',
-        'Entertaining film with some interesting moments and good direction.',
-        'Solid movie with good acting and an engaging narrative overall.',
-        'Pretty good film. Some great scenes mixed with a few slower moments.',
-        'Enjoyed this one. Great visuals and decent character arcs throughout.',
-        'It was okay. Some parts were really good but others felt slow.',
-        'Average film. Not bad but nothing particularly special or memorable either.',
-        'Mixed feelings. Good ideas but poor execution in several parts.',
-        'Decent movie. Had its moments but also some predictable sections.',
-        'Not perfect but entertaining enough for a casual watch.',
-        'Interesting concept but could have been executed better.',
-        'Watchable film with some notable scenes but overall inconsistent.',
-        'Pretty entertaining. Not groundbreaking but worth your time.',
-        'Good film that keeps you interested throughout most of it.',
-        'Had potential and delivered reasonably well in most areas.',
-    ]
-    
-    negative_reviews = [
-        'Disappointed by this one. Started strong but lost momentum halfway through.',
-        'Underwhelming. Had potential but failed to deliver on expectations.',
-        'Quite disappointed with this film. Boring and predictable throughout.',
-        'Waste of time. Poor plot and unconvincing characters made it hard to enjoy.',
-        'Really bad film. Poorly paced and lacked any real substance or meaning.',
-        'Terrible movie. Could not finish watching it. Very disappointed.',
-        'Absolutely awful. One of the worst films I have ever seen.',
-        'Did not enjoy this at all. Waste of valuable time.',
-        'Disappointing on every level. Poor writing and weak characters.',
-        'Painfully boring. Could not connect with any aspect of this film.',
-        'Terrible execution of an already weak concept.',
-        'Could not stand watching this. Turned it off halfway.',
-        'Worst film I\'ve seen in recent memory. Terrible all around.',
-        'Deeply flawed in every way. Do not recommend to anyone.',
-        'Absolutely dreadful. Regret spending time on this movie.',
-    ]
+    rng = random.Random(stable_seed(movie_name))
+    
+    positive_reviews = POSITIVE_REVIEW_TEMPLATES
+    neutral_reviews = NEUTRAL_REVIEW_TEMPLATES
+    negative_reviews = NEGATIVE_REVIEW_TEMPLATES
+    reviewer_names = SAMPLE_REVIEWER_NAMES
     
     # Create 40 reviews with varied sentiment (different distribution per movie)
     # This ensures different movies get different review distributions
-    ratings_distribution = random.choices(
+    ratings_distribution = rng.choices(
         [5, 4, 3, 2, 1],
-        weights=[random.randint(15, 35), random.randint(15, 30), random.randint(15, 30), 
-                 random.randint(5, 20), random.randint(5, 20)],
+        weights=[rng.randint(15, 35), rng.randint(15, 30), rng.randint(15, 30), 
+                 rng.randint(5, 20), rng.randint(5, 20)],
         k=40
     )
     
     reviews = []
-    reviewer_names = [
-        'alice_film', 'bob_critic', 'charlie_fan', 'diana_lover', 'evan_watcher',
-        'fiona_buff', 'george_geek', 'hannah_enthusiast', 'ivan_admirer', 'julia_viewer',
-        'kevin_pro', 'laura_movie', 'mike_cinema', 'nancy_screen', 'oscar_visual',
-        'paul_story', 'quinn_direction', 'rachel_actor', 'sam_production', 'tina_award',
-        'uriel_artistic', 'victor_dramatic', 'wendy_comedy', 'xavier_thriller', 'yara_adventure',
-        'zack_scifi', 'amy_romance', 'brian_mystery', 'clara_horror', 'david_animation',
-        'emma_indie', 'frank_blockbuster', 'gina_classic', 'henry_modern', 'iris_experimental',
-        'jack_documentary', 'kate_series', 'liam_episode', 'mona_streaming', 'noah_digital'
-    ]
-    
     review_id = 0
     for i, rating in enumerate(ratings_distribution):
         if rating == 5:
-            text = random.choice(positive_reviews)
+            text = rng.choice(positive_reviews)
             rating_str = '★★★★★'
         elif rating == 4:
-            text = random.choice(positive_reviews if random.random() > 0.3 else neutral_reviews)
+            text = rng.choice(positive_reviews if rng.random() > 0.3 else neutral_reviews)
             rating_str = '★★★★'
         elif rating == 3:
-            text = random.choice(neutral_reviews)
+            text = rng.choice(neutral_reviews)
             rating_str = '★★★'
         elif rating == 2:
-            text = random.choice(negative_reviews if random.random() > 0.3 else neutral_reviews)
+            text = rng.choice(negative_reviews if rng.random() > 0.3 else neutral_reviews)
             rating_str = '★★'
         else:  # rating == 1
-            text = random.choice(negative_reviews)
+            text = rng.choice(negative_reviews)
             rating_str = '★'
         
         reviews.append({
@@ -239,5 +1201,5 @@ def get_sample_reviews(movie_name):
         review_id += 1
     
     # Shuffle the reviews so they're not in sentiment order
-    random.shuffle(reviews)
+    rng.shuffle(reviews)
     return reviews
@@ -0,0 +1,350 @@
+"""
+Mergeable, bounded-memory summaries of sentiment scores.
+A fixed-bin histogram, a KLL quantile sketch and a top-k review tracker let
+distribution charts, percentiles and the most extreme reviews be computed
+without keeping the scores in memory.
+"""
+
+import heapq
+import numpy as np
+
+from config import SKETCH_HISTOGRAM_BINS, SKETCH_QUANTILE_K, TOP_REVIEWS_K
+from schema import review_records
+
+
+class ScoreHistogram:
+    """
+    Histogram with fixed, equal-width bins over the score range.
+    Histograms with the same bins are merged by adding their counts.
+    """
+    
+    def __init__(self, bins=SKETCH_HISTOGRAM_BINS, low=-1.0, high=1.0):
+        self.bin_edges = np.linspace(low, high, bins + 1)
+        self.counts = np.zeros(bins, dtype=np.int64)
+    
+    def update(self, values):
+        """
+        Adds scores to the histogram. Values outside the range go to the first or last bin.
+        
+        Args:
+            values (array-like): Scores
+        
+        Returns:
+            ScoreHistogram: self, for chaining
+        """
+        
+        values = np.clip(np.asarray(values, dtype=float), self.bin_edges[0], self.bin_edges[-1])
+        values = values[~np.isnan(values)]
+        self.counts += np.histogram(values, bins=self.bin_edges)[0]
+        return self
+    
+    def merge(self, other):
+        """
+        Adds the counts of another histogram with the same bins.
+        
+        Args:
+            other (ScoreHistogram): Histogram to merge
+        
+        Returns:
+            ScoreHistogram: self, for chaining
+        """
+        
+        if not np.array_equal(self.bin_edges, other.bin_edges):
+            raise ValueError("Cannot merge histograms with different bins")
+        self.counts += other.counts
+        return self
+    
+    def to_dict(self):
+        """
+        Returns:
+            dict: Bin edges and counts (one more edge than counts)
+        """
+        
+        return {'bin_edges': self.bin_edges.tolist(), 'counts': self.counts.tolist()}
+    
+    @classmethod
+    def from_dict(cls, state):
+        """
+        Args:
+            state (dict): State from to_dict
+        
+        Returns:
+            ScoreHistogram: Restored histogram
+        """
+        
+        histogram = cls(len(state['counts']), state['bin_edges'][0], state['bin_edges'][-1])
+        histogram.bin_edges = np.asarray(state['bin_edges'], dtype=float)
+        histogram.counts = np.asarray(state['counts'], dtype=np.int64)
+        return histogram
+
+
+class QuantileSketch:
+    """
+    KLL quantile sketch.
+    
+    Values are kept in levels of compactors; an item on level h stands for
+    2**h original values. When a level outgrows its capacity it is sorted
+    and every other item (from a random offset) is promoted to the next
+    level. Memory stays below about 3 * k items however many values are added,
+    and the rank error is roughly 1.7 / k (about 1% for k = 200). While
+    fewer values than the capacity have been added the results are exact.
+    """
+    
+    def __init__(self, k=SKETCH_QUANTILE_K, seed=0):
+        self.k = k
+        self.count = 0
+        self.min_value = None
+        self.max_value = None
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+    
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+    
+    def update(self, values):
+        """
+        Adds values to the sketch.
+        
+        Args:
+            values (array-like): Values
+        
+        Returns:
+            QuantileSketch: self, for chaining
+        """
+        
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        
+        self._add_extremes(values.min(), values.max(), len(values))
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+    
+    def _add_extremes(self, min_value, max_value, count):
+        self.count += count
+        self.min_value = min_value if self.min_value is None else min(self.min_value, min_value)
+        self.max_value = max_value if self.max_value is None else max(self.max_value, max_value)
+    
+    def _compress(self):
+        while True:
+            overflowing = [level for level, items in enumerate(self.levels) if len(items) > self._capacity(level)]
+            if not overflowing:
+                return
+            
+            level = overflowing[0]
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            
+            items = np.sort(self.levels[level])
+            
+            # An odd item out stays on this level
+            leftover = items[len(items) - len(items) % 2:]
+            promoted = items[self._rng.integers(2):len(items) - len(leftover):2]
+            
+            self.levels[level] = leftover
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+    
+    def merge(self, other):
+        """
+        Adds the values summarized by another sketch.
+        
+        Args:
+            other (QuantileSketch): Sketch to merge
+        
+        Returns:
+            QuantileSketch: self, for chaining
+        """
+        
+        if other.count == 0:
+            return self
+        
+        self._add_extremes(other.min_value, other.max_value, other.count)
+        for level, items in enumerate(other.levels):
+            if level == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self._compress()
+        return self
+    
+    def quantile(self, q):
+        """
+        Estimates a quantile.
+        
+        Args:
+            q (float): Quantile between 0 and 1 (e.g. 0.5 for the median)
+        
+        Returns:
+            float: Estimated value, or None if the sketch is empty
+        """
+        
+        if self.count == 0:
+            return None
+        if q <= 0:
+            return float(self.min_value)
+        if q >= 1:
+            return float(self.max_value)
+        
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level_items), 2 ** level, dtype=np.int64)
+                                  for level, level_items in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        cumulative = np.cumsum(weights[order])
+        index = np.searchsorted(cumulative, q * cumulative[-1], side='left')
+        return float(items[order][min(index, len(items) - 1)])
+    
+    def to_dict(self):
+        """
+        Returns:
+            dict: JSON-serializable state, restored with from_dict
+        """
+        
+        return {
+            'k': self.k,
+            'count': self.count,
+            'min_value': None if self.min_value is None else float(self.min_value),
+            'max_value': None if self.max_value is None else float(self.max_value),
+            'levels': [items.tolist() for items in self.levels]
+        }
+    
+    @classmethod
+    def from_dict(cls, state):
+        """
+        Args:
+            state (dict): State from to_dict
+        
+        Returns:
+            QuantileSketch: Restored sketch
+        """
+        
+        sketch = cls(state['k'])
+        sketch.count = state['count']
+        sketch.min_value = state['min_value']
+        sketch.max_value = state['max_value']
+        sketch.levels = [np.asarray(items, dtype=float) for items in state['levels']]
+        return sketch
+
+
+class TopKReviews:
+    """
+    The k highest and k lowest scoring reviews seen, kept in two bounded heaps.
+    
+    Each batch is narrowed to its own k best candidates with a linear-time
+    partition before touching the heaps, so memory is O(k) and nothing is
+    sorted. Among equal scores the review seen first is kept.
+    """
+    
+    def __init__(self, k=TOP_REVIEWS_K):
+        self.k = k
+        self.seen = 0
+        # Min-heaps of (score, -order, review) and (-score, -order, review)
+        self._positive = []
+        self._negative = []
+    
+    @staticmethod
+    def _candidates(values, k):
+        """Positions of the k largest values, earliest first among ties, without sorting."""
+        
+        if len(values) <= k:
+            return np.arange(len(values))
+        
+        kth = np.partition(values, len(values) - k)[len(values) - k]
+        above = np.flatnonzero(values > kth)
+        ties = np.flatnonzero(values == kth)[:k - len(above)]
+        return np.concatenate([above, ties])
+    
+    def update(self, df):
+        """
+        Adds a batch of analyzed reviews.
+        
+        Args:
+            df (DataFrame): Batch with a sentiment_score column
+        
+        Returns:
+            TopKReviews: self, for chaining
+        """
+        
+        if df is None or len(df) == 0:
+            return self
+        
+        scores = df['sentiment_score'].to_numpy(dtype=float)
+        valid = np.flatnonzero(~np.isnan(scores))
+        
+        for heap, values in ((self._positive, scores[valid]), (self._negative, -scores[valid])):
+            positions = valid[self._candidates(values, self.k)]
+            records = review_records(df.iloc[positions])
+            for position, record in zip(positions.tolist(), records):
+                score = scores[position] if heap is self._positive else -scores[position]
+                self._push(heap, (float(score), -(self.seen + position), record))
+        
+        self.seen += len(df)
+        return self
+    
+    def _push(self, heap, entry):
+        if len(heap) < self.k:
+            heapq.heappush(heap, entry)
+        elif entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
+    
+    def merge(self, other):
+        """
+        Adds the reviews kept by another tracker; its reviews count as seen after this one's.
+        
+        Args:
+            other (TopKReviews): Tracker to merge
+        
+        Returns:
+            TopKReviews: self, for chaining
+        """
+        
+        for heap, other_heap in ((self._positive, other._positive), (self._negative, other._negative)):
+            for score, negative_order, record in other_heap:
+                self._push(heap, (score, negative_order - self.seen, record))
+        
+        self.seen += other.seen
+        return self
+    
+    def get_top(self):
+        """
+        Returns:
+            dict: 'most_positive' reviews (highest score first) and
+                'most_negative' reviews (lowest score first)
+        """
+        
+        return {
+            'most_positive': [record for _, _, record in sorted(self._positive, key=lambda e: e[:2], reverse=True)],
+            'most_negative': [record for _, _, record in sorted(self._negative, key=lambda e: e[:2], reverse=True)]
+        }
+    
+    def to_dict(self):
+        """
+        Returns:
+            dict: JSON-serializable state, restored with from_dict
+        """
+        
+        return {
+            'k': self.k,
+            'seen': self.seen,
+            'positive': [list(entry) for entry in self._positive],
+            'negative': [list(entry) for entry in self._negative]
+        }
+    
+    @classmethod
+    def from_dict(cls, state):
+        """
+        Args:
+            state (dict): State from to_dict
+        
+        Returns:
+            TopKReviews: Restored tracker
+        """
+        
+        tracker = cls(state['k'])
+        tracker.seen = state['seen']
+        tracker._positive = [tuple(entry) for entry in state['positive']]
+        tracker._negative = [tuple(entry) for entry in state['negative']]
+        heapq.heapify(tracker._positive)
+        heapq.heapify(tracker._negative)
+        return tracker
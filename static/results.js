@@ -63,12 +63,7 @@ function displayResults(results) {
     updateProgressBar('negativeBar', stats.negative_pct);
 
     // Display sentiment chart
-    const chartImg = document.getElementById('sentimentChart');
-    chartImg.src = results.chart_url;
-    chartImg.onerror = function() {
-        console.error('Failed to load chart image');
-        this.style.display = 'none';
-    };
+    displayChart(results);
 
     // Populate detail statistics
     document.getElementById('maxSentiment').textContent = stats.max_sentiment.toFixed(3);
@@ -96,6 +91,161 @@ function updateProgressBar(elementId, percentage) {
     }
 }
 
+/**
+ * Display the sentiment chart: a PNG image, inline SVG or a JSON chart spec
+ * @param {Object} results - Analysis results from backend
+ */
+function displayChart(results) {
+    const chartImg = document.getElementById('sentimentChart');
+    let svg = null;
+
+    if (results.chart_format === 'svg' && results.chart_svg) {
+        const parsed = new DOMParser().parseFromString(results.chart_svg, 'image/svg+xml');
+        svg = document.importNode(parsed.documentElement, true);
+    } else if (results.chart_format === 'json' && results.chart_spec) {
+        svg = renderChartSpec(results.chart_spec);
+    }
+
+    if (svg) {
+        svg.classList.add('chart-image', 'chart-svg');
+        chartImg.replaceWith(svg);
+        return;
+    }
+
+    loadChartImage(chartImg, results.chart_url);
+}
+
+/**
+ * Load a chart image that may still be rendering in the background.
+ * The server answers 202 until the chart is ready, so the request is retried.
+ * @param {HTMLImageElement} chartImg - Image element to fill
+ * @param {string} url - Chart URL
+ * @param {number} attempts - Remaining retries
+ */
+function loadChartImage(chartImg, url, attempts = 30) {
+    fetch(url)
+        .then(response => {
+            if (response.status === 202 && attempts > 0) {
+                const delay = 1000 * (parseInt(response.headers.get('Retry-After'), 10) || 1);
+                setTimeout(() => loadChartImage(chartImg, url, attempts - 1), delay);
+                return null;
+            }
+            if (!response.ok) {
+                throw new Error(`HTTP ${response.status}`);
+            }
+            return response.blob();
+        })
+        .then(blob => {
+            if (blob) {
+                chartImg.src = URL.createObjectURL(blob);
+            }
+        })
+        .catch(error => {
+            console.error('Failed to load chart image:', error);
+            chartImg.style.display = 'none';
+        });
+}
+
+/**
+ * Draw a chart spec (see chart_specs.py) as an SVG element.
+ * Uses the same layout as chart_specs.render_svg.
+ * @param {Object} spec - 'bar' or 'histogram' chart spec
+ * @param {number} width - Width in pixels
+ * @param {number} height - Height in pixels
+ * @returns {SVGElement} Chart
+ */
+function renderChartSpec(spec, width = 600, height = 360) {
+    const ns = 'http://www.w3.org/2000/svg';
+    const [x0, x1, y0, y1] = [64, width - 16, 48, height - 48];
+
+    const svg = document.createElementNS(ns, 'svg');
+    svg.setAttribute('viewBox', `0 0 ${width} ${height}`);
+    svg.setAttribute('width', width);
+    svg.setAttribute('height', height);
+    svg.setAttribute('font-family', 'sans-serif');
+    svg.setAttribute('font-size', '12');
+
+    function add(tag, attributes, text) {
+        const element = document.createElementNS(ns, tag);
+        Object.entries(attributes).forEach(([name, value]) => element.setAttribute(name, value));
+        if (text !== undefined) element.textContent = text;
+        svg.appendChild(element);
+        return element;
+    }
+
+    const values = spec.type === 'bar' ? spec.bars.map(bar => bar.value) : spec.counts;
+    const yMax = Math.max(0, ...values) * (spec.type === 'bar' ? 1.15 : 1.05);
+    const ticks = niceTicks(yMax);
+    const y = value => y1 - (y1 - y0) * value / ticks[ticks.length - 1];
+
+    add('text', {x: width / 2, y: 24, 'text-anchor': 'middle', 'font-size': 16, 'font-weight': 'bold'}, spec.title);
+
+    // Grid lines and y-axis tick labels
+    ticks.forEach(tick => {
+        add('line', {x1: x0, y1: y(tick), x2: x1, y2: y(tick), stroke: '#ccc', 'stroke-dasharray': '4 3'});
+        add('text', {x: x0 - 6, y: y(tick) + 4, 'text-anchor': 'end'}, tick);
+    });
+
+    if (spec.type === 'bar') {
+        const slot = (x1 - x0) / Math.max(values.length, 1);
+        spec.bars.forEach((bar, i) => {
+            const center = x0 + slot * (i + 0.5);
+            add('rect', {x: x0 + slot * (i + 0.2), y: y(bar.value), width: slot * 0.6, height: y1 - y(bar.value),
+                         fill: bar.color, stroke: '#000', 'stroke-width': 1.5});
+            add('text', {x: center, y: y(bar.value) - 5, 'text-anchor': 'middle', 'font-weight': 'bold'}, bar.value);
+            add('text', {x: center, y: y1 + 16, 'text-anchor': 'middle'}, bar.label);
+        });
+    } else {
+        const edges = spec.bin_edges;
+        const margin = (edges[edges.length - 1] - edges[0]) * 0.05;
+        const low = edges[0] - margin;
+        const high = edges[edges.length - 1] + margin;
+        const x = value => x0 + (x1 - x0) * (value - low) / (high - low);
+
+        spec.counts.forEach((count, i) => {
+            add('rect', {x: x(edges[i]), y: y(count), width: x(edges[i + 1]) - x(edges[i]), height: y1 - y(count),
+                         fill: spec.color, 'fill-opacity': 0.7, stroke: '#000', 'stroke-width': 0.5});
+        });
+
+        for (let i = 0; i <= 4; i++) {
+            const tick = edges[0] + (edges[edges.length - 1] - edges[0]) * i / 4;
+            add('text', {x: x(tick), y: y1 + 16, 'text-anchor': 'middle'}, tick);
+        }
+
+        if (spec.average !== null && spec.average !== undefined) {
+            add('line', {x1: x(spec.average), y1: y0, x2: x(spec.average), y2: y1, stroke: 'red',
+                         'stroke-width': 2, 'stroke-dasharray': '6 4'});
+            add('text', {x: x1 - 4, y: y0 + 14, 'text-anchor': 'end', fill: 'red'},
+                `Average: ${spec.average.toFixed(3)}`);
+        }
+    }
+
+    // Axes and axis labels
+    add('path', {d: `M${x0} ${y0}V${y1}H${x1}`, fill: 'none', stroke: '#000'});
+    add('text', {x: (x0 + x1) / 2, y: height - 12, 'text-anchor': 'middle', 'font-weight': 'bold'}, spec.x_label);
+    add('text', {transform: `translate(16 ${(y0 + y1) / 2}) rotate(-90)`, 'text-anchor': 'middle',
+                 'font-weight': 'bold'}, spec.y_label);
+
+    return svg;
+}
+
+/**
+ * Y-axis ticks from 0 to at least top, spaced 1, 2 or 5 times a power of ten (at least 1)
+ * @param {number} top - Largest value to cover
+ * @param {number} count - Approximate number of ticks
+ * @returns {Array} Tick values
+ */
+function niceTicks(top, count = 5) {
+    const rawStep = Math.max(top, 1) / (count - 1);
+    const magnitude = Math.pow(10, Math.floor(Math.log10(rawStep)));
+    const step = Math.max(1, [1, 2, 5, 10].map(m => m * magnitude).find(s => s >= rawStep));
+    const ticks = [];
+    for (let i = 0; i <= Math.ceil(Math.max(top, 1) / step); i++) {
+        ticks.push(i * step);
+    }
+    return ticks;
+}
+
 /**
  * Display sample reviews
  * @param {Array} reviews - Array of review objects
@@ -119,7 +269,7 @@ function displaySampleReviews(reviews) {
 
         reviewItem.innerHTML = `
             <div class="review-rating">
-                ${sentimentEmoji} ${review.rating || 'N/A'} - 
+                ${sentimentEmoji} ${formatRating(review.rating)} - 
                 Score: ${(review.sentiment_score || 0).toFixed(3)}
             </div>
             <div class="review-text">"${truncateText(review.review_text, 150)}"</div>
@@ -133,6 +283,18 @@ function displaySampleReviews(reviews) {
     });
 }
 
+/**
+ * Format a numeric star rating as stars
+ * @param {number} rating - Number of stars (e.g. 3.5), or null if unrated
+ * @returns {string} Rating such as '★★★½', or 'N/A'
+ */
+function formatRating(rating) {
+    if (typeof rating !== 'number') {
+        return rating || 'N/A';
+    }
+    return '★'.repeat(Math.floor(rating)) + (rating % 1 >= 0.5 ? '½' : '');
+}
+
 /**
  * Truncate text to specified length
  * @param {string} text - Text to truncate
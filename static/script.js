@@ -30,8 +30,8 @@ document.addEventListener('DOMContentLoaded', function() {
         errorMessage.style.display = 'none';
 
         try {
-            // Send analysis request to backend
-            const response = await fetch('/api/analyze', {
+            // Queue the analysis, then poll the job until it finishes
+            const response = await fetch('/api/jobs', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json'
@@ -41,11 +41,20 @@ document.addEventListener('DOMContentLoaded', function() {
                 })
             });
 
-            const data = await response.json();
+            const job = await response.json();
+
+            if (!response.ok) {
+                // Show error message (429 when the server is busy)
+                showError(job.error || 'An error occurred during analysis');
+                resetButton();
+                return;
+            }
 
-            if (response.ok) {
+            const data = await waitForJob(job.status_url);
+
+            if (data.status === 'done') {
                 // Store results in session storage for results page
-                sessionStorage.setItem('analysisResults', JSON.stringify(data));
+                sessionStorage.setItem('analysisResults', JSON.stringify(data.result));
 
                 // Redirect to results page
                 window.location.href = '/results';
@@ -61,6 +70,23 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     });
 
+    // Poll an analysis job until it is done or has failed
+    async function waitForJob(statusUrl) {
+        while (true) {
+            const response = await fetch(statusUrl);
+            const data = await response.json();
+
+            if (!response.ok) {
+                return {status: 'failed', error: data.error};
+            }
+            if (data.status === 'done' || data.status === 'failed') {
+                return data;
+            }
+
+            await new Promise(resolve => setTimeout(resolve, 1000));
+        }
+    }
+
     // Show error message
     function showError(message) {
         errorMessage.textContent = message;
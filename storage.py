@@ -0,0 +1,462 @@
+"""
+Storage module for the pipeline's review tables.
+Reads and writes reviews as CSV or as compressed, typed columnar files (Parquet / Feather).
+"""
+
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+import pandas as pd
+
+from config import STORAGE_FORMAT, COLUMNAR_COMPRESSION
+
+
+# File extension for each supported format
+FORMAT_EXTENSIONS = {
+    'csv': '.csv',
+    'parquet': '.parquet',
+    'feather': '.feather',
+}
+
+# Whether the optional pyarrow dependency is importable (checked on first use)
+_pyarrow_available = None
+
+# Single background writer, so persisted files are written in submission order
+_persist_executor = None
+_persist_lock = threading.Lock()
+_pending_writes = set()
+
+
+def _has_pyarrow():
+    global _pyarrow_available
+    
+    if _pyarrow_available is None:
+        try:
+            import pyarrow  # noqa: F401
+            _pyarrow_available = True
+        except ImportError:
+            _pyarrow_available = False
+    
+    return _pyarrow_available
+
+
+def get_storage_format(fmt=None):
+    """
+    Resolves the storage format to use, falling back to CSV when a columnar
+    format is configured but pyarrow is not installed.
+    
+    Args:
+        fmt (str): 'csv', 'parquet' or 'feather' (default from config)
+    
+    Returns:
+        str: Usable storage format
+    """
+    
+    fmt = fmt or STORAGE_FORMAT
+    
+    if fmt not in FORMAT_EXTENSIONS:
+        raise ValueError(f"Unknown storage format: {fmt}")
+    
+    if fmt != 'csv' and not _has_pyarrow():
+        print(f"⚠ pyarrow is not installed, storing data as CSV instead of {fmt}")
+        return 'csv'
+    
+    return fmt
+
+
+def artifact_path(directory, filename, fmt=None):
+    """
+    Builds the path of a pipeline artifact with the extension of the storage format.
+    
+    Args:
+        directory (str): Directory of the artifact
+        filename (str): File name; its extension is replaced (e.g. 'reviews_raw.csv')
+        fmt (str): Storage format (default from config)
+    
+    Returns:
+        str: Artifact path, e.g. 'data/reviews_raw.parquet'
+    """
+    
+    stem = os.path.splitext(filename)[0]
+    return os.path.join(directory, stem + FORMAT_EXTENSIONS[get_storage_format(fmt)])
+
+
+def format_from_path(filepath):
+    """
+    Infers the storage format from a file extension (CSV if unrecognized).
+    
+    Args:
+        filepath (str): Path to a reviews file
+    
+    Returns:
+        str: Storage format
+    """
+    
+    extension = os.path.splitext(filepath)[1].lower()
+    for fmt, fmt_extension in FORMAT_EXTENSIONS.items():
+        if extension == fmt_extension:
+            return fmt
+    return 'csv'
+
+
+def write_reviews(df, filepath, fmt=None):
+    """
+    Writes a reviews dataframe in the given format.
+    
+    Args:
+        df (DataFrame): Reviews to write
+        filepath (str): Output path
+        fmt (str): Storage format (default: inferred from the extension)
+    """
+    
+    fmt = fmt or format_from_path(filepath)
+    
+    if fmt == 'csv':
+        df.to_csv(filepath, index=False, encoding='utf-8')
+    elif fmt == 'parquet':
+        df.to_parquet(filepath, index=False, compression=COLUMNAR_COMPRESSION)
+    elif fmt == 'feather':
+        df.reset_index(drop=True).to_feather(filepath, compression=COLUMNAR_COMPRESSION)
+    else:
+        raise ValueError(f"Unknown storage format: {fmt}")
+
+
+def as_review_frame(reviews):
+    """
+    Returns reviews as a DataFrame, accepting a DataFrame or a list of review records.
+    
+    Args:
+        reviews (DataFrame or list): Reviews
+    
+    Returns:
+        DataFrame: Reviews
+    """
+    
+    if isinstance(reviews, pd.DataFrame):
+        return reviews
+    return pd.DataFrame(reviews)
+
+
+def create_temp_file(path):
+    """
+    Creates an empty temporary file next to path, to write path's new
+    content to before os.replace moves it into place. The name is unique
+    across threads and processes, so concurrent writers never share one.
+    
+    Args:
+        path (str): File the temporary file will replace
+    
+    Returns:
+        str: Path of the temporary file
+    """
+    
+    fd, tmp_path = tempfile.mkstemp(prefix=f"{os.path.basename(path)}.", suffix='.tmp',
+                                    dir=os.path.dirname(path) or '.')
+    os.close(fd)
+    return tmp_path
+
+
+def _write_reviews_atomic(df, filepath, fmt):
+    os.makedirs(os.path.dirname(filepath) or '.', exist_ok=True)
+    
+    # Readers never see a half-written file
+    tmp_path = create_temp_file(filepath)
+    try:
+        write_reviews(df, tmp_path, fmt)
+        os.replace(tmp_path, filepath)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _persist_job(df, filepath, fmt):
+    try:
+        _write_reviews_atomic(df, filepath, fmt)
+        print(f"✓ Reviews saved to {filepath}")
+        return True
+    except Exception as e:
+        print(f"✗ Error saving reviews to {filepath}: {str(e)}")
+        return False
+
+
+def persist_reviews(reviews, filepath, fmt=None, background=False):
+    """
+    Saves reviews to a file, optionally on a background thread so the caller
+    does not wait for serialization and disk I/O.
+    
+    Background writes work on a copy of the data, so the caller may keep
+    modifying its DataFrame. They run one at a time in submission order.
+    
+    Args:
+        reviews (DataFrame or list): Reviews to save
+        filepath (str): Output path
+        fmt (str): Storage format (default: inferred from the extension)
+        background (bool): Write on the background thread and return immediately
+    
+    Returns:
+        bool or Future: True/False for a synchronous write, otherwise a Future
+            resolving to True/False
+    """
+    
+    global _persist_executor
+    
+    fmt = fmt or format_from_path(filepath)
+    
+    if not background:
+        return _persist_job(as_review_frame(reviews), filepath, fmt)
+    
+    df = as_review_frame(reviews).copy()
+    
+    with _persist_lock:
+        if _persist_executor is None:
+            _persist_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='persist')
+        future = _persist_executor.submit(_persist_job, df, filepath, fmt)
+        _pending_writes.add(future)
+    
+    future.add_done_callback(_pending_writes.discard)
+    return future
+
+
+def wait_for_pending_writes(timeout=None):
+    """
+    Blocks until all background writes submitted so far have finished.
+    
+    Args:
+        timeout (float): Maximum seconds to wait (default: no limit)
+    
+    Returns:
+        bool: True if all writes finished in time
+    """
+    
+    with _persist_lock:
+        pending = list(_pending_writes)
+    
+    if not pending:
+        return True
+    
+    _, not_done = wait(pending, timeout=timeout)
+    return not not_done
+
+
+def read_reviews(filepath, fmt=None, **csv_options):
+    """
+    Reads a reviews file written by write_reviews.
+    
+    Args:
+        filepath (str): Path to the file
+        fmt (str): Storage format (default: inferred from the extension)
+        **csv_options: Extra arguments for pandas.read_csv (CSV only)
+    
+    Returns:
+        DataFrame: Reviews
+    """
+    
+    fmt = fmt or format_from_path(filepath)
+    
+    if fmt == 'csv':
+        return pd.read_csv(filepath, **csv_options)
+    if fmt == 'parquet':
+        return pd.read_parquet(filepath)
+    if fmt == 'feather':
+        return pd.read_feather(filepath)
+    raise ValueError(f"Unknown storage format: {fmt}")
+
+
+def iter_reviews(filepath, chunksize, fmt=None, **csv_options):
+    """
+    Reads a reviews file in chunks of at most chunksize rows.
+    
+    Args:
+        filepath (str): Path to the file
+        chunksize (int): Maximum rows per chunk
+        fmt (str): Storage format (default: inferred from the extension)
+        **csv_options: Extra arguments for pandas.read_csv (CSV only)
+    
+    Yields:
+        DataFrame: Chunk of reviews
+    """
+    
+    fmt = fmt or format_from_path(filepath)
+    
+    if fmt == 'csv':
+        with pd.read_csv(filepath, chunksize=chunksize, **csv_options) as reader:
+            yield from reader
+    
+    elif fmt == 'parquet':
+        import pyarrow.parquet as pq
+        
+        parquet_file = pq.ParquetFile(filepath)
+        for batch in parquet_file.iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    
+    elif fmt == 'feather':
+        import pyarrow as pa
+        
+        with pa.memory_map(filepath) as source:
+            reader = pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                table = pa.Table.from_batches([reader.get_batch(i)])
+                for start in range(0, table.num_rows, chunksize):
+                    yield table.slice(start, chunksize).to_pandas()
+    
+    else:
+        raise ValueError(f"Unknown storage format: {fmt}")
+
+
+def convert_reviews(input_filepath, output_filepath, chunksize=100000):
+    """
+    Converts a reviews file between formats chunk by chunk,
+    e.g. to export a Parquet artifact as CSV.
+    
+    Args:
+        input_filepath (str): Source file
+        output_filepath (str): Destination file; its extension selects the format
+        chunksize (int): Rows converted at a time
+    
+    Returns:
+        int: Number of rows written
+    """
+    
+    with ReviewWriter(output_filepath) as writer:
+        for chunk in iter_reviews(input_filepath, chunksize):
+            writer.write(chunk)
+    
+    print(f"✓ {writer.rows_written} reviews exported to {output_filepath}")
+    return writer.rows_written
+
+
+def _chunk_schema(schema, fmt):
+    """
+    Schema every chunk is converted to. Categorical columns get 32-bit codes so
+    later chunks with more categories fit; Feather files, which allow only one
+    dictionary per column, store the category values instead.
+    """
+    
+    import pyarrow as pa
+    
+    fields = []
+    for field in schema:
+        if pa.types.is_dictionary(field.type):
+            if fmt == 'feather':
+                field = field.with_type(field.type.value_type)
+            else:
+                field = field.with_type(pa.dictionary(pa.int32(), field.type.value_type, field.type.ordered))
+        fields.append(field)
+    
+    return pa.schema(fields, metadata=schema.metadata)
+
+
+class ReviewWriter:
+    """
+    Appends dataframe chunks to a single reviews file.
+    
+    The column types of the first non-empty chunk fix the schema of columnar
+    files. Chunks go to a temporary file that replaces filepath on close(),
+    so readers and concurrent writers never see a partial file; abort()
+    discards it and leaves any existing file untouched. Use as a context
+    manager (which aborts on an exception), or call close() when done.
+    """
+    
+    def __init__(self, filepath, fmt=None):
+        self.filepath = filepath
+        self.fmt = fmt or format_from_path(filepath)
+        self.rows_written = 0
+        self._tmp_path = None   # Created on the first write
+        self._closed = False
+        self._writer = None
+        self._schema = None
+        self._empty = None
+        self._wrote_csv_header = False
+    
+    def write(self, df):
+        """
+        Appends a chunk of reviews.
+        
+        Args:
+            df (DataFrame): Chunk to append
+        """
+        
+        if self.fmt == 'csv':
+            df.to_csv(self._temp_path(), mode='a' if self._wrote_csv_header else 'w',
+                      header=not self._wrote_csv_header, index=False, encoding='utf-8')
+            self._wrote_csv_header = True
+            self.rows_written += len(df)
+            return
+        
+        # Empty chunks carry no type information; keep one in case nothing else arrives
+        if len(df) == 0:
+            if self._empty is None:
+                self._empty = df
+            return
+        
+        import pyarrow as pa
+        
+        if self._writer is None:
+            self._schema = _chunk_schema(pa.Table.from_pandas(df, preserve_index=False).schema, self.fmt)
+            self._writer = self._open_writer(self._schema)
+        
+        table = pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+        
+        self._writer.write_table(table)
+        self.rows_written += len(df)
+    
+    def _open_writer(self, schema):
+        import pyarrow as pa
+        
+        if self.fmt == 'parquet':
+            import pyarrow.parquet as pq
+            return pq.ParquetWriter(self._temp_path(), schema, compression=COLUMNAR_COMPRESSION)
+        if self.fmt == 'feather':
+            options = pa.ipc.IpcWriteOptions(compression=COLUMNAR_COMPRESSION)
+            return pa.ipc.new_file(self._temp_path(), schema, options=options)
+        raise ValueError(f"Unknown storage format: {self.fmt}")
+    
+    def close(self):
+        """Finishes the file, writing an empty one if no rows were appended."""
+        
+        if self._closed:
+            return
+        self._closed = True
+        
+        try:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+            elif self.fmt != 'csv' and self._empty is not None:
+                write_reviews(self._empty, self._temp_path(), self.fmt)
+            
+            if self._tmp_path is not None:
+                os.replace(self._tmp_path, self.filepath)
+        finally:
+            if self._tmp_path is not None and os.path.exists(self._tmp_path):
+                os.remove(self._tmp_path)
+    
+    def abort(self):
+        """Discards the chunks written so far; an existing file at filepath is kept."""
+        
+        if self._closed:
+            return
+        self._closed = True
+        
+        try:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+        finally:
+            if self._tmp_path is not None and os.path.exists(self._tmp_path):
+                os.remove(self._tmp_path)
+    
+    def _temp_path(self):
+        if self._tmp_path is None:
+            self._tmp_path = create_temp_file(self.filepath)
+        return self._tmp_path
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
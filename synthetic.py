@@ -0,0 +1,127 @@
+"""
+Synthetic review generator for load tests and benchmarks.
+Produces large, reproducible review datasets without network access.
+"""
+
+import argparse
+import os
+import numpy as np
+import pandas as pd
+
+from storage import ReviewWriter
+from scraper import (POSITIVE_REVIEW_TEMPLATES, NEUTRAL_REVIEW_TEMPLATES, NEGATIVE_REVIEW_TEMPLATES,
+                     SAMPLE_REVIEWER_NAMES, stable_seed)
+
+
+# All templates in one array; a review's text is an index into it
+_TEMPLATES = np.array(POSITIVE_REVIEW_TEMPLATES + NEUTRAL_REVIEW_TEMPLATES + NEGATIVE_REVIEW_TEMPLATES, dtype=object)
+_POOL_OFFSETS = np.array([0, len(POSITIVE_REVIEW_TEMPLATES),
+                          len(POSITIVE_REVIEW_TEMPLATES) + len(NEUTRAL_REVIEW_TEMPLATES)])
+_POOL_SIZES = np.array([len(POSITIVE_REVIEW_TEMPLATES), len(NEUTRAL_REVIEW_TEMPLATES),
+                        len(NEGATIVE_REVIEW_TEMPLATES)])
+POSITIVE, NEUTRAL, NEGATIVE = 0, 1, 2
+
+# Star strings indexed by rating (index 0 unused)
+_STARS = np.array(['', '★', '★★', '★★★', '★★★★', '★★★★★'], dtype=object)
+
+_REVIEWERS = np.array(SAMPLE_REVIEWER_NAMES, dtype=object)
+
+# Same date pattern as get_sample_reviews, which repeats every 84 reviews
+_DATES = np.array([f'2024-{(i % 12) + 1:02d}-{(i % 28) + 1:02d}' for i in range(84)], dtype=object)
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+def generate_synthetic_reviews(movie_name, n_reviews, chunk_size=DEFAULT_CHUNK_SIZE, seed=None,
+                               rating_weights=None, crossover=0.3):
+    """
+    Generates synthetic reviews in DataFrame chunks, with the same columns as scraped reviews.
+    
+    Output is fully determined by the seed, which defaults to a digest of the
+    movie name, so the same movie always produces the same reviews. Like
+    get_sample_reviews, 5/1 star reviews use positive/negative text, 3 star
+    reviews use neutral text, and 4/2 star reviews use neutral text with
+    probability ``crossover``.
+    
+    Args:
+        movie_name (str): Name of the movie
+        n_reviews (int): Total number of reviews to generate
+        chunk_size (int): Reviews per yielded DataFrame
+        seed (int): Random seed (default: derived from the movie name)
+        rating_weights (list): Relative weights of 5, 4, 3, 2 and 1 star ratings
+            (default: drawn per movie, as in get_sample_reviews)
+        crossover (float): Probability that a 4 or 2 star review has neutral text
+    
+    Yields:
+        DataFrame: Chunk of reviews
+    """
+    
+    rng = np.random.default_rng(stable_seed(movie_name) if seed is None else seed)
+    
+    if rating_weights is None:
+        rating_weights = rng.integers([15, 15, 15, 5, 5], [36, 31, 31, 21, 21])
+    weights = np.asarray(rating_weights, dtype=float)
+    weights = weights / weights.sum()
+    
+    for start in range(0, n_reviews, chunk_size):
+        size = min(chunk_size, n_reviews - start)
+        
+        ratings = rng.choice([5, 4, 3, 2, 1], size=size, p=weights)
+        
+        # Pick the template pool for each rating, then a template within the pool
+        pools = np.where(ratings >= 4, POSITIVE, np.where(ratings == 3, NEUTRAL, NEGATIVE))
+        crossed = ((ratings == 4) | (ratings == 2)) & (rng.random(size) < crossover)
+        pools[crossed] = NEUTRAL
+        template_idx = _POOL_OFFSETS[pools] + (rng.random(size) * _POOL_SIZES[pools]).astype(np.int64)
+        
+        positions = np.arange(start, start + size)
+        
+        yield pd.DataFrame({
+            'reviewer': _REVIEWERS[positions % len(_REVIEWERS)],
+            'rating': _STARS[ratings],
+            'review_text': _TEMPLATES[template_idx],
+            'date': _DATES[positions % len(_DATES)],
+            'movie_name': movie_name
+        })
+
+
+def write_synthetic_reviews(movie_name, n_reviews, filepath, chunk_size=DEFAULT_CHUNK_SIZE, **kwargs):
+    """
+    Generates synthetic reviews and writes them to a file chunk by chunk,
+    so memory use does not grow with n_reviews.
+    
+    Args:
+        movie_name (str): Name of the movie
+        n_reviews (int): Total number of reviews to generate
+        filepath (str): Output path (.csv, .parquet or .feather)
+        chunk_size (int): Reviews generated and written at a time
+        **kwargs: Passed on to generate_synthetic_reviews
+    
+    Returns:
+        int: Number of reviews written
+    """
+    
+    os.makedirs(os.path.dirname(filepath) or '.', exist_ok=True)
+    
+    with ReviewWriter(filepath) as writer:
+        for chunk in generate_synthetic_reviews(movie_name, n_reviews, chunk_size, **kwargs):
+            writer.write(chunk)
+    
+    print(f"✓ {writer.rows_written} synthetic reviews saved to {filepath}")
+    return writer.rows_written
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate synthetic Letterboxd-style reviews')
+    parser.add_argument('movie_name', help='Movie name (also seeds the generator)')
+    parser.add_argument('n_reviews', type=int, help='Number of reviews to generate')
+    parser.add_argument('output', help='Output path (.csv, .parquet or .feather)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--rating-weights', type=float, nargs=5, default=None,
+                        metavar=('W5', 'W4', 'W3', 'W2', 'W1'))
+    parser.add_argument('--crossover', type=float, default=0.3)
+    args = parser.parse_args()
+    
+    write_synthetic_reviews(args.movie_name, args.n_reviews, args.output, args.chunk_size,
+                            seed=args.seed, rating_weights=args.rating_weights, crossover=args.crossover)
@@ -4,8 +4,12 @@ Run this to test functionality without the web server.
 """
 
 import os
+import re
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 import pandas as pd
-from scraper import scrape_letterboxd_reviews, save_reviews_to_csv, get_sample_reviews
+from scraper import scrape_letterboxd_reviews, save_reviews_to_csv, get_sample_reviews, ResponseCache
 from preprocessor import preprocess_reviews
 from analyzer import analyze_all_reviews, calculate_sentiment_stats, get_sentiment_distribution
 from visualizer import create_sentiment_chart
@@ -184,6 +188,1108 @@ def test_visualization():
         print(f"✗ Failed to create chart\n")
 
 
+def _review_page_html(page, per_page=12):
+    """Builds a Letterboxd-style review page with per_page reviews."""
+    
+    items = []
+    for i in range(per_page):
+        n = (page - 1) * per_page + i
+        items.append(
+            f'<div class="review"><a class="reviewer">user_{n}</a>'
+            f'<span class="rating">★★★</span><time datetime="2024-01-01"></time>'
+            f'<p class="review-text">Review number {n}, a great film.</p></div>'
+        )
+    return f"<html><body>{''.join(items)}</body></html>"
+
+
+class _ReviewPageHandler(BaseHTTPRequestHandler):
+    """Serves numbered review pages; pages past total_pages are empty."""
+    
+    total_pages = 3
+    requested_pages = []
+    
+    def do_GET(self):
+        match = re.search(r'/page/(\d+)/', self.path)
+        page = int(match.group(1)) if match else 1
+        self.requested_pages.append(page)
+        html = _review_page_html(page) if page <= self.total_pages else "<html></html>"
+        body = html.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+def _start_local_server(handler_cls):
+    """Starts a local stand-in for Letterboxd and returns (server, base_url)."""
+    
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler_cls)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_paginated_scraping():
+    """
+    Tests paginated, concurrent scraping against a local stand-in server.
+    """
+    
+    handler = type('Handler', (_ReviewPageHandler,), {'requested_pages': []})
+    server, base_url = _start_local_server(handler)
+    
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = ResponseCache(cache_dir)
+            
+            # Stops at max_reviews even though more pages exist
+            reviews = scrape_letterboxd_reviews("Test Movie", max_reviews=30, paginate=True,
+                                                workers=4, base_url=base_url, cache=cache)
+            assert len(reviews) == 30
+            assert [r['reviewer'] for r in reviews] == [f'user_{n}' for n in range(30)]
+            
+            # Stops when the pages run out
+            reviews = scrape_letterboxd_reviews("Test Movie", max_reviews=500, paginate=True,
+                                                workers=4, base_url=base_url, cache=cache)
+            assert len(reviews) == 36
+    finally:
+        server.shutdown()
+
+
+class _ETagHandler(BaseHTTPRequestHandler):
+    """Serves one page with an ETag and answers matching revalidations with 304."""
+    
+    status_codes = []
+    
+    def do_GET(self):
+        if self.headers.get('If-None-Match') == '"v1"':
+            self.status_codes.append(304)
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = _review_page_html(1).encode('utf-8')
+        self.status_codes.append(200)
+        self.send_response(200)
+        self.send_header('ETag', '"v1"')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+def test_response_cache():
+    """
+    Tests TTL hits, ETag revalidation and size-bounded eviction of the response cache.
+    """
+    
+    from scraper import fetch_page
+    
+    handler = type('Handler', (_ETagHandler,), {'status_codes': []})
+    server, base_url = _start_local_server(handler)
+    
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            url = f"{base_url}/film/test/reviews/by/activity/page/1/"
+            
+            # Within the TTL the second fetch never reaches the server
+            cache = ResponseCache(cache_dir, ttl=3600)
+            first = fetch_page(url, cache)
+            assert fetch_page(url, cache) == first
+            assert handler.status_codes == [200]
+            
+            # Once stale, the page is revalidated and the 304 reuses the cached body
+            cache.ttl = 0
+            assert fetch_page(url, cache) == first
+            assert handler.status_codes == [200, 304]
+            
+            # A cache smaller than one page keeps nothing
+            tiny = ResponseCache(os.path.join(cache_dir, 'tiny'), max_bytes=10)
+            fetch_page(url, tiny)
+            assert tiny.get(url) is None
+    finally:
+        server.shutdown()
+
+
+class _Unconditional304Handler(BaseHTTPRequestHandler):
+    """Answers 304 to every request that does not ask for a fresh copy with Cache-Control: no-cache."""
+    
+    def do_GET(self):
+        if 'no-cache' not in self.headers.get('Cache-Control', ''):
+            self.send_response(304)
+            self.end_headers()
+            return
+        
+        body = b"<html><body>page</body></html>"
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+def test_304_without_cached_page():
+    """
+    Tests that a 304 with no cached page to reuse is treated as a miss, not as an empty page.
+    """
+    
+    from scraper import fetch_page
+    
+    server, base_url = _start_local_server(_Unconditional304Handler)
+    
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            url = f"{base_url}/film/test/reviews/by/activity/page/1/"
+            
+            assert fetch_page(url, cache=False) == b"<html><body>page</body></html>"
+            
+            cache = ResponseCache(cache_dir)
+            assert fetch_page(url, cache) == b"<html><body>page</body></html>"
+            assert cache.get(url)['content'] == b"<html><body>page</body></html>"
+    finally:
+        server.shutdown()
+
+
+def test_parser_backends():
+    """
+    Tests that every HTML parsing backend extracts the same reviews from the saved fixture.
+    """
+    
+    from scraper import PARSER_BACKENDS, parse_reviews_html
+    
+    fixture = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           'benchmarks', 'fixtures', 'letterboxd_reviews_page.html')
+    with open(fixture, 'rb') as f:
+        html = f.read()
+    
+    expected = parse_reviews_html(html, "Inception", parser='full')
+    assert len(expected) == 11
+    assert expected[1]['rating'] == '★★½'
+    
+    for name in PARSER_BACKENDS:
+        assert parse_reviews_html(html, "Inception", parser=name) == expected, name
+
+
+class _ThrottlingHandler(BaseHTTPRequestHandler):
+    """Answers the first two requests with 429 Retry-After, then serves a page."""
+    
+    request_count = 0
+    
+    def do_GET(self):
+        type(self).request_count += 1
+        if self.request_count <= 2:
+            self.send_response(429)
+            self.send_header('Retry-After', '0')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = _review_page_html(1).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+def test_retry_with_rate_limiter():
+    """
+    Tests that throttled requests are retried after Retry-After and slow the host's rate.
+    """
+    
+    from scraper import HostRateLimiter, request_with_retry
+    
+    handler = type('Handler', (_ThrottlingHandler,), {'request_count': 0})
+    server, base_url = _start_local_server(handler)
+    
+    try:
+        limiter = HostRateLimiter(rate=4.0, burst=8, max_concurrency=2)
+        url = f"{base_url}/film/test/reviews/by/activity/page/1/"
+        
+        response = request_with_retry(url, retries=3, limiter=limiter)
+        assert response.status_code == 200
+        assert handler.request_count == 3
+        assert limiter.bucket(url).rate < 4.0
+        
+        # Out of retries, the throttled response is handed back to the caller
+        handler.request_count = 0
+        response = request_with_retry(url, retries=1, limiter=limiter)
+        assert response.status_code == 429
+    finally:
+        server.shutdown()
+
+
+class _NewestFirstHandler(BaseHTTPRequestHandler):
+    """Serves the reviews in ``reviews`` (newest first), 12 per page. A date of None leaves out the <time>."""
+    
+    reviews = []
+    requested_pages = []
+    
+    def do_GET(self):
+        page = int(re.search(r'/page/(\d+)/', self.path).group(1))
+        self.requested_pages.append(page)
+        items = ''.join(
+            f'<div class="review"><a class="reviewer">{name}</a>'
+            f'{"" if date is None else f"<time datetime={chr(34)}{date}{chr(34)}></time>"}'
+            f'<p class="review-text">Review by {name}</p></div>'
+            for name, date in self.reviews[(page - 1) * 12:page * 12]
+        )
+        body = f"<html><body>{items}</body></html>".encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+def test_incremental_scraping(monkeypatch):
+    """
+    Tests that an incremental refresh only fetches reviews newer than the watermark.
+    """
+    
+    import scraper
+    
+    reviews = [(f'user_{n}', f'2024-01-{n + 1:02d}T00:00:00Z') for n in range(28)][::-1]
+    handler = type('Handler', (_NewestFirstHandler,), {'reviews': reviews, 'requested_pages': []})
+    server, base_url = _start_local_server(handler)
+    
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            monkeypatch.setattr(scraper, 'CORPUS_DIR', os.path.join(tmp_dir, 'corpus'))
+            monkeypatch.setattr(scraper, 'WATERMARKS_FILE', os.path.join(tmp_dir, 'watermarks.json'))
+            cache = ResponseCache(os.path.join(tmp_dir, 'http_cache'))
+            
+            # First run stores the whole corpus
+            first = scrape_letterboxd_reviews("Test Movie", max_reviews=100, incremental=True,
+                                              base_url=base_url, cache=cache)
+            assert len(first) == 28
+            assert scraper.load_watermark("Test Movie")['newest_date'] == '2024-01-28T00:00:00Z'
+            
+            # Three new reviews arrive; only the first page is fetched again
+            handler.reviews = [(f'new_{n}', f'2024-02-{n + 1:02d}T00:00:00Z') for n in range(3)][::-1] + reviews
+            handler.requested_pages = []
+            refreshed = scrape_letterboxd_reviews("Test Movie", max_reviews=100, incremental=True,
+                                                  base_url=base_url, cache=cache)
+            assert handler.requested_pages == [1]
+            assert len(refreshed) == 31
+            assert [r['reviewer'] for r in refreshed[:4]] == ['new_2', 'new_1', 'new_0', 'user_27']
+            assert len(scraper.load_corpus("Test Movie")) == 31
+    finally:
+        server.shutdown()
+
+
+def test_incremental_refresh_capped(monkeypatch):
+    """
+    Tests that a refresh capped by max_reviews leaves no gap of unfetched reviews,
+    and that undated reviews are not duplicated or used as the watermark.
+    """
+    
+    import scraper
+    
+    reviews = [(f'user_{n}', f'2024-01-{n + 1:02d}T00:00:00Z') for n in range(20)][::-1]
+    handler = type('Handler', (_NewestFirstHandler,), {'reviews': reviews, 'requested_pages': []})
+    server, base_url = _start_local_server(handler)
+    
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            monkeypatch.setattr(scraper, 'CORPUS_DIR', os.path.join(tmp_dir, 'corpus'))
+            monkeypatch.setattr(scraper, 'WATERMARKS_FILE', os.path.join(tmp_dir, 'watermarks.json'))
+            cache = ResponseCache(os.path.join(tmp_dir, 'http_cache'))
+            
+            def refresh(max_reviews):
+                return scrape_letterboxd_reviews("Test Movie", max_reviews=max_reviews, incremental=True,
+                                                 base_url=base_url, cache=cache)
+            
+            assert len(refresh(100)) == 20
+            
+            # 30 new reviews (the newest one undated), refreshed with a small cap
+            new_reviews = [(f'new_{n}', f'2024-02-{n + 1:02d}T00:00:00Z') for n in range(29)][::-1]
+            handler.reviews = [('undated', None)] + new_reviews + reviews
+            assert [r['reviewer'] for r in refresh(10)][:2] == ['undated', 'new_28']
+            
+            for max_reviews in (50, 10):
+                refresh(max_reviews)
+                corpus = scraper.load_corpus("Test Movie")
+                assert len(corpus) == 50
+                assert {r['reviewer'] for r in corpus} >= {f'new_{n}' for n in range(29)}
+            
+            assert scraper.load_watermark("Test Movie")['newest_date'] == '2024-02-29T00:00:00Z'
+    finally:
+        server.shutdown()
+
+
+def test_streaming_pipeline():
+    """
+    Tests that streaming batch-by-batch analysis matches the staged pipeline.
+    """
+    
+    from pipeline import stream_analysis
+    from scraper import iter_sample_reviews
+    
+    results = list(stream_analysis(iter_sample_reviews("Inception", batch_size=12)))
+    assert [len(df) for df, _ in results] == [12, 12, 12, 4]
+    
+    running_stats = results[-1][1]
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        raw_filepath = os.path.join(tmp_dir, 'raw.csv')
+        save_reviews_to_csv(get_sample_reviews("Inception"), raw_filepath)
+        df_analyzed = analyze_all_reviews(preprocess_reviews(raw_filepath, os.path.join(tmp_dir, 'clean.csv')))
+    
+    assert running_stats.get_stats() == calculate_sentiment_stats(df_analyzed)
+    assert running_stats.get_distribution() == get_sentiment_distribution(df_analyzed)
+
+
+def test_sample_fallback_limit(monkeypatch):
+    """
+    Tests that the sample reviews used when scraping fails respect max_reviews,
+    both streamed and in the staged pipeline.
+    """
+    
+    import pipeline
+    
+    monkeypatch.setattr(pipeline, 'iter_review_pages', lambda movie_name, max_reviews: iter([]))
+    
+    batches = list(pipeline.iter_review_batches("Inception", max_reviews=30))
+    assert sum(len(batch) for batch in batches) == 30
+    assert sum(len(batch) for batch in pipeline.iter_review_batches("Inception", max_reviews=100)) == 40
+    
+    monkeypatch.setattr(pipeline, 'scrape_letterboxd_reviews', lambda movie_name, max_reviews: [])
+    assert len(pipeline._scrape_stage("Inception", max_reviews=30)) == 30
+
+
+def test_streaming_output_file():
+    """
+    Tests that a stream stopped early leaves the existing output file untouched,
+    and a finished stream replaces it.
+    """
+    
+    from pipeline import stream_analysis
+    from scraper import iter_sample_reviews
+    from storage import read_reviews
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_filepath = os.path.join(tmp_dir, 'analyzed.csv')
+        with open(output_filepath, 'w') as f:
+            f.write('previous\n')
+        
+        # A client disconnecting after the first batch closes the generator
+        stream = stream_analysis(iter_sample_reviews("Inception", batch_size=12), output_filepath)
+        next(stream)
+        stream.close()
+        
+        with open(output_filepath) as f:
+            assert f.read() == 'previous\n'
+        assert os.listdir(tmp_dir) == ['analyzed.csv']
+        
+        for _ in stream_analysis(iter_sample_reviews("Inception", batch_size=12), output_filepath):
+            pass
+        assert len(read_reviews(output_filepath)) == 40
+        assert os.listdir(tmp_dir) == ['analyzed.csv']
+
+
+def test_analysis_request_validation():
+    """
+    Tests that /api/analyze and /api/analyze/stream reject bad input with 400.
+    """
+    
+    from app import app
+    
+    client = app.test_client()
+    for endpoint in ('/api/analyze', '/api/analyze/stream'):
+        assert client.post(endpoint, data='not json').status_code == 400
+        assert client.post(endpoint, json={'movie_name': ' '}).status_code == 400
+        for max_reviews in ('many', 0, -5):
+            response = client.post(endpoint, json={'movie_name': 'Inception', 'max_reviews': max_reviews})
+            assert response.status_code == 400
+            assert response.get_json()['error'] == 'max_reviews must be a positive integer'
+        assert client.post(endpoint, json={'movie_name': 'Inception', 'positive_threshold': 'high'}).status_code == 400
+
+
+def test_synthetic_reviews():
+    """
+    Tests that synthetic reviews are reproducible, chunked and follow the requested rating mix.
+    """
+    
+    from synthetic import generate_synthetic_reviews
+    
+    chunks = list(generate_synthetic_reviews("Inception", 25_000, chunk_size=10_000))
+    assert [len(chunk) for chunk in chunks] == [10_000, 10_000, 5_000]
+    assert list(chunks[0].columns) == ['reviewer', 'rating', 'review_text', 'date', 'movie_name']
+    
+    again = pd.concat(generate_synthetic_reviews("Inception", 25_000, chunk_size=10_000), ignore_index=True)
+    assert again.equals(pd.concat(chunks, ignore_index=True))
+    
+    only_five_stars = next(generate_synthetic_reviews("Inception", 1_000, rating_weights=[1, 0, 0, 0, 0]))
+    assert (only_five_stars['rating'] == '★★★★★').all()
+
+
+def test_batch_text_cleaning():
+    """
+    Tests that batch cleaning matches clean_text and count_words exactly.
+    """
+    
+    from preprocessor import clean_text, count_words, clean_texts
+    
+    texts = pd.Series([
+        "Check out this link: https://example.com! #amazing @user123 :)",
+        "Mail me at fan@example.com, or visit www.example.org/review",
+        "  ÉMIGRÉ   cinema\t\nat its  BEST?!  ",
+        "foo@http://example.com bar",
+        "★★★★★",
+        "",
+        None,
+        "Check out this link: https://example.com! #amazing @user123 :)",
+        "record\x1eseparator\x1f and\xa0no-break　spaces",
+        "İSTANBUL at 300K, ★@x and HTTP://EXAMPLE.COM",
+    ], index=[10, 11, 12, 13, 14, 15, 16, 17, 18, 19])
+    
+    cleaned, word_counts = clean_texts(texts)
+    
+    assert cleaned.tolist() == [clean_text(text) for text in texts]
+    assert word_counts.tolist() == [count_words(clean_text(text)) for text in texts]
+    assert list(cleaned.index) == list(texts.index)
+
+
+def test_chunked_preprocessing():
+    """
+    Tests that chunked preprocessing writes the same file and statistics as preprocess_reviews.
+    """
+    
+    from preprocessor import preprocess_reviews_chunked, get_preprocessing_stats
+    
+    reviews = get_sample_reviews("Inception")
+    reviews[3]['review_text'] = ""
+    reviews[8]['review_text'] = "★★★ ★★★"
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        raw_filepath = os.path.join(tmp_dir, 'raw.csv')
+        save_reviews_to_csv(reviews, raw_filepath)
+        
+        df_clean = preprocess_reviews(raw_filepath, os.path.join(tmp_dir, 'clean.csv'))
+        stats = preprocess_reviews_chunked(raw_filepath, os.path.join(tmp_dir, 'clean_chunked.csv'), chunksize=7)
+        
+        assert stats == get_preprocessing_stats(df_clean)
+        assert stats['total_reviews'] == len(reviews) - 2
+        with open(os.path.join(tmp_dir, 'clean.csv'), 'rb') as f1, \
+                open(os.path.join(tmp_dir, 'clean_chunked.csv'), 'rb') as f2:
+            assert f1.read() == f2.read()
+
+
+def test_columnar_storage():
+    """
+    Tests Parquet/Feather round-trips and chunked preprocessing into a columnar file.
+    """
+    
+    from preprocessor import preprocess_reviews_chunked
+    from storage import read_reviews, iter_reviews, convert_reviews
+    from schema import compact_reviews
+    
+    reviews = get_sample_reviews("Inception")
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        raw_csv = os.path.join(tmp_dir, 'raw.csv')
+        save_reviews_to_csv(reviews, raw_csv)
+        df_clean = preprocess_reviews(raw_csv, os.path.join(tmp_dir, 'clean.csv'))
+        
+        for extension in ('parquet', 'feather'):
+            raw_filepath = os.path.join(tmp_dir, f'raw.{extension}')
+            assert convert_reviews(raw_csv, raw_filepath, chunksize=7) == len(reviews)
+            assert read_reviews(raw_filepath).equals(read_reviews(raw_csv, dtype=str, keep_default_na=False))
+            assert sum(len(chunk) for chunk in iter_reviews(raw_filepath, 7)) == len(reviews)
+            
+            clean_filepath = os.path.join(tmp_dir, f'clean.{extension}')
+            preprocess_reviews_chunked(raw_filepath, clean_filepath, chunksize=7)
+            df_columnar = read_reviews(clean_filepath)
+            
+            assert df_columnar['word_count'].dtype == df_clean['word_count'].dtype
+            assert compact_reviews(df_columnar).reset_index(drop=True).equals(df_clean.reset_index(drop=True))
+
+
+def test_in_memory_pipeline():
+    """
+    Tests preprocessing and analysis of in-memory reviews and background persistence.
+    """
+    
+    from storage import persist_reviews, wait_for_pending_writes, read_reviews
+    
+    reviews = get_sample_reviews("Inception")
+    reviews[3]['review_text'] = ""
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        raw_filepath = os.path.join(tmp_dir, 'raw.csv')
+        save_reviews_to_csv(reviews, raw_filepath)
+        df_from_file = preprocess_reviews(raw_filepath)
+        
+        clean_filepath = os.path.join(tmp_dir, 'clean.parquet')
+        df_clean = preprocess_reviews(reviews, clean_filepath, background=True)
+        assert df_clean.equals(df_from_file)
+        
+        # The background write uses a copy, so analyzing in place does not affect it
+        df_analyzed = analyze_all_reviews(df_clean)
+        future = persist_reviews(df_analyzed, os.path.join(tmp_dir, 'analyzed.parquet'), background=True)
+        
+        assert wait_for_pending_writes(timeout=30)
+        assert future.result() is True
+        assert 'sentiment_score' not in read_reviews(clean_filepath).columns
+        assert read_reviews(os.path.join(tmp_dir, 'analyzed.parquet')).equals(df_analyzed.reset_index(drop=True))
+        assert sorted(os.listdir(tmp_dir)) == ['analyzed.parquet', 'clean.parquet', 'raw.csv']
+
+
+def test_parallel_processing():
+    """
+    Tests that process-pool cleaning and scoring match in-process results, in order.
+    """
+    
+    from parallel import split_shards, shutdown_pools
+    
+    assert split_shards(list(range(10)), 4) == [[0, 1, 2], [3, 4, 5], [6, 7], [8, 9]]
+    assert split_shards([1, 2], 8) == [[1], [2]]
+    
+    reviews = get_sample_reviews("Inception") + get_sample_reviews("Parasite")
+    reviews[5]['review_text'] = "!!!"
+    
+    try:
+        df_serial = preprocess_reviews(reviews, workers=1)
+        df_parallel = preprocess_reviews(reviews, workers=2)
+        assert df_parallel.equals(df_serial)
+        
+        analyzed_serial = analyze_all_reviews(df_serial.copy(), workers=1, cache=False)
+        analyzed_parallel = analyze_all_reviews(df_serial.copy(), workers=2, cache=False)
+        assert analyzed_parallel.equals(analyzed_serial)
+    finally:
+        shutdown_pools()
+
+
+def test_score_cache():
+    """
+    Tests that cached sentiment scores match fresh ones and persist across cache instances.
+    """
+    
+    from analyzer import SentimentScoreCache
+    
+    df_clean = preprocess_reviews(get_sample_reviews("Inception") + get_sample_reviews("Inception"))
+    expected = analyze_all_reviews(df_clean.copy(), cache=False)
+    distinct = df_clean['review_text'].nunique()
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'scores.sqlite')
+        cache = SentimentScoreCache(db_path, max_entries=5)
+        
+        assert analyze_all_reviews(df_clean.copy(), cache=cache).equals(expected)
+        assert cache.get_stats()['misses'] == distinct
+        assert cache.get_stats()['memory_entries'] == 5
+        
+        # Recently used scores come from memory, the rest from disk
+        assert analyze_all_reviews(df_clean.copy(), cache=cache).equals(expected)
+        stats = cache.get_stats()
+        assert stats['misses'] == distinct
+        assert stats['memory_hits'] + stats['disk_hits'] == distinct
+        assert stats['hit_rate'] == 0.5
+        cache.close()
+        
+        # Scores survive a restart
+        reopened = SentimentScoreCache(db_path)
+        assert analyze_all_reviews(df_clean.copy(), cache=reopened).equals(expected)
+        assert reopened.get_stats()['disk_hits'] == distinct
+        
+        # Another lexicon version never reuses the stored scores
+        key = SentimentScoreCache.make_key(df_clean['review_text'].iloc[0], 'other-lexicon')
+        assert reopened.get_many([key]) == {}
+        reopened.close()
+
+
+def test_vectorized_scorer():
+    """
+    Tests that the batch scorer matches analyze_sentiment, including VADER's special rules.
+    """
+    
+    from analyzer import initialize_sentiment_analyzer, analyze_sentiment
+    from vader_batch import BatchSentimentScorer, SCORE_TOLERANCE
+    
+    analyzer = initialize_sentiment_analyzer()
+    texts = [review['review_text'] for review in get_sample_reviews("Inception")] + [
+        "The plot was GOOD but the acting was BAD!!!",
+        "not bad at all, kind of great actually",
+        "never so boring, this is hardly a masterpiece??",
+        "at least it was not the worst. the least funny film",
+        "good good good but terrible",
+        "sort of enjoyable, just enough action",
+        "this movie is the bomb",
+        "yeah right, what a great film",
+        "I didn't love it :(",
+        "", "   ", None, "a", "!!!"
+    ]
+    
+    expected = [analyze_sentiment(text, analyzer) for text in texts]
+    scores = BatchSentimentScorer(analyzer).score(texts)
+    
+    assert len(scores) == len(texts)
+    for text, score, reference in zip(texts, scores, expected):
+        assert abs(score - reference) <= SCORE_TOLERANCE, text
+
+
+def test_shared_sentiment_analyzer():
+    """
+    Tests that the analyzer is built once per process and shared between threads.
+    """
+    
+    from concurrent.futures import ThreadPoolExecutor
+    from analyzer import get_sentiment_analyzer, warmup_sentiment_analyzer, get_batch_scorer
+    
+    assert warmup_sentiment_analyzer() >= 0
+    analyzer = get_sentiment_analyzer()
+    
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        assert all(shared is analyzer for shared in pool.map(lambda _: get_sentiment_analyzer(), range(8)))
+    assert get_batch_scorer(analyzer) is get_batch_scorer(get_sentiment_analyzer())
+
+
+def test_sentiment_aggregator():
+    """
+    Tests that merged partial aggregates match statistics over all reviews.
+    """
+    
+    import json
+    from analyzer import SentimentAggregator
+    
+    df_analyzed = analyze_all_reviews(preprocess_reviews(get_sample_reviews("Inception") + get_sample_reviews("Parasite")))
+    
+    # Partial aggregates from "workers", one passed through JSON as if read from a file
+    partials = [SentimentAggregator().update(shard) for shard in (df_analyzed[:30], df_analyzed[30:31], df_analyzed[31:])]
+    partials[1] = SentimentAggregator.from_dict(json.loads(json.dumps(partials[1].to_dict())))
+    
+    merged = SentimentAggregator()
+    for partial in partials:
+        merged.merge(partial)
+    merged.merge(SentimentAggregator())
+    
+    assert merged.get_stats() == calculate_sentiment_stats(df_analyzed)
+    assert merged.get_distribution() == get_sentiment_distribution(df_analyzed)
+    assert merged.get_stats()['total_reviews'] == len(df_analyzed)
+    assert SentimentAggregator().get_stats() == calculate_sentiment_stats(df_analyzed[:0]) == {}
+
+
+def test_score_sketches():
+    """
+    Tests quantile sketch accuracy and merging, and histogram charts drawn from sketches.
+    """
+    
+    import numpy as np
+    from sketches import QuantileSketch, ScoreHistogram
+    from visualizer import create_score_histogram_chart
+    
+    rng = np.random.default_rng(7)
+    scores = np.tanh(rng.normal(0.3, 0.8, 200_000))
+    
+    whole = QuantileSketch()
+    merged = QuantileSketch()
+    for i, shard in enumerate(np.array_split(scores, 9)):
+        whole.update(shard)
+        merged.merge(QuantileSketch(seed=i).update(shard))
+    
+    assert sum(len(level) for level in whole.levels) <= 3 * whole.k
+    for q in (0.5, 0.9, 0.99):
+        for sketch in (whole, merged):
+            assert abs((scores <= sketch.quantile(q)).mean() - q) < 0.02
+    assert merged.quantile(0) == scores.min() and merged.quantile(1) == scores.max()
+    
+    histogram = ScoreHistogram()
+    for shard in np.array_split(scores, 4):
+        histogram.merge(ScoreHistogram().update(shard))
+    assert histogram.counts.tolist() == np.histogram(scores, bins=histogram.bin_edges)[0].tolist()
+    
+    # Small inputs are summarized exactly
+    stats = calculate_sentiment_stats(pd.DataFrame({
+        'sentiment_score': [0.9, -0.5, 0.1, 0.6, 0.0],
+        'sentiment_class': ['positive', 'negative', 'positive', 'positive', 'neutral']
+    }))
+    assert stats['median_sentiment'] == 0.1
+    assert stats['p99_sentiment'] == 0.9
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        chart_path = os.path.join(tmp_dir, 'distribution.png')
+        assert create_score_histogram_chart(histogram.to_dict(), "Inception", chart_path, float(scores.mean()))
+        assert os.path.getsize(chart_path) > 0
+
+
+def test_top_reviews():
+    """
+    Tests that the top-k tracker keeps the same reviews as a full sort, per movie and across merges.
+    """
+    
+    import json
+    import numpy as np
+    from sketches import TopKReviews
+    from analyzer import SentimentAggregator
+    
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame({
+        'movie_name': rng.choice(['Inception', 'Heat'], 5000),
+        'review_text': [f'review {i}' for i in range(5000)],
+        'sentiment_score': np.round(rng.uniform(-1, 1, 5000), 2)
+    })
+    df['sentiment_class'] = np.where(df['sentiment_score'] > 0, 'positive', 'negative')
+    
+    def expected(movie_df, k):
+        ordered = movie_df.reset_index(drop=True)
+        ordered['order'] = ordered.index
+        best = ordered.sort_values(['sentiment_score', 'order'], ascending=[False, True]).head(k)
+        worst = ordered.sort_values(['sentiment_score', 'order'], ascending=[True, True]).head(k)
+        return best['review_text'].tolist(), worst['review_text'].tolist()
+    
+    # Batch by batch, merged from shards, and restored from a dict
+    tracker = TopKReviews(5)
+    merged = TopKReviews(5)
+    for start in range(0, len(df), 700):
+        batch = df.iloc[start:start + 700]
+        tracker.update(batch)
+        merged.merge(TopKReviews(5).update(batch))
+    restored = TopKReviews.from_dict(json.loads(json.dumps(tracker.to_dict())))
+    
+    for result in (tracker, merged, restored):
+        top = result.get_top()
+        assert ([r['review_text'] for r in top['most_positive']],
+                [r['review_text'] for r in top['most_negative']]) == expected(df, 5)
+    
+    aggregate = SentimentAggregator(top_k=3).update(df)
+    for movie_name, movie_df in df.groupby('movie_name'):
+        top = aggregate.get_top_reviews(movie_name)
+        assert {r['movie_name'] for r in top['most_positive'] + top['most_negative']} == {movie_name}
+        assert [r['review_text'] for r in top['most_positive']] == expected(movie_df, 3)[0]
+    assert len(aggregate.get_top_reviews()['most_negative']) == 3
+    assert TopKReviews(5).update(df.head(2)).get_top()['most_positive'][0]['sentiment_score'] == df.head(2)['sentiment_score'].max()
+
+
+def test_compact_dtypes():
+    """
+    Tests rating parsing, compact column types and JSON-friendly records.
+    """
+    
+    import numpy as np
+    from schema import parse_rating, compact_reviews, review_records
+    from synthetic import generate_synthetic_reviews
+    
+    assert parse_rating('★★★½') == 3.5
+    assert parse_rating('½') == 0.5
+    assert parse_rating(' ★★★★★ ') == 5.0
+    assert parse_rating('4.0') == 4.0
+    assert np.isnan(parse_rating('N/A')) and np.isnan(parse_rating(None))
+    
+    raw = next(generate_synthetic_reviews("Inception", 20_000))
+    df_clean = preprocess_reviews(raw)
+    df_analyzed = analyze_all_reviews(df_clean)
+    
+    assert df_analyzed['movie_name'].dtype == 'category'
+    assert df_analyzed['sentiment_class'].dtype == 'category'
+    assert df_analyzed['rating'].dtype == np.float32
+    assert df_analyzed['word_count'].dtype == np.int32
+    assert df_analyzed['sentiment_score'].dtype == np.float32
+    assert set(df_analyzed['rating'].dropna().unique()) <= {1.0, 2.0, 3.0, 4.0, 5.0}
+    
+    wide = df_analyzed.astype({'movie_name': object, 'reviewer': object, 'sentiment_class': object,
+                               'rating': 'float64', 'word_count': 'int64', 'sentiment_score': 'float64'})
+    assert df_analyzed.memory_usage(deep=True).sum() < 0.75 * wide.memory_usage(deep=True).sum()
+    
+    # Compacting is idempotent, and statistics do not depend on the types
+    assert compact_reviews(df_analyzed).equals(df_analyzed)
+    assert calculate_sentiment_stats(wide) == calculate_sentiment_stats(df_analyzed)
+    
+    record = review_records(compact_reviews(pd.DataFrame({
+        'rating': ['★★½', 'N/A'], 'sentiment_score': [0.908, -0.25]
+    })))
+    assert record == [{'rating': 2.5, 'sentiment_score': 0.908}, {'rating': None, 'sentiment_score': -0.25}]
+
+
+def test_stage_graph():
+    """
+    Tests that analysis stages are reused until their inputs or parameters change.
+    """
+    
+    import numpy as np
+    from pipeline import build_analysis_graph, StageCache
+    from analyzer import classify_sentiment, classify_scores
+    
+    scores = pd.Series([-0.5, -0.05, -0.0499, 0.0, 0.05, 0.0501, 0.9])
+    expected = [classify_sentiment(score) for score in scores]
+    assert classify_scores(scores).tolist() == expected
+    assert classify_scores(scores.astype(np.float32)).tolist() == expected
+    
+    cache = StageCache()
+    
+    def run(chart_format='json', **thresholds):
+        graph = build_analysis_graph("Inception", cache=cache, chart_format=chart_format, **thresholds)
+        # Sample reviews stand in for scraping, which needs the network
+        graph.add('scrape', lambda movie_name, max_reviews: get_sample_reviews(movie_name),
+                  params={'movie_name': "Inception", 'max_reviews': 50}, source=True)
+        graph.run('stats' if chart_format == 'png' else 'chart')
+        return graph
+    
+    first = run()
+    assert first.ran == ['scrape', 'clean', 'score', 'classify', 'stats', 'chart']
+    assert first.outputs['chart']['type'] == 'bar'
+    
+    second = run()
+    assert second.ran == ['scrape']
+    assert second.reused == ['clean', 'score', 'classify', 'stats', 'chart']
+    assert second.outputs['classify'] is first.outputs['classify']
+    
+    # New thresholds reclassify the stored scores without scoring again
+    strict = run(positive_threshold=0.5, negative_threshold=-0.5)
+    assert strict.reused == ['clean', 'score']
+    assert strict.ran == ['scrape', 'classify', 'stats', 'chart']
+    assert strict.outputs['stats'].counts['neutral'] > first.outputs['stats'].counts['neutral']
+    
+    # PNG charts are drawn by the render queue, so the graph ends at stats
+    png = run(chart_format='png')
+    assert png.reused == ['clean', 'score', 'classify', 'stats']
+    assert 'chart' not in png.outputs
+    
+    # The cache is also bounded by the size of the stored outputs
+    df_analyzed = first.outputs['classify']
+    size = int(df_analyzed.memory_usage(deep=True).sum())
+    bounded = StageCache(max_bytes=2 * size - 1)
+    bounded.put('first', df_analyzed)
+    bounded.put('second', df_analyzed.copy())
+    assert bounded.get('first') == (False, None)
+    assert bounded.get_stats()['bytes'] == size
+    
+    # An output larger than the whole cache is not stored
+    too_small = StageCache(max_bytes=size - 1)
+    too_small.put('first', df_analyzed)
+    assert too_small.get('first') == (False, None)
+    assert too_small.get_stats()['bytes'] == 0
+
+
+def test_chart_cache():
+    """
+    Tests that unchanged charts are not redrawn and that the plots directory is pruned.
+    """
+    
+    import time
+    from visualizer import create_sentiment_chart, prune_plots
+    
+    distribution = {'positive': 30, 'neutral': 5, 'negative': 5}
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        chart_path = os.path.join(tmp_dir, 'chart.png')
+        
+        assert create_sentiment_chart(distribution, "Inception", chart_path)
+        drawn = os.stat(chart_path).st_mtime_ns
+        
+        assert create_sentiment_chart(dict(distribution), "Inception", chart_path)
+        assert os.stat(chart_path).st_mtime_ns == drawn
+        
+        assert create_sentiment_chart({**distribution, 'neutral': 6}, "Inception", chart_path)
+        assert os.stat(chart_path).st_mtime_ns != drawn
+        
+        # A chart replaced by something else is redrawn
+        with open(chart_path, 'wb') as f:
+            f.write(b'not a chart')
+        assert create_sentiment_chart({**distribution, 'neutral': 6}, "Inception", chart_path)
+        assert os.path.getsize(chart_path) > len(b'not a chart')
+        
+        # Pruning: oldest first past the size bound, and anything unused for too long
+        now = time.time()
+        for i, age in enumerate([50, 40, 30, 20]):
+            path = os.path.join(tmp_dir, f'old_{i}.png')
+            for file_path, content in ((path, b'x' * 990), (path + '.json', b'{}' * 5)):
+                with open(file_path, 'wb') as f:
+                    f.write(content)
+                os.utime(file_path, (now - age, now - age))
+        with open(os.path.join(tmp_dir, 'not_drawn_here.png'), 'wb') as f:
+            f.write(b'x' * 10**6)
+        
+        assert prune_plots(tmp_dir, max_bytes=10**9, max_age=45) == 1
+        assert not os.path.exists(os.path.join(tmp_dir, 'old_0.png'))
+        
+        chart_size = os.path.getsize(chart_path) + os.path.getsize(chart_path + '.json')
+        assert prune_plots(tmp_dir, max_bytes=chart_size + 2000, max_age=3600, keep=(chart_path,)) == 1
+        assert sorted(os.listdir(tmp_dir)) == ['chart.png', 'chart.png.json', 'not_drawn_here.png',
+                                               'old_2.png', 'old_2.png.json', 'old_3.png', 'old_3.png.json']
+
+
+def test_chart_renderer():
+    """
+    Tests that charts rendered from pooled templates on several threads match serial renders.
+    """
+    
+    from visualizer import ChartRenderer
+    
+    renderer = ChartRenderer(max_templates=2)
+    histogram = {'bin_edges': [-1.0, -0.5, 0.0, 0.5, 1.0], 'counts': [1, 4, 9, 3]}
+    
+    def render(i, prefix, tmp_dir):
+        distribution = {'positive': 30 + i, 'neutral': i, 'negative': 5}
+        renderer.render_sentiment_chart(distribution, f"Movie {i}", os.path.join(tmp_dir, f'{prefix}_bar_{i}.png'))
+        renderer.render_score_histogram(histogram, f"Movie {i}", os.path.join(tmp_dir, f'{prefix}_hist_{i}.png'),
+                                        avg_sentiment=None if i % 2 else 0.1 * i)
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for i in range(6):
+            render(i, 'serial', tmp_dir)
+        
+        threads = [threading.Thread(target=render, args=(i, 'threaded', tmp_dir)) for i in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        for i in range(6):
+            for kind in ('bar', 'hist'):
+                with open(os.path.join(tmp_dir, f'serial_{kind}_{i}.png'), 'rb') as f1, \
+                        open(os.path.join(tmp_dir, f'threaded_{kind}_{i}.png'), 'rb') as f2:
+                    assert f1.read() == f2.read()
+        
+        # Charts are moved into place whole; no temporary files are left behind
+        assert not [name for name in os.listdir(tmp_dir) if not name.endswith('.png')]
+        assert all(len(templates) <= 2 for templates in renderer._free.values())
+
+
+def test_chart_specs():
+    """
+    Tests the matplotlib-free chart output: JSON specs, SVG rendering and lazy matplotlib import.
+    """
+    
+    import subprocess
+    import sys
+    import xml.etree.ElementTree as ET
+    from chart_specs import sentiment_chart, score_histogram_spec, render_svg
+    
+    spec = sentiment_chart({'positive': 12, 'neutral': 3, 'negative': 5}, "Tom & <Jerry>", 'json')
+    assert spec['type'] == 'bar'
+    assert [(bar['label'], bar['value']) for bar in spec['bars']] == [('positive', 12), ('neutral', 3), ('negative', 5)]
+    
+    svg = ET.fromstring(sentiment_chart({'positive': 12, 'neutral': 3, 'negative': 5}, "Tom & <Jerry>", 'svg'))
+    texts = [element.text for element in svg.iter('{http://www.w3.org/2000/svg}text')]
+    assert "Sentiment Distribution - Tom & <Jerry>" in texts
+    assert len(list(svg.iter('{http://www.w3.org/2000/svg}rect'))) == 3
+    
+    histogram = {'bin_edges': [-1.0, -0.5, 0.0, 0.5, 1.0], 'counts': [1, 4, 9, 3]}
+    svg = ET.fromstring(render_svg(score_histogram_spec(histogram, "Inception", avg_sentiment=0.25)))
+    assert len(list(svg.iter('{http://www.w3.org/2000/svg}rect'))) == 4
+    assert "Average: 0.250" in [element.text for element in svg.iter('{http://www.w3.org/2000/svg}text')]
+    
+    # Importing the web app and its chart modules must not load matplotlib
+    check = "import sys, app, visualizer, chart_specs; sys.exit('matplotlib' in sys.modules)"
+    assert subprocess.run([sys.executable, '-c', check], cwd=os.path.dirname(os.path.abspath(__file__)),
+                          capture_output=True).returncode == 0
+
+
+def test_chart_render_queue():
+    """
+    Tests background chart rendering: status while drawing, latest data winning, and a full queue.
+    """
+    
+    from visualizer import ChartRenderQueue
+    
+    started = threading.Event()
+    release = threading.Event()
+    drawn = []
+    
+    def render(path, value):
+        started.set()
+        release.wait(10)
+        with open(path, 'w') as f:
+            f.write(value)
+        drawn.append(value)
+        return True
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        queue = ChartRenderQueue(workers=2, max_pending=2)
+        chart_path = os.path.join(tmp_dir, 'chart.png')
+        
+        assert queue.submit(chart_path, render, chart_path, 'first') == 'pending'
+        assert queue.status(chart_path) == 'pending'
+        assert queue.wait(chart_path, timeout=0.05) == 'pending'
+        assert started.wait(10)
+        
+        # Jobs for a path waiting behind the running one are merged; the latest data wins
+        assert queue.submit(chart_path, render, chart_path, 'second') == 'pending'
+        assert queue.submit(chart_path, render, chart_path, 'third') == 'pending'
+        
+        # The queue is full, so this chart is drawn on the calling thread
+        other_path = os.path.join(tmp_dir, 'other.png')
+        release.set()
+        assert queue.submit(other_path, render, other_path, 'inline') == 'ready'
+        
+        assert queue.wait(chart_path, timeout=10) == 'ready'
+        with open(chart_path) as f:
+            assert f.read() == 'third'
+        assert 'second' not in drawn
+        
+        failed_path = os.path.join(tmp_dir, 'failed.png')
+        queue.submit(failed_path, lambda: False)
+        assert queue.wait(failed_path, timeout=10) == 'failed'
+        assert queue.status(os.path.join(tmp_dir, 'unknown.png')) == 'missing'
+        
+        # Failures are only remembered for failure_ttl seconds
+        queue.failure_ttl = 0
+        assert queue.status(failed_path) == 'missing'
+        assert not queue._failed
+
+
+def test_job_manager():
+    """
+    Tests background jobs: results, failures, the bounded queue and result expiry.
+    """
+    
+    import time
+    from jobs import JobManager
+    
+    release = threading.Event()
+    manager = JobManager(workers=1, max_pending=2, ttl=0.2)
+    
+    def blocked(value):
+        release.wait(10)
+        return value * 2
+    
+    first = manager.submit(blocked, 1)
+    second = manager.submit(blocked, 2)
+    
+    # One running and one queued job fill the queue
+    assert manager.submit(blocked, 3) is None
+    assert manager.get(second)['status'] in ('queued', 'running')
+    
+    release.set()
+    for _ in range(100):
+        if manager.get(second)['status'] == 'done':
+            break
+        time.sleep(0.05)
+    
+    assert manager.get(first)['result'] == 2
+    assert manager.get(second)['result'] == 4
+    assert manager.get_stats() == {'queued': 0, 'running': 0, 'done': 2, 'failed': 0, 'max_pending': 2}
+    
+    def broken():
+        raise ValueError("no reviews")
+    
+    failed = manager.submit(broken)
+    for _ in range(100):
+        if manager.get(failed)['status'] == 'failed':
+            break
+        time.sleep(0.05)
+    assert manager.get(failed)['error'] == "no reviews"
+    
+    # Finished jobs are dropped after the TTL
+    time.sleep(0.3)
+    assert manager.get(first) is None and manager.get(failed) is None
+    assert manager.get('unknown') is None
+    
+    # The shared manager's counts are part of the health check
+    from app import app
+    jobs = app.test_client().get('/api/health').get_json()['jobs']
+    assert set(jobs) == {'queued', 'running', 'done', 'failed', 'max_pending'}
+
+
 if __name__ == '__main__':
     import sys
     
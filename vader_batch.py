@@ -0,0 +1,264 @@
+"""
+Vectorized batch scoring of VADER compound sentiment scores.
+Scores a whole column of texts at once with NumPy, applying the same rules as
+NLTK's SentimentIntensityAnalyzer.polarity_scores.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# Largest difference between BatchSentimentScorer and analyze_sentiment.
+# Both round compound scores to 4 decimals and apply the rules with the same
+# float operations in the same order, so in practice the scores are identical.
+SCORE_TOLERANCE = 1e-4
+
+
+class BatchSentimentScorer:
+    """
+    Computes VADER compound scores for many texts in one pass.
+    
+    Texts are split into tokens in bulk, each distinct token is looked up in
+    the lexicon once (a vocabulary index), and the booster, capitalization,
+    negation, "least", "but" and punctuation rules are applied to all tokens
+    at once as array operations. Texts containing one of VADER's special-case
+    idioms (such as "the bomb") are rare and are scored with polarity_scores.
+    """
+    
+    def __init__(self, analyzer):
+        """
+        Args:
+            analyzer (SentimentIntensityAnalyzer): Analyzer whose lexicon and constants are used
+        """
+        
+        self.analyzer = analyzer
+        self.lexicon = analyzer.lexicon
+        self.constants = analyzer.constants
+        self._idioms = [tuple(idiom.split(' ')) for idiom in self.constants.SPECIAL_CASE_IDIOMS]
+        self._booster_phrases = [tuple(phrase.split(' ')) for phrase in self.constants.BOOSTER_DICT
+                                 if ' ' in phrase]
+    
+    def score(self, texts):
+        """
+        Scores a list of texts.
+        
+        Args:
+            texts (list): Texts to score
+        
+        Returns:
+            ndarray: Compound score of each text, as from analyze_sentiment
+        """
+        
+        texts = list(texts)
+        n_texts = len(texts)
+        
+        # Like analyze_sentiment, non-text and blank reviews score 0
+        scorable = np.fromiter((isinstance(text, str) and text.strip() != '' for text in texts),
+                               dtype=bool, count=n_texts)
+        if not scorable.any():
+            return np.zeros(n_texts)
+        
+        rows, token_ids, vocabulary = self._tokenize(texts, scorable)
+        sums = self._sum_valences(rows, token_ids, vocabulary, n_texts)
+        
+        # Punctuation emphasis, from the number of "!" and "?" in the text
+        exclamations = np.array([text.count('!') if ok else 0 for text, ok in zip(texts, scorable.tolist())])
+        exclamations = np.minimum(exclamations, 4)
+        questions = np.array([text.count('?') if ok else 0 for text, ok in zip(texts, scorable.tolist())])
+        amplifier = exclamations * 0.292 + np.where(questions > 1,
+                                                    np.where(questions <= 3, questions * 0.18, 0.96), 0)
+        sums = np.where(sums > 0, sums + amplifier, np.where(sums < 0, sums - amplifier, sums))
+        
+        # Normalize to -1..1 and round like polarity_scores
+        normalized = sums / np.sqrt(sums * sums + 15)
+        compound = np.array([round(score, 4) for score in normalized.tolist()])
+        
+        # Texts without any words score 0
+        compound[np.bincount(rows, minlength=n_texts) == 0] = 0.0
+        
+        for row in self._idiom_rows(rows, token_ids, vocabulary):
+            compound[row] = self.analyzer.polarity_scores(texts[row])['compound']
+        
+        return compound
+    
+    def _strip_punctuation(self, token):
+        """Removes one leading or trailing punctuation mark, as VADER's SentiText does."""
+        
+        core = self.constants.REGEX_REMOVE_PUNCTUATION.sub('', token)
+        if len(core) > 1 and core != token:
+            for punctuation in self.constants.PUNC_LIST:
+                if token == punctuation + core or token == core + punctuation:
+                    return core
+        return token
+    
+    def _tokenize(self, texts, scorable):
+        """
+        Splits texts into VADER's words and emoticons.
+        
+        Returns:
+            tuple: (row of each token, vocabulary index of each token, vocabulary),
+                with tokens in text order
+        """
+        
+        scorable_rows = np.flatnonzero(scorable)
+        raw_tokens = []
+        counts = []
+        for row in scorable_rows.tolist():
+            parts = texts[row].split()
+            raw_tokens.extend(parts)
+            counts.append(len(parts))
+        
+        rows = np.repeat(scorable_rows, counts)
+        raw_codes, raw_vocabulary = pd.factorize(np.array(raw_tokens, dtype=object))
+        
+        # Single-character tokens are dropped; the rest lose surrounding punctuation
+        keep = np.array([len(token) > 1 for token in raw_vocabulary], dtype=bool)
+        stripped = np.array([self._strip_punctuation(token) for token in raw_vocabulary], dtype=object)
+        stripped_codes, vocabulary = pd.factorize(stripped)
+        
+        kept = keep[raw_codes]
+        return rows[kept], stripped_codes[raw_codes[kept]], list(vocabulary)
+    
+    def _sum_valences(self, rows, token_ids, vocabulary, n_texts):
+        """Returns the sum of token valences of each text, after all word-level rules."""
+        
+        constants = self.constants
+        n_tokens = len(token_ids)
+        lowers = [word.lower() for word in vocabulary]
+        
+        # Per-word attributes, plus a trailing "no word" entry for positions before
+        # the start or past the end of a text
+        def attribute(values, dtype=bool):
+            return np.array(list(values) + [dtype(0)], dtype=dtype)
+        
+        in_lexicon = attribute(lower in self.lexicon for lower in lowers)
+        lexicon_valence = attribute((self.lexicon.get(lower, 0.0) for lower in lowers), float)
+        is_booster = attribute(lower in constants.BOOSTER_DICT for lower in lowers)
+        booster_scalar = attribute((constants.BOOSTER_DICT.get(lower, 0.0) for lower in lowers), float)
+        is_upper = attribute(word.isupper() for word in vocabulary)
+        is_negation = attribute(lower in constants.NEGATE or "n't" in lower for lower in lowers)
+        is_never = attribute(word == 'never' for word in vocabulary)
+        is_so_or_this = attribute(word in ('so', 'this') for word in vocabulary)
+        is_kind = attribute(lower == 'kind' for lower in lowers)
+        is_of = attribute(lower == 'of' for lower in lowers)
+        is_least = attribute(lower == 'least' for lower in lowers)
+        is_at_or_very = attribute(lower in ('at', 'very') for lower in lowers)
+        is_but = attribute(lower == 'but' for lower in lowers)
+        no_word = len(vocabulary)
+        
+        # Position of each token within its text
+        counts = np.bincount(rows, minlength=n_texts)
+        starts = np.cumsum(counts) - counts
+        position = np.arange(n_tokens) - starts[rows]
+        length = counts[rows]
+        
+        def before(k):
+            shifted = np.full(n_tokens, no_word)
+            if k < n_tokens:
+                shifted[k:] = token_ids[:n_tokens - k]
+            return np.where(position >= k, shifted, no_word)
+        
+        def after(k):
+            shifted = np.full(n_tokens, no_word)
+            if k < n_tokens:
+                shifted[:n_tokens - k] = token_ids[k:]
+            return np.where(position + k < length, shifted, no_word)
+        
+        prev1, prev2, prev3 = before(1), before(2), before(3)
+        previous = [prev1, prev2, prev3]
+        
+        # "Some but not all words are ALL CAPS" makes capitalization count
+        n_upper = np.bincount(rows, weights=is_upper[token_ids], minlength=n_texts)
+        cap_differential = ((n_upper > 0) & (n_upper < counts))[rows]
+        
+        valence = lexicon_valence[token_ids]
+        upper = is_upper[token_ids] & cap_differential
+        valence = np.where(upper, np.where(valence > 0, valence + constants.C_INCR, valence - constants.C_INCR),
+                           valence)
+        
+        # Boosters and negations up to three words back
+        for start_i in range(3):
+            word = previous[start_i]
+            applies = (position > start_i) & ~in_lexicon[word]
+            
+            scalar = np.where(valence < 0, -booster_scalar[word], booster_scalar[word])
+            boosted_upper = is_booster[word] & is_upper[word] & cap_differential
+            scalar = np.where(boosted_upper, np.where(valence > 0, scalar + constants.C_INCR,
+                                                      scalar - constants.C_INCR), scalar)
+            if start_i == 1:
+                scalar = scalar * 0.95
+            if start_i == 2:
+                scalar = scalar * 0.9
+            updated = valence + scalar
+            
+            if start_i == 0:
+                updated = np.where(is_negation[prev1], updated * constants.N_SCALAR, updated)
+            elif start_i == 1:
+                emphasis = is_never[prev2] & is_so_or_this[prev1]
+                updated = np.where(emphasis, updated * 1.5,
+                                   np.where(is_negation[prev2], updated * constants.N_SCALAR, updated))
+            else:
+                emphasis = (is_never[prev3] & is_so_or_this[prev2]) | is_so_or_this[prev1]
+                updated = np.where(emphasis, updated * 1.25,
+                                   np.where(is_negation[prev3], updated * constants.N_SCALAR, updated))
+                
+                # Two-word boosters such as "kind of" dampen the valence
+                phrase = self._pair_mask(prev3, prev2, vocabulary) | self._pair_mask(prev2, prev1, vocabulary)
+                updated = np.where(phrase, updated + constants.B_DECR, updated)
+            
+            valence = np.where(applies, updated, valence)
+        
+        # "least" before a word flips it, except in "at least" / "very least"
+        least = ~in_lexicon[prev1] & is_least[prev1]
+        valence = np.where(least & (position > 1) & ~is_at_or_very[prev2], valence * constants.N_SCALAR, valence)
+        valence = np.where(least & (position == 1), valence * constants.N_SCALAR, valence)
+        
+        # Boosters, the "kind" of "kind of" and words outside the lexicon carry no valence
+        skipped = is_booster[token_ids] | (is_kind[token_ids] & is_of[after(1)])
+        valence = np.where(in_lexicon[token_ids] & ~skipped, valence, 0.0)
+        
+        # VADER locates each word by its first occurrence in the text, so
+        # repeated words all get the valence computed at the first one
+        key = rows.astype(np.int64) * (no_word + 1) + token_ids
+        _, first_index, inverse = np.unique(key, return_index=True, return_inverse=True)
+        sentiments = valence[first_index[inverse.reshape(-1)]]
+        
+        # Words before the first "but" count half, words after it 1.5 times
+        no_but = np.iinfo(np.int64).max
+        first_but = np.full(n_texts, no_but, dtype=np.int64)
+        but_tokens = is_but[token_ids]
+        np.minimum.at(first_but, rows[but_tokens], position[but_tokens])
+        but_position = first_but[rows]
+        has_but = but_position != no_but
+        sentiments = np.where(has_but & (position < but_position), sentiments * 0.5,
+                              np.where(has_but & (position > but_position), sentiments * 1.5, sentiments))
+        
+        return np.bincount(rows, weights=sentiments, minlength=n_texts)
+    
+    def _pair_mask(self, first, second, vocabulary):
+        """Marks positions where (first, second) spell a two-word booster phrase."""
+        
+        word_ids = {word: i for i, word in enumerate(vocabulary)}
+        mask = np.zeros(len(first), dtype=bool)
+        for word1, word2 in self._booster_phrases:
+            if word1 in word_ids and word2 in word_ids:
+                mask |= (first == word_ids[word1]) & (second == word_ids[word2])
+        return mask
+    
+    def _idiom_rows(self, rows, token_ids, vocabulary):
+        """Returns the texts that contain a special-case idiom."""
+        
+        word_ids = {word: i for i, word in enumerate(vocabulary)}
+        n_tokens = len(token_ids)
+        found = set()
+        
+        for idiom in self._idioms:
+            if len(idiom) > n_tokens or not all(word in word_ids for word in idiom):
+                continue
+            span = n_tokens - len(idiom) + 1
+            mask = rows[:span] == rows[len(idiom) - 1:]
+            for offset, word in enumerate(idiom):
+                mask &= token_ids[offset:offset + span] == word_ids[word]
+            found.update(rows[:span][mask].tolist())
+        
+        return sorted(found)
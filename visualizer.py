@@ -1,14 +1,575 @@
 """
 Visualization module for creating charts and graphs.
 Generates sentiment distribution visualizations.
+Matplotlib is imported on the first PNG render, so importing this module
+stays cheap for processes that only serve SVG or JSON charts (chart_specs).
 """
 
-import matplotlib.pyplot as plt
-import matplotlib
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, wait
+from collections import OrderedDict
+import hashlib
+import json
 import os
+import threading
+import time
 
-# Use non-interactive backend for better compatibility
-matplotlib.use('Agg')
+from sketches import ScoreHistogram
+from chart_specs import SENTIMENT_COLORS, DEFAULT_BAR_COLOR
+from storage import create_temp_file
+from config import (PLOTS_DIR, CHART_CACHE, PLOTS_MAX_BYTES, PLOTS_MAX_AGE, CHART_DPI, CHART_FIGSIZE,
+                    CHART_TEMPLATE_POOL_SIZE, CHART_RENDER_WORKERS, CHART_RENDER_QUEUE_SIZE, CHART_FAILURE_TTL)
+
+# Bump when the look of the charts changes, so older cached charts are redrawn
+CHART_STYLE_VERSION = 2
+
+_plots_lock = threading.Lock()
+
+_matplotlib_module = None
+_matplotlib_lock = threading.Lock()
+
+
+def _matplotlib():
+    """Imports matplotlib with the non-interactive Agg backend on first use."""
+    
+    global _matplotlib_module
+    
+    with _matplotlib_lock:
+        if _matplotlib_module is None:
+            import matplotlib
+            
+            # Use non-interactive backend for better compatibility
+            matplotlib.use('Agg')
+            _matplotlib_module = matplotlib
+    
+    return _matplotlib_module
+
+
+def chart_fingerprint(kind, **inputs):
+    """
+    Hashes everything a chart is drawn from.
+    
+    Args:
+        kind (str): Chart type
+        **inputs: Data and labels of the chart (JSON-serializable, NumPy scalars allowed)
+    
+    Returns:
+        str: Fingerprint
+    """
+    
+    payload = json.dumps([kind, CHART_STYLE_VERSION, _matplotlib().__version__, CHART_DPI, CHART_FIGSIZE, inputs],
+                         default=lambda value: value.item() if hasattr(value, 'item') else str(value))
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _sidecar_path(output_path):
+    return output_path + '.json'
+
+
+def is_chart_current(output_path, fingerprint):
+    """
+    Checks whether a chart file was drawn from the inputs with this fingerprint
+    and has not been replaced since. Marks the chart as recently used if so.
+    
+    Args:
+        output_path (str): Chart image path
+        fingerprint (str): Fingerprint from chart_fingerprint
+    
+    Returns:
+        bool: True if the chart can be reused
+    """
+    
+    if not CHART_CACHE:
+        return False
+    
+    sidecar_path = _sidecar_path(output_path)
+    
+    try:
+        with open(sidecar_path, 'r', encoding='utf-8') as f:
+            entry = json.load(f)
+        stat = os.stat(output_path)
+    except (OSError, ValueError):
+        return False
+    
+    if (entry.get('fingerprint') != fingerprint or entry.get('size') != stat.st_size
+            or entry.get('mtime_ns') != stat.st_mtime_ns):
+        return False
+    
+    # The sidecar's modification time records the last use, for pruning
+    try:
+        os.utime(sidecar_path)
+    except OSError:
+        pass
+    
+    return True
+
+
+def _record_chart(output_path, fingerprint):
+    """Writes the fingerprint sidecar of a freshly saved chart, then prunes the plots directory."""
+    
+    stat = os.stat(output_path)
+    entry = {'fingerprint': fingerprint, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    
+    tmp_path = create_temp_file(_sidecar_path(output_path))
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, _sidecar_path(output_path))
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    
+    if os.path.abspath(os.path.dirname(output_path)) == os.path.abspath(PLOTS_DIR):
+        prune_plots(keep=(output_path,))
+
+
+def prune_plots(directory=PLOTS_DIR, max_bytes=PLOTS_MAX_BYTES, max_age=PLOTS_MAX_AGE, keep=()):
+    """
+    Deletes charts unused for longer than max_age, then the least recently
+    used ones until the directory fits in max_bytes. A chart was last used
+    when it was drawn or reused, whichever is later. Only charts drawn by
+    this module are counted and deleted; other files are left alone.
+    
+    Args:
+        directory (str): Plots directory
+        max_bytes (int): Size bound for the charts, sidecar files included
+        max_age (float): Seconds a chart may go unused
+        keep (tuple): Chart paths never deleted (e.g. the chart just drawn)
+    
+    Returns:
+        int: Number of charts deleted
+    """
+    
+    keep = {os.path.abspath(path) for path in keep}
+    now = time.time()
+    
+    with _plots_lock:
+        entries = []
+        total = 0
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if name.endswith('.json'):
+                # Sidecars of charts deleted by other means
+                if not os.path.exists(path[:-len('.json')]):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                continue
+            if name.endswith('.tmp'):
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if not os.path.isfile(path):
+                continue
+            
+            # Only charts drawn by this module (those with a sidecar) are managed
+            try:
+                sidecar_stat = os.stat(_sidecar_path(path))
+            except OSError:
+                continue
+            last_used = max(stat.st_mtime, sidecar_stat.st_mtime)
+            size = stat.st_size + sidecar_stat.st_size
+            
+            entries.append((last_used, size, path))
+            total += size
+        
+        entries.sort()
+        removed = 0
+        for last_used, size, path in entries:
+            if total <= max_bytes and now - last_used <= max_age:
+                continue
+            if os.path.abspath(path) in keep:
+                continue
+            for file_path in (path, _sidecar_path(path)):
+                try:
+                    os.remove(file_path)
+                except OSError:
+                    pass
+            total -= size
+            removed += 1
+    
+    if removed:
+        print(f"🧹 Removed {removed} unused chart(s) from {directory}")
+    return removed
+
+
+class ChartRenderer:
+    """
+    Renders charts by updating pre-built figure templates.
+    
+    Each chart type has a Figure whose axes, titles, labels, grid and layout
+    are set up once. A render only updates bar heights, texts and the
+    average line, then draws through the object-oriented Agg canvas, so
+    pyplot's global state is never involved. Templates are checked out for
+    the duration of a render, so any number of threads can render at once;
+    up to max_templates idle templates are kept per chart type.
+    """
+    
+    def __init__(self, max_templates=CHART_TEMPLATE_POOL_SIZE):
+        self.max_templates = max_templates
+        self._free = {}
+        self._lock = threading.Lock()
+    
+    def _render(self, key, build, update, output_path):
+        with self._lock:
+            free = self._free.get(key)
+            template = free.pop() if free else None
+        
+        if template is None:
+            template = build()
+        
+        # A template that failed halfway is dropped rather than reused
+        update(template)
+        
+        # Draw to a temporary file so clients never read a half-written chart
+        image_format = os.path.splitext(output_path)[1].lstrip('.').lower() or 'png'
+        tmp_path = create_temp_file(output_path)
+        try:
+            template['figure'].savefig(tmp_path, dpi=CHART_DPI, format=image_format)
+            os.replace(tmp_path, output_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        
+        with self._lock:
+            free = self._free.setdefault(key, [])
+            if len(free) < self.max_templates:
+                free.append(template)
+    
+    def render_sentiment_chart(self, sentiment_distribution, movie_name, output_path):
+        """
+        Draws a bar chart of sentiment counts.
+        
+        Args:
+            sentiment_distribution (dict): Dictionary with sentiment counts
+            movie_name (str): Name of the movie
+            output_path (str): Path to save the chart image
+        """
+        
+        labels = tuple(sentiment_distribution.keys())
+        
+        def build():
+            return _build_bar_template(labels, CHART_FIGSIZE, 'Sentiment Distribution - ', 16, 12)
+        
+        def update(template):
+            template['title'].set_text(f'Sentiment Distribution - {movie_name}')
+            _update_bars(template, list(sentiment_distribution.values()))
+        
+        self._render(('sentiment', labels), build, update, output_path)
+    
+    def render_combined_report(self, sentiment_distribution, avg_sentiment, movie_name, output_path):
+        """
+        Draws the combined report: sentiment counts with the average score in the title.
+        
+        Args:
+            sentiment_distribution (dict): Dictionary with sentiment counts
+            avg_sentiment (float): Average sentiment score
+            movie_name (str): Name of the movie
+            output_path (str): Path to save the report image
+        """
+        
+        labels = tuple(sentiment_distribution.keys())
+        
+        def build():
+            return _build_bar_template(labels, (12, 6), 'Sentiment Analysis Report - \nAverage Sentiment: 0.000',
+                                       14, 11)
+        
+        def update(template):
+            template['title'].set_text(f'Sentiment Analysis Report - {movie_name}\n'
+                                       f'Average Sentiment: {avg_sentiment:.3f}')
+            _update_bars(template, list(sentiment_distribution.values()))
+        
+        self._render(('combined_report', labels), build, update, output_path)
+    
+    def render_score_histogram(self, histogram, movie_name, output_path, avg_sentiment=None):
+        """
+        Draws a histogram of sentiment scores from pre-binned counts.
+        
+        Args:
+            histogram (dict): 'bin_edges' and 'counts' of the score histogram
+            movie_name (str): Name of the movie
+            output_path (str): Path to save the chart image
+            avg_sentiment (float): Average score to mark on the chart (optional)
+        """
+        
+        edges = tuple(float(edge) for edge in histogram['bin_edges'])
+        
+        def update(template):
+            template['title'].set_text(f'Sentiment Score Distribution - {movie_name}')
+            
+            counts = list(histogram['counts'])
+            for patch, count in zip(template['bars'], counts):
+                patch.set_height(count)
+            template['axes'].set_ylim(0, max(counts) * 1.05 if max(counts) > 0 else 1)
+            
+            template['average'].set_visible(avg_sentiment is not None)
+            template['legend'].set_visible(avg_sentiment is not None)
+            if avg_sentiment is not None:
+                template['average'].set_xdata([avg_sentiment, avg_sentiment])
+                template['legend'].get_texts()[0].set_text(f'Average: {avg_sentiment:.3f}')
+        
+        self._render(('score_histogram', edges), lambda: _build_histogram_template(edges), update, output_path)
+
+
+def _new_figure(figsize):
+    _matplotlib()
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    
+    figure = Figure(figsize=figsize)
+    FigureCanvasAgg(figure)
+    return figure, figure.add_subplot()
+
+
+def _fit_layout(figure, axes):
+    # Lay out once with room for large counts on the y axis, instead of
+    # running tight_layout on every render
+    axes.set_ylim(0, 999999)
+    figure.tight_layout()
+
+
+def _build_bar_template(labels, figsize, title, title_size, label_size):
+    figure, axes = _new_figure(figsize)
+    
+    bars = axes.bar(labels, [0] * len(labels), color=[SENTIMENT_COLORS.get(label, DEFAULT_BAR_COLOR) for label in labels],
+                    edgecolor='black', linewidth=1.5)
+    
+    # Value labels on top of the bars
+    texts = [axes.text(bar.get_x() + bar.get_width() / 2., 0, '', ha='center', va='bottom',
+                       fontsize=12, fontweight='bold')
+             for bar in bars]
+    
+    title = axes.set_title(title, fontsize=title_size, fontweight='bold', pad=20)
+    axes.set_xlabel('Sentiment', fontsize=label_size, fontweight='bold')
+    axes.set_ylabel('Number of Reviews', fontsize=label_size, fontweight='bold')
+    axes.grid(axis='y', alpha=0.3, linestyle='--')
+    _fit_layout(figure, axes)
+    
+    return {'figure': figure, 'axes': axes, 'bars': bars, 'texts': texts, 'title': title}
+
+
+def _update_bars(template, values):
+    for bar, text, value in zip(template['bars'], template['texts'], values):
+        bar.set_height(value)
+        text.set_y(value)
+        text.set_text(f'{int(value)}')
+    
+    top = max(values) if values else 0
+    template['axes'].set_ylim(0, top * 1.15 if top > 0 else 10)
+
+
+def _build_histogram_template(edges):
+    figure, axes = _new_figure(CHART_FIGSIZE)
+    
+    bars = axes.bar(edges[:-1], [0] * (len(edges) - 1), width=np.diff(edges), align='edge',
+                    color=DEFAULT_BAR_COLOR, edgecolor='black', alpha=0.7)
+    average = axes.axvline(0, color='red', linestyle='--', linewidth=2, label='Average: 0.000')
+    legend = axes.legend(fontsize=10)
+    
+    title = axes.set_title('Sentiment Score Distribution - ', fontsize=16, fontweight='bold', pad=20)
+    axes.set_xlabel('Sentiment Score', fontsize=12, fontweight='bold')
+    axes.set_ylabel('Frequency', fontsize=12, fontweight='bold')
+    axes.grid(axis='y', alpha=0.3, linestyle='--')
+    
+    margin = (edges[-1] - edges[0]) * 0.05
+    axes.set_xlim(edges[0] - margin, edges[-1] + margin)
+    _fit_layout(figure, axes)
+    
+    return {'figure': figure, 'axes': axes, 'bars': bars, 'average': average, 'legend': legend, 'title': title}
+
+
+_chart_renderer = None
+_chart_renderer_lock = threading.Lock()
+
+
+def get_chart_renderer():
+    """
+    Returns the shared chart renderer.
+    
+    Returns:
+        ChartRenderer: Shared renderer instance
+    """
+    
+    global _chart_renderer
+    
+    with _chart_renderer_lock:
+        if _chart_renderer is None:
+            _chart_renderer = ChartRenderer()
+    
+    return _chart_renderer
+
+
+class ChartRenderQueue:
+    """
+    Renders charts on background worker threads.
+    
+    Jobs are keyed by output path. A job submitted while another one for
+    the same path is still waiting replaces its arguments, and jobs for one
+    path never run at the same time, so the file always ends up drawn from
+    the latest data. At most max_pending jobs wait or run at once; when the
+    queue is full, submit renders on the caller's thread instead. A failed
+    render is reported for failure_ttl seconds, or until the next render of
+    that path.
+    """
+    
+    def __init__(self, workers=CHART_RENDER_WORKERS, max_pending=CHART_RENDER_QUEUE_SIZE,
+                 failure_ttl=CHART_FAILURE_TTL):
+        self.max_pending = max_pending
+        self.failure_ttl = failure_ttl
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='chart')
+        self._lock = threading.Lock()
+        self._waiting = {}      # path -> (render, args) of the job not yet started
+        self._futures = {}      # path -> Future of the latest job
+        # Jobs for one path hold the same lock (paths share a fixed set of locks)
+        self._path_locks = [threading.Lock() for _ in range(64)]
+        self._failed = OrderedDict()    # path -> time its last render failed, oldest first
+        self._pending = 0
+    
+    def submit(self, output_path, render, *args):
+        """
+        Queues a chart for rendering.
+        
+        Args:
+            output_path (str): Path of the chart image
+            render (callable): Draws the chart, returning True on success (e.g. create_sentiment_chart)
+            *args: Arguments for render
+        
+        Returns:
+            str: 'pending', or 'ready' / 'failed' if the queue was full and
+                the chart was rendered right away
+        """
+        
+        key = os.path.abspath(output_path)
+        
+        with self._lock:
+            if key in self._waiting:
+                self._waiting[key] = (render, args)
+                return 'pending'
+            
+            if self._pending < self.max_pending:
+                self._waiting[key] = (render, args)
+                self._pending += 1
+                self._failed.pop(key, None)
+                self._expire_failures()
+                future = self._executor.submit(self._run, key)
+                self._futures[key] = future
+            else:
+                future = None
+        
+        if future is None:
+            print(f"⚠ Chart queue full, rendering {output_path} now")
+            with self._path_lock(key):
+                return self._render(key, render, args)
+        
+        future.add_done_callback(lambda done: self._forget(key, done))
+        return 'pending'
+    
+    def _path_lock(self, key):
+        return self._path_locks[hash(key) % len(self._path_locks)]
+    
+    def _run(self, key):
+        try:
+            with self._path_lock(key):
+                with self._lock:
+                    render, args = self._waiting.pop(key)
+                return self._render(key, render, args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+    
+    def _render(self, key, render, args):
+        try:
+            success = bool(render(*args))
+        except Exception as e:
+            print(f"✗ Error rendering chart {key}: {str(e)}")
+            success = False
+        
+        with self._lock:
+            self._failed.pop(key, None)
+            if not success:
+                self._failed[key] = time.time()
+            self._expire_failures()
+        
+        return 'ready' if success else 'failed'
+    
+    def _expire_failures(self):
+        """Drops failures older than the TTL. Called with the lock held."""
+        
+        cutoff = time.time() - self.failure_ttl
+        while self._failed and next(iter(self._failed.values())) < cutoff:
+            self._failed.popitem(last=False)
+    
+    def _forget(self, key, future):
+        with self._lock:
+            if self._futures.get(key) is future:
+                del self._futures[key]
+    
+    def status(self, output_path):
+        """
+        Args:
+            output_path (str): Path of the chart image
+        
+        Returns:
+            str: 'pending' while queued or rendering, 'failed' if the last
+                render failed within failure_ttl, otherwise 'ready' or
+                'missing' (no such file)
+        """
+        
+        key = os.path.abspath(output_path)
+        
+        with self._lock:
+            future = self._futures.get(key)
+            if future is not None and not future.done():
+                return 'pending'
+            self._expire_failures()
+            if key in self._failed:
+                return 'failed'
+        
+        return 'ready' if os.path.exists(output_path) else 'missing'
+    
+    def wait(self, output_path, timeout=None):
+        """
+        Waits for a queued chart to be rendered.
+        
+        Args:
+            output_path (str): Path of the chart image
+            timeout (float): Maximum seconds to wait (default: no limit)
+        
+        Returns:
+            str: Status after waiting, as returned by status
+        """
+        
+        with self._lock:
+            future = self._futures.get(os.path.abspath(output_path))
+        
+        if future is not None:
+            wait([future], timeout=timeout)
+        
+        return self.status(output_path)
+
+
+_chart_render_queue = None
+_chart_render_queue_lock = threading.Lock()
+
+
+def get_chart_render_queue():
+    """
+    Returns the shared background chart render queue.
+    
+    Returns:
+        ChartRenderQueue: Shared queue instance
+    """
+    
+    global _chart_render_queue
+    
+    with _chart_render_queue_lock:
+        if _chart_render_queue is None:
+            _chart_render_queue = ChartRenderQueue()
+    
+    return _chart_render_queue
 
 
 def create_sentiment_chart(sentiment_distribution, movie_name, output_path):
@@ -25,55 +586,21 @@ def create_sentiment_chart(sentiment_distribution, movie_name, output_path):
     """
     
     try:
+        # Reuse the chart if it was already drawn from the same data
+        fingerprint = chart_fingerprint('sentiment', distribution=sentiment_distribution, movie_name=movie_name)
+        if is_chart_current(output_path, fingerprint):
+            print(f"✓ Sentiment chart up to date at {output_path}")
+            return True
+        
         # Ensure output directory exists
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
         
-        # Extract sentiment data
-        labels = list(sentiment_distribution.keys())
-        values = list(sentiment_distribution.values())
-        
-        # Define colors for each sentiment
-        colors = {
-            'positive': '#2ecc71',   # Green
-            'neutral': '#95a5a6',    # Gray
-            'negative': '#e74c3c'    # Red
-        }
-        bar_colors = [colors.get(label, '#3498db') for label in labels]
-        
-        # Create figure
-        plt.figure(figsize=(10, 6))
-        
-        # Create bar chart
-        bars = plt.bar(labels, values, color=bar_colors, edgecolor='black', linewidth=1.5)
-        
-        # Add value labels on top of bars
-        for bar in bars:
-            height = bar.get_height()
-            plt.text(bar.get_x() + bar.get_width()/2., height,
-                    f'{int(height)}',
-                    ha='center', va='bottom', fontsize=12, fontweight='bold')
-        
-        # Customize chart
-        plt.title(f'Sentiment Distribution - {movie_name}', fontsize=16, fontweight='bold', pad=20)
-        plt.xlabel('Sentiment', fontsize=12, fontweight='bold')
-        plt.ylabel('Number of Reviews', fontsize=12, fontweight='bold')
-        plt.ylim(0, max(values) * 1.15 if max(values) > 0 else 10)
-        
-        # Add grid for better readability
-        plt.grid(axis='y', alpha=0.3, linestyle='--')
-        
-        # Adjust layout to prevent label cutoff
-        plt.tight_layout()
-        
-        # Save figure
-        plt.savefig(output_path, dpi=100, bbox_inches='tight')
+        get_chart_renderer().render_sentiment_chart(sentiment_distribution, movie_name, output_path)
         print(f"✓ Sentiment chart saved to {output_path}")
         
-        # Close the figure to free memory
-        plt.close()
-        
+        _record_chart(output_path, fingerprint)
         return True
-        
+    
     except Exception as e:
         print(f"✗ Error creating chart: {str(e)}")
         return False
@@ -92,41 +619,42 @@ def create_sentiment_score_distribution(df, movie_name, output_path):
         bool: True if successful, False otherwise
     """
     
+    histogram = ScoreHistogram().update(df['sentiment_score'].to_numpy(dtype=float)).to_dict()
+    return create_score_histogram_chart(histogram, movie_name, output_path, df['sentiment_score'].mean())
+
+
+def create_score_histogram_chart(histogram, movie_name, output_path, avg_sentiment=None):
+    """
+    Creates and saves a histogram of sentiment scores from pre-binned counts,
+    such as SentimentAggregator.get_histogram(), without needing the scores.
+    
+    Args:
+        histogram (dict): 'bin_edges' and 'counts' of the score histogram
+        movie_name (str): Name of the movie
+        output_path (str): Path to save the chart image
+        avg_sentiment (float): Average score to mark on the chart (optional)
+    
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    
     try:
+        # Reuse the chart if it was already drawn from the same data
+        fingerprint = chart_fingerprint('score_histogram', histogram=histogram, movie_name=movie_name,
+                                        avg_sentiment=avg_sentiment)
+        if is_chart_current(output_path, fingerprint):
+            print(f"✓ Score distribution chart up to date at {output_path}")
+            return True
+        
         # Ensure output directory exists
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
         
-        # Create figure
-        plt.figure(figsize=(10, 6))
-        
-        # Create histogram
-        plt.hist(df['sentiment_score'], bins=20, color='#3498db', edgecolor='black', alpha=0.7)
-        
-        # Add vertical line for average sentiment
-        avg_sentiment = df['sentiment_score'].mean()
-        plt.axvline(avg_sentiment, color='red', linestyle='--', linewidth=2, label=f'Average: {avg_sentiment:.3f}')
-        
-        # Customize chart
-        plt.title(f'Sentiment Score Distribution - {movie_name}', fontsize=16, fontweight='bold', pad=20)
-        plt.xlabel('Sentiment Score', fontsize=12, fontweight='bold')
-        plt.ylabel('Frequency', fontsize=12, fontweight='bold')
-        plt.legend(fontsize=10)
-        
-        # Add grid for better readability
-        plt.grid(axis='y', alpha=0.3, linestyle='--')
-        
-        # Adjust layout
-        plt.tight_layout()
-        
-        # Save figure
-        plt.savefig(output_path, dpi=100, bbox_inches='tight')
+        get_chart_renderer().render_score_histogram(histogram, movie_name, output_path, avg_sentiment)
         print(f"✓ Score distribution chart saved to {output_path}")
         
-        # Close the figure to free memory
-        plt.close()
-        
+        _record_chart(output_path, fingerprint)
         return True
-        
+    
     except Exception as e:
         print(f"✗ Error creating score distribution chart: {str(e)}")
         return False
@@ -147,53 +675,22 @@ def create_combined_report(sentiment_distribution, avg_sentiment, movie_name, ou
     """
     
     try:
+        # Reuse the report if it was already drawn from the same data
+        fingerprint = chart_fingerprint('combined_report', distribution=sentiment_distribution,
+                                        avg_sentiment=avg_sentiment, movie_name=movie_name)
+        if is_chart_current(output_path, fingerprint):
+            print(f"✓ Combined report up to date at {output_path}")
+            return True
+        
         # Ensure output directory exists
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
         
-        # Create figure with subplots
-        fig, ax = plt.subplots(figsize=(12, 6))
-        
-        # Prepare data
-        labels = list(sentiment_distribution.keys())
-        values = list(sentiment_distribution.values())
-        
-        # Define colors
-        colors = {
-            'positive': '#2ecc71',
-            'neutral': '#95a5a6',
-            'negative': '#e74c3c'
-        }
-        bar_colors = [colors.get(label, '#3498db') for label in labels]
-        
-        # Create bar chart
-        bars = ax.bar(labels, values, color=bar_colors, edgecolor='black', linewidth=1.5)
-        
-        # Add value labels on bars
-        for bar in bars:
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height,
-                   f'{int(height)}',
-                   ha='center', va='bottom', fontsize=12, fontweight='bold')
-        
-        # Customize
-        ax.set_title(f'Sentiment Analysis Report - {movie_name}\nAverage Sentiment: {avg_sentiment:.3f}',
-                    fontsize=14, fontweight='bold', pad=20)
-        ax.set_xlabel('Sentiment', fontsize=11, fontweight='bold')
-        ax.set_ylabel('Number of Reviews', fontsize=11, fontweight='bold')
-        ax.grid(axis='y', alpha=0.3, linestyle='--')
-        
-        # Adjust layout
-        plt.tight_layout()
-        
-        # Save figure
-        plt.savefig(output_path, dpi=100, bbox_inches='tight')
+        get_chart_renderer().render_combined_report(sentiment_distribution, avg_sentiment, movie_name, output_path)
         print(f"✓ Combined report saved to {output_path}")
         
-        # Close the figure
-        plt.close()
-        
+        _record_chart(output_path, fingerprint)
         return True
-        
+    
     except Exception as e:
         print(f"✗ Error creating combined report: {str(e)}")
         return False